@@ -1,5 +1,6 @@
 import json
 from tkinter import messagebox
+from logic.src.command_catalog import load_commands, save_commands
 
 class CommandFrameLogic:
     def __init__(self, parent):
@@ -10,8 +11,7 @@ class CommandFrameLogic:
 
     def load_commands(self):
         try:
-            with open('commands.json', 'r') as file:
-                return json.load(file)
+            return load_commands()
         except FileNotFoundError:
             messagebox.showerror("Error", "Commands file not found.")
             return []
@@ -29,19 +29,19 @@ class CommandFrameLogic:
                 return
 
         commands_to_save = []
-        for command_entry, type_entry, description_entry in zip(self.parent.command_entries, self.parent.type_entries, self.parent.description_entries):
-            command = {
+        for existing, command_entry, type_entry, description_entry in zip(self.commands, self.parent.command_entries, self.parent.type_entries, self.parent.description_entries):
+            command = dict(existing)  # Keeps keys the screen doesn't show, like "timeout"
+            command.update({
                 "command": command_entry.get(),
                 "type": type_entry.get(),
                 "description": description_entry.get()
-            }
+            })
             commands_to_save.append(command)
 
         try:
             new_commands_count = len(commands_to_save) - self.initial_commands_count + self.deleted_commands_count
 
-            with open('commands.json', 'w') as file:
-                json.dump(commands_to_save, file, indent=4)
+            save_commands(commands_to_save)
 
             messages = []
             if new_commands_count > 0:
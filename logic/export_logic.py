@@ -1,10 +1,10 @@
-import json
 import os
-import zipfile
 import tkinter as tk
 from tkinter import messagebox, filedialog
 import threading
 from ui.workspace_frame import WorkspaceFrame
+from logic.src.package_writer import write_package, COMPRESSION_METHODS, DEFAULT_COMPRESSION
+from logic.src.command_catalog import get_setting
 
 class ExportFrameLogic:
     def __init__(self, parent, scan_result, commands_details, highlights):
@@ -14,42 +14,11 @@ class ExportFrameLogic:
         self.highlights = highlights
         self.include_memory_dump = tk.BooleanVar(value=True)
         self.include_highlighting = tk.BooleanVar(value=True)
+        self.compression = tk.StringVar(value=self.load_compression_setting())
 
-    def save_command_outputs(self, export_dir, commands):
-        for command in commands:
-            filename = f"{command['command'].replace('.', '_')}.txt"
-            filepath = os.path.join(export_dir, filename)
-            with open(filepath, 'w') as file:
-                file.write(command.get('output', ''))  # Use .get to handle missing 'output'
-            command['output_file'] = filename  # Update the command dict with the output file path for later use in the metadata
-            print(f"Saved command output to {filepath}")
-
-    def save_metadata(self, export_dir, memory_dump_file, commands):
-        metadata = {
-            "memory_dump_file": os.path.basename(memory_dump_file) if self.include_memory_dump.get() else None,
-            "commands": [
-                {
-                    "command": cmd["command"],
-                    "highlights": cmd.get("highlights", []) if self.include_highlighting.get() else [],
-                    "output_file": cmd['output_file']  # Include the output file in the metadata
-                }
-                for cmd in commands
-            ]
-        }
-        metadata_path = os.path.join(export_dir, "metadata.json")
-        with open(metadata_path, 'w') as file:
-            json.dump(metadata, file, indent=4)
-        print(f"Saved metadata to {metadata_path}")
-        return metadata_path
-
-    def zip_files(self, files, zip_path):
-        with zipfile.ZipFile(zip_path, 'w') as zf:
-            for file in files:
-                if file and os.path.exists(file):  # Check if file path is not None and file exists
-                    zf.write(file, os.path.basename(file))
-                    print(f"Added {file} to zip file {zip_path}")
-                else:
-                    print(f"Skipping missing file: {file}")  # Logging the skipped file
+    def load_compression_setting(self):
+        compression = get_setting('export_compression', DEFAULT_COMPRESSION)
+        return compression if compression in COMPRESSION_METHODS else DEFAULT_COMPRESSION
 
     def export_package(self):
         export_data = self.parent.frames[WorkspaceFrame].get_export_data() if hasattr(self.parent.frames[WorkspaceFrame], 'get_export_data') else {}
@@ -66,18 +35,26 @@ class ExportFrameLogic:
         threading.Thread(target=self.create_zip_file, args=(zip_path, export_data)).start()
 
     def create_zip_file(self, zip_path, export_data):
+        # Outputs are streamed from the tabs straight into the archive, nothing is written next to it
         self.export_dir = os.path.dirname(zip_path)
-        self.save_command_outputs(self.export_dir, export_data['commands'])
         memory_dump_file = export_data['memory_dump_file'] if self.include_memory_dump.get() else None
-        metadata_path = self.save_metadata(self.export_dir, memory_dump_file, export_data['commands'])
+        try:
+            write_package(zip_path, export_data['commands'], memory_dump_file, self.include_highlighting.get(), self.compression.get(), self.report_progress)
+        except Exception as e:
+            print(f"Export failed: {e}")
+            self.parent.after(0, self.export_failed, str(e))
+            return
+        self.parent.after(0, self.export_complete)
 
-        files_to_zip = [metadata_path]
-        if self.include_memory_dump.get():
-            files_to_zip.append(export_data['memory_dump_file'])
-        files_to_zip += [os.path.join(self.export_dir, cmd['output_file']) for cmd in export_data['commands'] if 'output_file' in cmd]
+    def report_progress(self, message):
+        self.parent.after(0, self.show_progress, message)
 
-        self.zip_files(files_to_zip, zip_path)
-        self.parent.after(0, self.export_complete)
+    def show_progress(self, message):
+        pass  # The export frame shows it next to the loading animation
+
+    def export_failed(self, message):
+        self.hide_loading()
+        messagebox.showerror("Export Error", f"Could not export the package: {message}")
 
     def export_complete(self):
         self.hide_loading()
@@ -1,8 +1,8 @@
 import os
 import tkinter as tk
 from tkinter import filedialog, messagebox
-
-ALLOWED_FILE_TYPES = ['.dmp', '.raw', '.mem', '.bin', '.vmem', '.mddramimage', '.winddramimage']
+from logic.src.file_handler import ALLOWED_FILE_TYPES
+from logic.src.command_catalog import get_setting
 
 class ImportFrameLogic:
     def __init__(self, app, file_handler, switch_to_workspace_frame):
@@ -35,10 +35,20 @@ class ImportFrameLogic:
             if file_extension not in ALLOWED_FILE_TYPES:
                 messagebox.showerror("Error", f"Invalid file type: {file_extension}. Allowed types are: {', '.join(ALLOWED_FILE_TYPES)}")
                 continue
-            self.file_handler.load_files(file_path)
+            try:
+                loaded = self.file_handler.load_files(file_path, compute_full_hash=self.get_full_hash_setting())
+            except OSError as e:
+                messagebox.showerror("Error", f"Could not read {os.path.basename(file_path)}: {e}")
+                continue
+            if not loaded:
+                messagebox.showinfo("Already Loaded", f"{os.path.basename(file_path)} is already loaded.")
+                continue
             #messagebox.showinfo("Success", f"File loaded: {file_path}")
             self.app.app.update_loaded_file_label()  # Call update_loaded_file_label on the main application object
             self.switch_to_workspace_frame()
 
+    def get_full_hash_setting(self):
+        return get_setting('full_hash_dumps', False)
+
     def parse_file_drop(self, drop_data):
         return self.app.tk.splitlist(drop_data)
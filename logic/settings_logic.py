@@ -1,10 +1,10 @@
 #located at logic/settings_frame.py
-import json
 import os
 import subprocess
 import re
 import tkinter as tk
 from tkinter import filedialog, messagebox
+from logic.src.command_catalog import get_settings_store, update_settings
 
 class SettingsFrameLogic:
     def __init__(self, app):
@@ -29,28 +29,31 @@ class SettingsFrameLogic:
         if version:
             settings['volatility_version'] = version  # Store the version in settings
 
-        with open('settings.json', 'w') as settings_file:
-            json.dump(settings, settings_file, indent=4)  # Pretty print JSON for readability
+        try:
+            update_settings(settings)  # Keeps the settings this screen doesn't show
+        except OSError as e:
+            messagebox.showerror("Error", f"Could not save the settings: {e}")
+            return
 
         self.original_settings = settings.copy()
         messagebox.showinfo("Settings Saved", "Your settings have been saved including Volatility version.")
 
 
     def load_settings(self):
-        try:
-            with open('settings.json', 'r') as settings_file:
-                settings = json.load(settings_file)
-                self.volatility_path_entry.insert(0, settings.get('volatility_path', '../Volatility3'))
-                self.font_size_spinbox.delete(0, tk.END)
-                self.font_size_spinbox.insert(0, settings.get('font_size', 12))
-                self.line_distance_spinbox.delete(0, tk.END)
-                self.line_distance_spinbox.insert(0, settings.get('line_distance', 1))
-                self.letter_distance_spinbox.delete(0, tk.END)
-                self.letter_distance_spinbox.insert(0, settings.get('letter_distance', 1))
-                self.original_settings = settings.copy()
-        except FileNotFoundError:
+        store = get_settings_store()
+        settings = store.get()
+        if store.error is not None:
             print("Settings file not found. Using defaults.")
             self.volatility_path_entry.insert(0, '../Volatility3')
+            return
+        self.volatility_path_entry.insert(0, settings.get('volatility_path', '../Volatility3'))
+        self.font_size_spinbox.delete(0, tk.END)
+        self.font_size_spinbox.insert(0, settings.get('font_size', 12))
+        self.line_distance_spinbox.delete(0, tk.END)
+        self.line_distance_spinbox.insert(0, settings.get('line_distance', 1))
+        self.letter_distance_spinbox.delete(0, tk.END)
+        self.letter_distance_spinbox.insert(0, settings.get('letter_distance', 1))
+        self.original_settings = settings.copy()
 
     def revert_unsaved_changes(self):
         self.volatility_path_entry.delete(0, tk.END)
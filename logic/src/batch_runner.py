@@ -0,0 +1,281 @@
+import os
+import threading
+import time
+from logic.src.command_catalog import volatility_script, command_timeout
+from logic.src.command_runner import command_line, run_command_line
+from logic.src.file_handler import ALLOWED_FILE_TYPES
+from logic.src.fingerprint import sampled_fingerprint
+from logic.src.job_scheduler import JobScheduler, JobCancelled, current_job, get_cost_hint, PRIORITY_HIGH, PRIORITY_NORMAL, MB
+from logic.src.package_writer import write_package, DEFAULT_COMPRESSION
+from logic.src.result_cache import ResultCache, DEFAULT_MAX_SIZE
+from logic.src.result_table import ResultTable, TableSink
+from logic.src.symbol_cache import SymbolCache
+from logic.src.volatility_engine import VolatilityEngine
+from logic.src.worker_pool import WorkerPool, DEFAULT_MAX_JOBS, DEFAULT_MEMORY_LIMIT, DEFAULT_WARMUP_COMMAND
+
+EXECUTION_ENGINES = ("subprocess", "worker", "inprocess")
+
+def find_dumps(paths):
+    """Memory dumps among the given files and directories (not recursive), in a stable order."""
+    dumps = []
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                file_path = os.path.join(path, name)
+                if os.path.isfile(file_path) and os.path.splitext(name)[1].lower() in ALLOWED_FILE_TYPES:
+                    dumps.append(file_path)
+        elif os.path.isfile(path):
+            dumps.append(path)
+        else:
+            raise FileNotFoundError(f"No such file or directory: {path}")
+    return dumps
+
+class BatchResult:
+    """Result of one command on one dump, filled in by the job that runs it."""
+    def __init__(self, dump, command, parameters):
+        self.dump = dump
+        self.command = command
+        self.parameters = parameters
+        self.table = ResultTable()
+        self.notes = []  # Output that isn't a result row, and errors
+        self.error = None
+        self.cached = False
+        self.runtime = 0
+        self.job = None  # Scheduler job that runs it
+        self.done = threading.Event()
+
+    def name(self):
+        return f"{self.command} {self.parameters}".strip()
+
+    def state(self):
+        if not self.done.is_set():
+            return self.job.state if self.job else "pending"
+        return "failed" if self.error else "finished"
+
+    def chunks(self):
+        if self.table.columns is not None:
+            yield from self.table.iter_text()
+        elif not self.notes:
+            yield "No output received."
+        yield from self.notes
+
+class BatchRunner:
+    """Runs commands on memory dumps without a GUI, with the same scheduler, engines and result cache as the workspace.
+
+    Stages of a profile run one after another for each dump, everything else runs in parallel.
+    """
+    def __init__(self, settings, commands, execution_engine=None, max_workers=None, use_cache=None):
+        self.settings = settings
+        self.commands = commands
+        self.execution_engine = execution_engine or settings.get('execution_engine', 'subprocess')
+        max_workers = max_workers or settings.get('scheduler_max_workers')
+        memory_limit = settings.get('scheduler_memory_limit_mb')
+        self.scheduler = JobScheduler(
+            max_workers=int(max_workers) if max_workers else None,
+            memory_limit=int(memory_limit) * MB if memory_limit else None
+        )
+        if self.execution_engine == 'inprocess' and not execution_engine and self.scheduler.max_workers > 1:
+            # In-process jobs take turns, a warm worker per dump keeps the contexts and still runs the dumps in parallel
+            print("The inprocess engine runs one job at a time, using the worker engine instead (pass --engine inprocess to keep it)")
+            self.execution_engine = 'worker'
+        self.use_cache = settings.get('use_result_cache', True) if use_cache is None else use_cache
+        self.result_cache = None
+        self.worker_pool = None
+        self.engine = None
+        self.symbol_cache = None
+        self.symbol_lock = threading.Lock()
+        self.fingerprints = {}
+        self.results = []
+        self.finished = 0
+        self.total = 0
+        self.lock = threading.Lock()
+
+    def get_result_cache(self):
+        if self.result_cache is None:
+            max_size = int(self.settings.get('result_cache_size_mb', DEFAULT_MAX_SIZE // (1024 * 1024))) * 1024 * 1024
+            self.result_cache = ResultCache(max_size=max_size)
+        return self.result_cache
+
+    def get_worker_pool(self):
+        if self.worker_pool is None:
+            self.worker_pool = WorkerPool(
+                self.settings.get('volatility_path', ''),
+                symbol_dir=self.settings.get('symbol_directory') or None,
+                max_jobs=int(self.settings.get('worker_max_jobs', DEFAULT_MAX_JOBS)),
+                memory_limit=int(self.settings.get('worker_memory_limit_mb', DEFAULT_MEMORY_LIMIT // (1024 * 1024))) * 1024 * 1024,
+                warmup_command=self.settings.get('worker_warmup_command', DEFAULT_WARMUP_COMMAND)
+            )
+        return self.worker_pool
+
+    def get_engine(self):
+        if self.engine is None:
+            self.engine = VolatilityEngine(self.settings.get('volatility_path', ''), self.settings.get('symbol_directory') or None)
+        return self.engine
+
+    def prepare_symbols(self, dump_path):
+        directory = self.settings.get('symbol_directory')
+        if not directory or not os.path.isdir(directory):
+            return
+        with self.symbol_lock:
+            if self.symbol_cache is None:
+                self.symbol_cache = SymbolCache(directory)
+        self.symbol_cache.prepare(dump_path)  # Locks per dump, jobs on other dumps don't wait for this one's scan
+
+    def cache_key(self, dump_path, command, parameters):
+        if dump_path not in self.fingerprints:
+            self.fingerprints[dump_path] = sampled_fingerprint(dump_path)
+        return self.get_result_cache().make_key(self.fingerprints[dump_path], command, parameters, self.settings.get('volatility_version', ''))
+
+    def run(self, dumps, stages):
+        """Run the stages (lists of (command, parameters)) on every dump and wait, returns the BatchResults in run order."""
+        if self.execution_engine == 'worker':
+            self.get_worker_pool().sync(dumps)  # Warm every dump's worker while the first stage is queued
+        finished = threading.Semaphore(0)
+        for dump_path in dumps:
+            self.start(dump_path, stages, on_finished=lambda pipeline: finished.release())
+        for dump_path in dumps:
+            finished.acquire()
+        return self.results
+
+    def start(self, dump_path, stages, on_finished=None):
+        """Run the stages on one dump in the background, on_finished is called with the pipeline once all are done."""
+        pipeline = {"dump": dump_path, "stages": stages, "stage": 0, "remaining": 0, "results": [], "on_finished": on_finished}
+        with self.lock:
+            self.total += sum(len(stage) for stage in stages)
+        self.start_stage(pipeline)
+        return pipeline
+
+    def start_stage(self, pipeline):
+        while pipeline["stage"] < len(pipeline["stages"]) and not pipeline["stages"][pipeline["stage"]]:
+            pipeline["stage"] += 1  # Nothing to wait for
+        if pipeline["stage"] >= len(pipeline["stages"]):
+            print(f"Finished {os.path.basename(pipeline['dump'])}")
+            if pipeline["on_finished"]:
+                pipeline["on_finished"](pipeline)
+            return
+        stage = pipeline["stages"][pipeline["stage"]]
+        priority = PRIORITY_HIGH if pipeline["stage"] == 0 else PRIORITY_NORMAL  # Warm-up stages unblock everything else
+        pipeline["stage"] += 1
+        pipeline["remaining"] = len(stage)
+        results = [BatchResult(pipeline["dump"], command, parameters) for command, parameters in stage]
+        with self.lock:
+            self.results += results
+            pipeline["results"] += results
+        for result in results:
+            job_options = {
+                "name": result.name(),
+                "dump": pipeline["dump"],
+                "priority": priority,
+                "cost": get_cost_hint(result.command, self.commands),
+                "timeout": command_timeout(self.commands, result.command, self.settings.get('default_timeout', 0))
+            }
+            if self.execution_engine == 'worker':
+                job_options["exclusive"] = "worker:" + pipeline["dump"]  # Each dump has one warm worker
+            elif self.execution_engine == 'inprocess':
+                job_options["exclusive"] = "inprocess"  # Volatility contexts are not thread safe
+            result.job = self.scheduler.submit_job(self.run_step, result, **job_options)
+            result.job.future.add_done_callback(lambda future, p=pipeline, r=result: self.step_finished(future, p, r))
+
+    def step_finished(self, future, pipeline, result):
+        # Runs on the job's thread, or on the canceller's for a job that never started
+        if future.cancelled():
+            result.error = result.job.cancel_reason or "Cancelled before it started."
+        elif future.exception() is not None:
+            result.error = f"{type(future.exception()).__name__}: {future.exception()}"
+        result.done.set()
+        with self.lock:
+            self.finished += 1
+            pipeline["remaining"] -= 1
+            stage_done = pipeline["remaining"] == 0
+            progress = f"[{self.finished}/{self.total}]"
+        if result.error:
+            status = "failed: " + result.error.strip().split("\n")[-1]  # Last line of a traceback or stderr
+        else:
+            status = "cached" if result.cached else f"{result.runtime:.1f} s"
+        print(f"{progress} {result.name()} on {os.path.basename(result.dump)} {status}")
+        if stage_done:
+            self.start_stage(pipeline)
+
+    def run_step(self, result):
+        started = time.time()
+        cache_key = None
+        if self.use_cache:
+            cache_key = self.cache_key(result.dump, result.command, result.parameters)
+            if self.get_result_cache().lookup(cache_key):
+                self.load_cached(cache_key, result)
+                return result
+
+        self.prepare_symbols(result.dump)
+        job = current_job()
+        try:
+            self.execute(result)
+        except JobCancelled as e:
+            result.error = str(e)
+        except Exception as e:
+            result.error = f"{type(e).__name__}: {e}"
+        if job and job.cancel_requested:
+            result.error = job.cancel_reason  # Rather than the exit code of the killed process
+        if result.error:
+            result.notes.append("\nError:\n" + result.error)
+        elif cache_key and result.table.columns is not None:
+            self.get_result_cache().put_table(cache_key, result.table, {"command": result.command, "parameters": result.parameters, "dump": result.dump})
+        result.runtime = time.time() - started
+        return result
+
+    def load_cached(self, cache_key, result):
+        cache = self.get_result_cache()
+        if cache.entry_format(cache_key) == "table":
+            cache.load_table(cache_key, result.table)
+        else:
+            result.notes.append("".join(cache.read_chunks(cache_key)))
+        result.cached = True
+
+    def execute(self, result):
+        if self.execution_engine == 'worker':
+            try:
+                self.get_worker_pool().run(result.dump, result.command, result.parameters, result.table)
+                return
+            except ImportError as e:
+                print(f"Worker could not import volatility3 ({e}), falling back to running vol.py")
+        if self.execution_engine == 'inprocess':
+            job = current_job()
+
+            def check_cancelled(text):
+                # A plugin running in this process can't be killed, so stop it at its next row instead
+                if job:
+                    job.check_cancelled()
+
+            try:
+                self.get_engine().run_plugin(result.dump, result.command, result.parameters, TableSink(result.table, check_cancelled))
+                return
+            except ImportError as e:
+                print(f"Could not import volatility3 ({e}), falling back to running vol.py")
+
+        full_command = command_line(volatility_script(self.settings), result.dump, result.command, result.parameters, self.settings.get('symbol_directory'))
+        received_output, stderr, exit_code = run_command_line(full_command, result.notes.append, result.table)
+        if exit_code != 0:
+            result.error = stderr.strip() or f"vol.py exited with code {exit_code}"
+        elif stderr and not received_output:
+            result.notes.append("\nError:\n" + stderr)
+
+    def write_package(self, zip_path, memory_dump_file=None, compression=DEFAULT_COMPRESSION):
+        commands = [
+            {
+                "command": result.command,
+                "highlights": [],
+                "chunks": result.chunks,
+                "dump": os.path.basename(result.dump)
+            }
+            for result in self.results
+        ]
+        return write_package(zip_path, commands, memory_dump_file, compression=compression, progress=print)
+
+    def failures(self):
+        return [result for result in self.results if result.error]
+
+    def shutdown(self):
+        self.scheduler.shutdown()
+        if self.worker_pool:
+            self.worker_pool.shutdown()
+        if self.engine:
+            self.engine.shutdown()
@@ -0,0 +1,157 @@
+import copy
+import json
+import os
+import threading
+
+COMMANDS_FILE = 'commands.json'
+SETTINGS_FILE = 'settings.json'
+
+class ConfigFile:
+    """A JSON file kept in memory for everyone who reads it.
+
+    The file is parsed again only when its mtime, size or inode changes, and written atomically.
+    Subscribers are called with the new contents when they change, on the thread that noticed the
+    change, so UI subscribers hand the work to Tk with after().
+    """
+    def __init__(self, path, default):
+        self.path = path
+        self.default = default
+        self.data = copy.deepcopy(default)
+        self.error = None  # Why the last read failed, the default is used meanwhile
+        self.stamp = None
+        self.loaded = False
+        self.subscribers = []
+        self.lock = threading.RLock()
+
+    def file_stamp(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    def refresh(self):
+        """Read the file again if it changed on disk, True when the contents changed."""
+        with self.lock:
+            stamp = self.file_stamp()
+            if self.loaded and stamp == self.stamp:
+                return False
+            try:
+                with open(self.path, 'r') as file:
+                    data = json.load(file)
+                self.error = None
+            except (OSError, ValueError) as e:
+                print(f"Could not read {self.path}: {e}")
+                data = copy.deepcopy(self.default)
+                self.error = e
+            first_load = not self.loaded
+            changed = data != self.data
+            self.data = data
+            self.stamp = stamp
+            self.loaded = True
+        if changed and not first_load:
+            print(f"{self.path} changed on disk")
+            self.notify()
+        return changed
+
+    def get(self):
+        """The current contents, shared between readers, copy before changing them."""
+        self.refresh()
+        return self.data
+
+    def save(self, data):
+        # Written next to the file and moved over it, so readers never see half a file
+        with self.lock:
+            temp_path = self.path + '.tmp'
+            with open(temp_path, 'w') as file:
+                json.dump(data, file, indent=4)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temp_path, self.path)
+            changed = data != self.data
+            self.data = copy.deepcopy(data)
+            self.error = None
+            self.stamp = self.file_stamp()
+            self.loaded = True
+        if changed:
+            self.notify()
+
+    def update(self, changes):
+        """Save the file with some keys changed, the others are kept."""
+        with self.lock:
+            data = copy.deepcopy(self.get())
+            data.update(changes)
+            self.save(data)
+
+    def subscribe(self, callback):
+        self.subscribers.append(callback)
+        return callback
+
+    def unsubscribe(self, callback):
+        if callback in self.subscribers:
+            self.subscribers.remove(callback)
+
+    def notify(self):
+        for callback in list(self.subscribers):
+            try:
+                callback(self.data)
+            except Exception as e:
+                print(f"Subscriber of {self.path} failed: {e}")
+
+config_files = {}  # Absolute path -> ConfigFile, one per file for the whole process
+config_files_lock = threading.Lock()
+
+def get_config_file(path, default):
+    with config_files_lock:
+        key = os.path.abspath(path)
+        if key not in config_files:
+            config_files[key] = ConfigFile(path, default)
+        return config_files[key]
+
+def get_settings_store(path=SETTINGS_FILE):
+    return get_config_file(path, {})
+
+def get_command_store(path=COMMANDS_FILE):
+    return get_config_file(path, [])
+
+def load_commands(path=COMMANDS_FILE):
+    """A copy of the command list of commands.json, a file that can't be read raises its OSError or ValueError."""
+    store = get_command_store(path)
+    commands = store.get()
+    if store.error is not None:
+        raise store.error
+    return copy.deepcopy(commands)
+
+def save_commands(commands, path=COMMANDS_FILE):
+    get_command_store(path).save(commands)
+
+def find_command(commands, name):
+    for command in commands:
+        if command.get('command') == name:
+            return command
+    return None
+
+def load_settings(path=SETTINGS_FILE):
+    """A copy of settings.json, empty when it can't be read."""
+    return copy.deepcopy(get_settings_store(path).get())
+
+def get_setting(key, default=None, path=SETTINGS_FILE):
+    return get_settings_store(path).get().get(key, default)
+
+def save_settings(settings, path=SETTINGS_FILE):
+    get_settings_store(path).save(settings)
+
+def update_settings(changes, path=SETTINGS_FILE):
+    get_settings_store(path).update(changes)
+
+def volatility_script(settings):
+    """Path of vol.py in the configured volatility installation."""
+    full_path = os.path.join(settings.get('volatility_path', ''), 'vol.py')
+    return full_path.replace('/', os.sep)
+
+def command_timeout(commands, command, default_timeout=0):
+    # A "timeout" on the command in commands.json wins over the default_timeout setting, 0 means no limit
+    entry = find_command(commands, command)
+    if entry is not None and 'timeout' in entry:
+        return int(entry['timeout']) or None
+    return int(default_timeout or 0) or None
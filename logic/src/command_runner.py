@@ -0,0 +1,61 @@
+import shlex
+import subprocess
+import tempfile
+from logic.src.job_scheduler import current_job, process_group_options
+from logic.src.result_table import JsonLinesReader
+
+def command_line(script, dump_path, command, parameters="", symbol_dir=None, structured=True):
+    """The vol.py argv for a plugin run, structured=True asks for jsonl rows that fill a ResultTable.
+
+    No shell is involved, so paths with spaces or brackets are passed as they are. Parameters are split
+    like a shell would split them, unbalanced quotes raise ValueError.
+    """
+    argv = ["python", script]
+    if symbol_dir:
+        # vol.py looks in the local symbol directory first and never goes online for symbol tables
+        argv += ["-s", symbol_dir, "--offline"]
+    if structured:
+        argv += ["-r", "jsonl"]
+    return argv + ["-f", dump_path] + shlex.split(command) + shlex.split(parameters or "")
+
+def display_command(argv):
+    """An argv as a line that can be pasted into a shell, for logs."""
+    return shlex.join(argv)
+
+def read_json_lines(lines, sink, write):
+    """Rows of vol.py's jsonl output go to sink (e.g. a TableSink), anything else to write, True if there was output."""
+    reader = JsonLinesReader(sink)
+    received_output = False
+    for line in lines:
+        received_output = True
+        if line.strip() and not reader.feed(line):
+            write(line)  # Not a result row, e.g. a plugin printing text itself
+    return received_output
+
+def run_command_line(full_command, write, sink=None):
+    """Run a vol.py argv from command_line() and pass its output on while it runs, returns (received output, stderr, exit code).
+
+    With a sink the output is read as jsonl rows, without one every line goes to write as it is.
+    """
+    # stderr goes to a temp file so a chatty plugin can't fill the pipe while we read stdout
+    with tempfile.TemporaryFile(mode='w+') as stderr_file:
+        try:
+            process = subprocess.Popen(full_command, stdout=subprocess.PIPE, stderr=stderr_file, text=True, bufsize=1, **process_group_options())
+        except OSError as e:
+            return False, f"Could not start {full_command[0]}: {e}", 127  # What a shell would report for a missing program
+        job = current_job()
+        if job:
+            job.attach_process(process)
+        received_output = False
+        if sink is not None:
+            received_output = read_json_lines(process.stdout, sink, write)
+        else:
+            for line in process.stdout:
+                write(line)
+                received_output = True
+        process.stdout.close()
+        exit_code = process.wait()
+
+        stderr_file.seek(0)
+        stderr = stderr_file.read()
+    return received_output, stderr, exit_code
@@ -0,0 +1,186 @@
+import collections
+import concurrent.futures
+import hashlib
+import json
+import lzma
+import os
+import zipfile
+import zlib
+
+CHUNK_SIZE = 4 * 1024 * 1024  # Bytes of the dump compressed as one piece
+PAGE_SIZE = 4096
+MIN_ZERO_RUN = 16 * PAGE_SIZE  # Shorter runs of zero pages are left to the compressor
+ZERO_CHUNK = bytes(CHUNK_SIZE)
+ZERO_PAGE = bytes(PAGE_SIZE)
+MANIFEST_NAME = "manifest.json"
+
+class DumpIntegrityError(Exception):
+    pass
+
+def dump_folder(file_name):
+    return f"memory/{file_name}/"
+
+def chunk_encoding(compression):
+    # Chunks are compressed by the packer and stored as is, the zip compression names map onto them
+    return {"deflate": "zlib", "lzma": "lzma", "store": "none"}.get(compression, "zlib")
+
+def zero_runs(data):
+    """(start, length) of the runs of all-zero pages in data that are at least MIN_ZERO_RUN long."""
+    view = memoryview(data)
+    runs = []
+    start = None
+    for offset in range(0, len(data) - PAGE_SIZE + 1, PAGE_SIZE):
+        if view[offset:offset + PAGE_SIZE] == ZERO_PAGE:
+            if start is None:
+                start = offset
+            continue
+        if start is not None and offset - start >= MIN_ZERO_RUN:
+            runs.append((start, offset - start))
+        start = None
+    end = len(data) - len(data) % PAGE_SIZE
+    if start is not None and end - start >= MIN_ZERO_RUN:
+        runs.append((start, end - start))
+    return runs
+
+def compress(data, encoding):
+    if encoding == "zlib":
+        return zlib.compress(data, 6)
+    if encoding == "lzma":
+        return lzma.compress(data)
+    return bytes(data)
+
+def decompress(data, encoding):
+    if encoding == "zlib":
+        return zlib.decompress(data)
+    if encoding == "lzma":
+        return lzma.decompress(data)
+    return data
+
+def encode_chunk(data, encoding):
+    """Hash a chunk and compress what is left once the zero page runs are taken out, runs on a pool thread."""
+    digest = hashlib.sha256(data).hexdigest()  # hashlib, zlib and lzma release the GIL, so threads use every core
+    if data == ZERO_CHUNK[:len(data)]:
+        return digest, [(0, len(data))], None
+    runs = zero_runs(data)
+    if runs:
+        parts = []
+        position = 0
+        for start, length in runs:
+            parts.append(data[position:start])
+            position = start + length
+        parts.append(data[position:])
+        data = b"".join(parts)
+    return digest, runs, compress(data, encoding)
+
+def decode_chunk(entry, payload, encoding):
+    data = decompress(payload, encoding) if payload is not None else b""
+    if entry["zero_runs"]:
+        # Put the zero runs back between the stored parts
+        parts = []
+        position = 0  # In the stored data
+        original = 0  # In the chunk
+        for start, length in entry["zero_runs"]:
+            parts.append(data[position:position + start - original])
+            position += start - original
+            parts.append(bytes(length))
+            original = start + length
+        parts.append(data[position:])
+        data = b"".join(parts)
+    if len(data) != entry["length"] or hashlib.sha256(data).hexdigest() != entry["sha256"]:
+        raise DumpIntegrityError(f"Chunk at offset {entry['offset']} does not match its checksum")
+    return data
+
+def pack_dump(zf, file_path, compression="deflate", progress=None, workers=None):
+    """Add a dump to an open ZipFile as checksummed chunks compressed in parallel, with a manifest to rebuild it."""
+    name = os.path.basename(file_path)
+    folder = dump_folder(name)
+    encoding = chunk_encoding(compression)
+    size = os.path.getsize(file_path)
+    workers = workers or os.cpu_count() or 1
+    manifest = {"file": name, "size": size, "chunk_size": CHUNK_SIZE, "encoding": encoding, "chunks": []}
+
+    done = 0
+    percent = -1
+    pending = collections.deque()
+    with open(file_path, 'rb') as source, concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+        offset = 0
+        while True:
+            # Keep a couple of chunks per core in flight, written in order as they finish
+            while len(pending) < workers * 2:
+                data = source.read(CHUNK_SIZE)
+                if not data:
+                    break
+                pending.append((offset, len(data), pool.submit(encode_chunk, data, encoding)))
+                offset += len(data)
+            if not pending:
+                break
+
+            chunk_offset, length, future = pending.popleft()
+            digest, runs, payload = future.result()
+            entry = {"offset": chunk_offset, "length": length, "sha256": digest, "zero_runs": runs, "member": None}
+            if payload is not None:
+                entry["member"] = f"{folder}{chunk_offset // CHUNK_SIZE:08d}.chunk"
+                zf.writestr(zipfile.ZipInfo(entry["member"]), payload, compress_type=zipfile.ZIP_STORED)
+            manifest["chunks"].append(entry)
+
+            done += length
+            if progress and done * 100 // max(size, 1) != percent:
+                percent = done * 100 // max(size, 1)
+                progress(f"Packing {name}... {percent}%")
+
+    zf.writestr(folder + MANIFEST_NAME, json.dumps(manifest))
+    zero_bytes = sum(length for entry in manifest["chunks"] for start, length in entry["zero_runs"])
+    print(f"Packed {file_path} into {len(manifest['chunks'])} chunks, {zero_bytes // (1024 * 1024)} MB of zero pages")
+    return manifest
+
+def read_manifest(zf, name):
+    return json.loads(zf.read(dump_folder(name) + MANIFEST_NAME))
+
+def iter_dump(zf, manifest, workers=None):
+    """The original bytes of a packed dump in order, every chunk checked against its hash."""
+    workers = workers or os.cpu_count() or 1
+    encoding = manifest["encoding"]
+    chunks = iter(manifest["chunks"])
+    pending = collections.deque()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+        while True:
+            while len(pending) < workers * 2:
+                entry = next(chunks, None)
+                if entry is None:
+                    break
+                payload = zf.read(entry["member"]) if entry["member"] else None
+                pending.append(pool.submit(decode_chunk, entry, payload, encoding))
+            if not pending:
+                break
+            yield pending.popleft().result()
+
+def extract_dump(zip_path, name, target_path, progress=None):
+    """Rebuild a packed dump as a file, written under a temporary name until every chunk checked out."""
+    partial = target_path + ".partial"
+    with zipfile.ZipFile(zip_path) as zf:
+        manifest = read_manifest(zf, name)
+        done = 0
+        percent = -1
+        try:
+            with open(partial, 'wb') as output:
+                for data in iter_dump(zf, manifest):
+                    output.write(data)
+                    done += len(data)
+                    if progress and done * 100 // max(manifest["size"], 1) != percent:
+                        percent = done * 100 // max(manifest["size"], 1)
+                        progress(f"Unpacking {name}... {percent}%")
+        except BaseException:
+            os.remove(partial)
+            raise
+    os.replace(partial, target_path)
+    return target_path
+
+def verify_dump(zip_path, name):
+    """True when every chunk of a packed dump decompresses to the bytes it was hashed from."""
+    with zipfile.ZipFile(zip_path) as zf:
+        manifest = read_manifest(zf, name)
+        try:
+            size = sum(len(data) for data in iter_dump(zf, manifest))
+        except (DumpIntegrityError, zlib.error, lzma.LZMAError, KeyError):
+            return False
+    return size == manifest["size"]
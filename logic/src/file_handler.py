@@ -1,9 +1,16 @@
 import os
+import threading
+from logic.src.fingerprint import sampled_fingerprint, full_hash
+
+ALLOWED_FILE_TYPES = ['.dmp', '.raw', '.mem', '.bin', '.vmem', '.mddramimage', '.winddramimage']
 
 class FileHandler:
     def __init__(self):
         self.loaded_files = []
         self.selected_file = None  # Changed to None for clarity
+        self.selected_files = []  # Indexes of every file selected in the sidebar, selected_file is the first of them
+        self.file_records = {}  # file path -> size, fingerprint and (once computed) full hash
+        self.journal = None  # SessionJournal that records loaded and removed files
         print(f"\nInitialized FileHandler with loaded_files: {self.loaded_files} and selected_file: {self.selected_file}\n")
 
 
@@ -18,6 +25,10 @@ class FileHandler:
         if 0 <= index < len(self.loaded_files):
             removed_file = self.loaded_files[index]
             del self.loaded_files[index]
+            self.file_records.pop(removed_file, None)
+            self.selected_files = []
+            if self.journal:
+                self.journal.record("file_removed", path=removed_file)
             print(f"\nRemoved file at index {index}: {removed_file}. Updated loaded_files: {self.loaded_files}\n")
             if self.selected_file is not None and self.selected_file >= len(self.loaded_files):
                 self.selected_file = max(0, len(self.loaded_files) - 1)
@@ -26,11 +37,54 @@ class FileHandler:
             print(f"\nAttempted to remove file at index {index}, which is out of range.\n")
             raise IndexError("Index out of range")
 
-    def load_files(self, file_path):
+    def load_files(self, file_path, compute_full_hash=False):
+        # False when the same dump is already loaded, a file that can't be read raises its OSError
+        fingerprint = sampled_fingerprint(file_path)
+        duplicate = self.find_by_fingerprint(fingerprint)
+        if duplicate is not None:
+            print(f"\n{file_path} has the same fingerprint as the already loaded {duplicate}, not loading it again\n")
+            return False
+
         self.loaded_files.append(file_path)
+        self.file_records[file_path] = {
+            "size": os.path.getsize(file_path),
+            "fingerprint": fingerprint,
+            "full_hash": None
+        }
+        if self.journal:
+            self.journal.record("file_loaded", path=file_path)
+        if compute_full_hash:
+            threading.Thread(target=self.compute_full_hash, args=(file_path,), daemon=True).start()
         if self.loaded_files:
             self.selected_file = len(self.loaded_files) - 1  # Ensure selected_file is set to the last loaded file
-        print(f"\nLoaded files: {self.loaded_files}. Updated loaded_files: {self.loaded_files}. Selected file: {self.get_selected_file()}\n")
+        print(f"\nLoaded files: {self.loaded_files}. Updated loaded_files: {self.loaded_files}. Selected file: {self.get_selected_file()}, fingerprint: {fingerprint}\n")
+        return True
+
+    def compute_full_hash(self, file_path):
+        try:
+            file_hash = full_hash(file_path)
+        except OSError as e:
+            print(f"\nCould not hash {file_path}: {e}\n")
+            return
+        record = self.file_records.get(file_path)
+        if record is not None:
+            record["full_hash"] = file_hash
+            print(f"\nFull hash of {file_path}: {file_hash}\n")
+
+    def find_by_fingerprint(self, fingerprint):
+        for file_path in self.loaded_files:
+            record = self.file_records.get(file_path)
+            if record and record["fingerprint"] == fingerprint:
+                return file_path
+        return None
+
+    def get_fingerprint(self, file_path):
+        # The sampled fingerprint is stable for the life of the file, so cache keys don't change when a full hash arrives
+        record = self.file_records.get(file_path)
+        if record is None:
+            record = {"fingerprint": sampled_fingerprint(file_path), "full_hash": None}
+            self.file_records[file_path] = record
+        return record["fingerprint"]
 
     def get_selected_file(self):
         #return the path the selected file
@@ -42,6 +96,15 @@ class FileHandler:
             print(f"\nget_selected_file called. Result: None\n")
             return None
 
+    def get_selected_files(self):
+        # Paths of all selected files, falls back to the single selected file
+        selected = [self.loaded_files[index] for index in self.selected_files if 0 <= index < len(self.loaded_files)]
+        if not selected:
+            selected_file = self.get_selected_file()
+            if selected_file:
+                selected = [selected_file]
+        return selected
+
     def get_loaded_files(self):
         print(f"\nget_loaded_files called. Result: {self.loaded_files}\n")
         return self.loaded_files
@@ -0,0 +1,56 @@
+import os
+
+if os.name == 'nt':
+    import msvcrt
+else:
+    import fcntl
+
+class FileLock:
+    """An advisory lock on a file, shared between the GUI, 'volgui run' and 'volgui serve'.
+
+    with FileLock(path): blocks until the lock is free, try_acquire() returns False instead of waiting.
+    The lock goes away with the process, so a crash never leaves it held.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+
+    def acquire(self, blocking=True):
+        self.file = open(self.path, 'a+')
+        try:
+            if os.name == 'nt':
+                self.file.seek(0)
+                mode = msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK
+                msvcrt.locking(self.file.fileno(), mode, 1)
+            else:
+                fcntl.flock(self.file.fileno(), fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+        except OSError:
+            self.file.close()
+            self.file = None
+            if blocking:
+                raise
+            return False
+        return True
+
+    def try_acquire(self):
+        return self.acquire(blocking=False)
+
+    def release(self):
+        if self.file is None:
+            return
+        try:
+            if os.name == 'nt':
+                self.file.seek(0)
+                msvcrt.locking(self.file.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(self.file.fileno(), fcntl.LOCK_UN)
+        finally:
+            self.file.close()
+            self.file = None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
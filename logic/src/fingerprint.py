@@ -0,0 +1,47 @@
+import hashlib
+import mmap
+import os
+
+SAMPLE_BLOCK_SIZE = 64 * 1024  # Bytes hashed at every sample point
+INTERIOR_SAMPLES = 62  # Evenly spaced samples between the header and the tail
+PAGE_SIZE = 4096
+FULL_HASH_CHUNK_SIZE = 4 * 1024 * 1024
+
+def sample_offsets(size):
+    """Header, tail and strided interior offsets, page aligned so they land on the same data every time."""
+    if size <= SAMPLE_BLOCK_SIZE * (INTERIOR_SAMPLES + 2):
+        return [0]  # Small files are hashed completely
+    offsets = [0]
+    for i in range(1, INTERIOR_SAMPLES + 1):
+        offset = size * i // (INTERIOR_SAMPLES + 1)
+        offsets.append(offset - offset % PAGE_SIZE)
+    offsets.append(size - SAMPLE_BLOCK_SIZE)
+    return offsets
+
+def sampled_fingerprint(file_path):
+    """Cheap identity of a dump: size, mtime and a fixed set of sampled blocks, takes milliseconds for any size."""
+    stat = os.stat(file_path)
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(f"{stat.st_size}:{stat.st_mtime_ns}".encode('utf-8'))
+
+    if stat.st_size > 0:
+        with open(file_path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            offsets = sample_offsets(stat.st_size)
+            if offsets == [0]:
+                digest.update(data[:])
+            else:
+                for offset in offsets:
+                    digest.update(data[offset:offset + SAMPLE_BLOCK_SIZE])
+
+    return "sampled:" + digest.hexdigest()
+
+def full_hash(file_path):
+    """SHA-256 of the whole file, slow on multi-GB dumps so run it in the background."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        while True:
+            chunk = file.read(FULL_HASH_CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return "sha256:" + digest.hexdigest()
@@ -0,0 +1,305 @@
+import atexit
+import collections
+import concurrent.futures
+import itertools
+import os
+import signal
+import subprocess
+import threading
+import time
+from logic.src.system_resources import cpu_count, total_memory, available_memory
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+PRIORITY_NAMES = {PRIORITY_HIGH: "high", PRIORITY_NORMAL: "normal", PRIORITY_LOW: "low"}
+
+MB = 1024 * 1024
+DEFAULT_COST = {"memory_mb": 512, "cpu": 1}
+# Rough peak memory of a plugin run, commands.json entries can override these with "memory_mb" and "cpu"
+PLUGIN_COST_HINTS = {
+    "windows.malfind": {"memory_mb": 4096, "cpu": 1},
+    "windows.vaddump": {"memory_mb": 4096, "cpu": 1},
+    "windows.memmap": {"memory_mb": 2048, "cpu": 1},
+    "windows.handles": {"memory_mb": 1536, "cpu": 1},
+    "windows.netscan": {"memory_mb": 1024, "cpu": 1},
+    "filescan": {"memory_mb": 1536, "cpu": 1},
+    "windows.info": {"memory_mb": 256, "cpu": 1},
+    "windows.pslist": {"memory_mb": 256, "cpu": 1},
+    "windows.pstree": {"memory_mb": 256, "cpu": 1},
+    "windows.cmdline": {"memory_mb": 256, "cpu": 1},
+}
+MEMORY_LIMIT_FRACTION = 0.8  # Share of physical memory the scheduler hands out when no limit is configured
+MAX_BACKFILL_WAIT = 120  # Seconds a blocked job can be overtaken by smaller ones before the queue waits for it
+FINISHED_HISTORY = 200
+KILL_GRACE_PERIOD = 3  # Seconds a cancelled process group gets to exit before it is killed
+
+current = threading.local()
+
+def current_job():
+    """The job the calling thread is running for, None outside the scheduler."""
+    return getattr(current, "job", None)
+
+def process_group_options():
+    # Popen options that put the command in its own process group, so cancelling also stops its children
+    if os.name == 'nt':
+        return {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+    return {"start_new_session": True}
+
+def kill_process_tree(process):
+    if process.poll() is not None:
+        return
+    if os.name == 'nt':
+        subprocess.run(['taskkill', '/F', '/T', '/PID', str(process.pid)], capture_output=True)
+        return
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+    except ProcessLookupError:
+        return
+
+    def force_kill():
+        if process.poll() is None:
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+    threading.Timer(KILL_GRACE_PERIOD, force_kill).start()
+
+class JobCancelled(Exception):
+    pass
+
+def get_cost_hint(command, commands=None):
+    cost = dict(DEFAULT_COST)
+    cost.update(PLUGIN_COST_HINTS.get(command, {}))
+    for entry in commands or []:
+        if entry.get('command') == command:
+            cost.update({key: entry[key] for key in ("memory_mb", "cpu") if key in entry})
+    return cost
+
+class Job:
+    def __init__(self, job_id, fn, args, kwargs, name, dump, priority, memory, cpu, exclusive, timeout):
+        self.id = job_id
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.name = name
+        self.dump = dump
+        self.priority = priority
+        self.memory = memory
+        self.cpu = cpu
+        self.exclusive = exclusive  # Jobs sharing this key never run at the same time (e.g. one warm worker per dump)
+        self.state = "pending"
+        self.error = None
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+        self.future = concurrent.futures.Future()
+        self.timeout = timeout  # Seconds, None or 0 for no limit
+        self.process = None
+        self.process_group = False
+        self.cancel_requested = False
+        self.cancel_reason = None
+
+    def attach_process(self, process, group=True):
+        """Remember the process doing the work, group=True when it leads its own process group."""
+        self.process = process
+        self.process_group = group
+        if self.cancel_requested:
+            self.kill_process()
+
+    def detach_process(self):
+        self.process = None
+
+    def cancel(self, reason="Cancelled by user."):
+        if self.future.cancel():
+            self.cancel_reason = reason
+            return True  # Hadn't started yet
+        if self.state != "running":
+            return False
+        self.cancel_requested = True
+        self.cancel_reason = reason
+        self.kill_process()
+        return True
+
+    def kill_process(self):
+        process = self.process
+        if process is None:
+            return
+        if self.process_group:
+            kill_process_tree(process)
+        else:
+            process.terminate()
+
+    def check_cancelled(self):
+        # For work that runs inside this process, where there is nothing to kill
+        if self.cancel_requested:
+            raise JobCancelled(self.cancel_reason)
+
+    def timed_out(self):
+        return bool(self.timeout) and self.started is not None and time.time() - self.started > self.timeout
+
+    def runtime(self):
+        if self.started is None:
+            return 0
+        return (self.finished or time.time()) - self.started
+
+class JobScheduler:
+    """Runs jobs by priority while the running ones fit in the CPU count and the memory budget."""
+    def __init__(self, max_workers=None, memory_limit=None):
+        self.max_workers = max_workers or cpu_count()
+        self.memory_limit = memory_limit or int(total_memory() * MEMORY_LIMIT_FRACTION) or None  # None when the RAM size is unknown
+        self.pending = []
+        self.running = {}
+        self.finished = collections.deque(maxlen=FINISHED_HISTORY)
+        self.ids = itertools.count(1)
+        self.condition = threading.Condition()
+        self.shutting_down = False
+        self.pool = concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="job")
+        self.dispatcher = threading.Thread(target=self.dispatch_loop, name="job-dispatcher", daemon=True)
+        self.dispatcher.start()
+        atexit.register(self.shutdown)  # Don't leave plugin processes behind when VolGUI exits
+
+    def submit(self, fn, *args, **kwargs):
+        # Same call signature as ThreadPoolExecutor.submit, for jobs that don't need scheduling hints
+        return self.submit_job(fn, *args, **kwargs).future
+
+    def submit_job(self, fn, *args, name=None, dump=None, priority=PRIORITY_NORMAL, cost=None, exclusive=None, timeout=None, **kwargs):
+        cost = cost or DEFAULT_COST
+        with self.condition:
+            job = Job(next(self.ids), fn, args, kwargs, name or fn.__name__, dump, priority, cost["memory_mb"] * MB, cost["cpu"], exclusive, timeout)
+            self.pending.append(job)
+            self.condition.notify_all()
+        return job
+
+    def set_priority(self, job_id, priority):
+        with self.condition:
+            for job in self.pending:
+                if job.id == job_id:
+                    job.priority = priority
+                    self.condition.notify_all()
+                    return True
+        return False
+
+    def set_timeout(self, job_id, timeout):
+        job = self.find_job(job_id)
+        if job is None or job.state not in ("pending", "running"):
+            return False
+        job.timeout = timeout or None
+        return True
+
+    def find_job(self, job_id):
+        for job in self.jobs():
+            if job.id == job_id:
+                return job
+        return None
+
+    def cancel_job(self, job_id, reason="Cancelled by user."):
+        job = self.find_job(job_id)
+        if job is None:
+            return False
+        with self.condition:
+            cancelled = job.cancel(reason)
+            self.condition.notify_all()
+        return cancelled
+
+    def cancel_all(self, reason="Cancelled because VolGUI is closing."):
+        with self.condition:
+            for job in self.ordered_pending() + list(self.running.values()):
+                job.cancel(reason)
+            self.condition.notify_all()
+
+    def check_timeouts(self):
+        for job in list(self.running.values()):
+            if job.timed_out() and not job.cancel_requested:
+                print(f"Job {job.id} ({job.name}) timed out after {job.timeout} s")
+                job.cancel(f"Timed out after {job.timeout} s.")
+
+    def jobs(self):
+        """Snapshot of every pending, running and recently finished job for display."""
+        with self.condition:
+            return self.ordered_pending() + list(self.running.values()) + list(self.finished)
+
+    def ordered_pending(self):
+        return sorted(self.pending, key=lambda job: (job.priority, job.id))
+
+    def is_exclusive_blocked(self, job):
+        return job.exclusive is not None and any(running.exclusive == job.exclusive for running in self.running.values())
+
+    def can_admit(self, job):
+        if not self.running:
+            return True  # Always let one job run, even one bigger than the budget
+        if sum(running.cpu for running in self.running.values()) + job.cpu > self.max_workers:
+            return False
+        if self.memory_limit and sum(running.memory for running in self.running.values()) + job.memory > self.memory_limit:
+            return False
+        free_memory = available_memory()
+        if free_memory and job.memory > free_memory:
+            return False  # Something outside VolGUI is using the memory we planned with
+        return True
+
+    def next_job(self):
+        now = time.time()
+        self.check_timeouts()
+        for job in self.ordered_pending():
+            if job.future.cancelled():
+                self.pending.remove(job)
+                job.state = "cancelled"
+                job.finished = now
+                self.finished.appendleft(job)
+                continue
+            if self.is_exclusive_blocked(job):
+                continue
+            if self.can_admit(job):
+                return job
+            if now - job.submitted > MAX_BACKFILL_WAIT:
+                return None  # Stop smaller jobs from starving this one
+        return None
+
+    def dispatch_loop(self):
+        while True:
+            with self.condition:
+                job = self.next_job()
+                while job is None and not self.shutting_down:
+                    # Wake up now and then, memory used by other programs may have been freed
+                    self.condition.wait(1)
+                    job = self.next_job()
+                if self.shutting_down:
+                    return
+                self.pending.remove(job)
+                if not job.future.set_running_or_notify_cancel():
+                    job.state = "cancelled"
+                    self.finished.appendleft(job)
+                    continue
+                job.state = "running"
+                job.started = time.time()
+                self.running[job.id] = job
+            self.pool.submit(self.run_job, job)
+
+    def run_job(self, job):
+        current.job = job
+        try:
+            result = job.fn(*job.args, **job.kwargs)
+        except BaseException as e:
+            job.state = "failed"
+            job.error = str(e)
+            job.future.set_exception(e)
+        else:
+            job.state = "finished"
+            job.future.set_result(result)
+        finally:
+            current.job = None
+            job.detach_process()
+            with self.condition:
+                job.finished = time.time()
+                self.running.pop(job.id, None)
+                self.finished.appendleft(job)
+                self.condition.notify_all()
+
+    def shutdown(self, wait=False):
+        if self.shutting_down:
+            return
+        self.cancel_all()
+        with self.condition:
+            self.shutting_down = True
+            self.condition.notify_all()
+        self.pool.shutdown(wait=wait)
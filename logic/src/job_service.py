@@ -0,0 +1,421 @@
+import hmac
+import itertools
+import json
+import os
+import secrets
+import shlex
+import socketserver
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from logic.src.job_scheduler import PRIORITY_NAMES, MB
+from logic.src.profiles import load_profiles, find_profile, get_stages, missing_commands
+from logic.src.package_writer import write_package, DEFAULT_COMPRESSION
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_MAX_PENDING = 64  # Commands waiting or running before new submissions are turned away
+RETRY_AFTER = 5  # Seconds a client turned away is asked to wait
+STREAM_POLL_INTERVAL = 0.2  # Seconds between checks for new rows of a running result
+FINISHED_RUNS = 200  # Finished runs kept for status and downloads
+TOKEN_FILE = os.path.join('.volgui_cache', 'service', 'token')  # Clients prove they may use the service with its contents
+LOCAL_HOSTS = {"localhost", "127.0.0.1", "[::1]"}  # Host headers accepted besides the address the service listens on
+PRIORITIES = {name: priority for priority, name in PRIORITY_NAMES.items()}
+
+def create_token(path=TOKEN_FILE):
+    """A new token for this start of the service, in a file only the current user can read."""
+    token = secrets.token_urlsafe(32)
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    temp_path = path + '.tmp'
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
+    descriptor = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(descriptor, 'w') as file:
+        file.write(token)
+    os.replace(temp_path, path)
+    return token
+
+def read_token(path=TOKEN_FILE):
+    try:
+        with open(path, 'r') as file:
+            return file.read().strip() or None
+    except OSError:
+        return None
+
+class ServiceError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+def check_step(step):
+    """A step of a submission has to be a command name, or an object with a "command" and optional "parameters" string."""
+    if isinstance(step, dict):
+        command, parameters = step.get("command"), step.get("parameters", "")
+    else:
+        command, parameters = step, ""
+    if not isinstance(command, str) or not isinstance(parameters, str):
+        raise ServiceError(400, "Commands and their parameters must be strings")
+
+class ServiceRun:
+    """One submission: a dump and the stages to run on it."""
+    def __init__(self, run_id, dump, stages):
+        self.id = run_id
+        self.dump = dump
+        self.stages = stages
+        self.pipeline = None
+        self.submitted = time.time()
+        self.finished = None
+
+    def results(self):
+        return list(self.pipeline["results"]) if self.pipeline else []
+
+    def state(self):
+        if self.finished:
+            return "failed" if any(result.error for result in self.results()) else "finished"
+        return "running" if any(result.state() == "running" for result in self.results()) else "pending"
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "dump": self.dump,
+            "state": self.state(),
+            "submitted": self.submitted,
+            "finished": self.finished,
+            "results": [
+                {
+                    "index": index,
+                    "command": result.command,
+                    "parameters": result.parameters,
+                    "job": result.job.id if result.job else None,
+                    "state": result.state(),
+                    "rows": len(result.table),
+                    "cached": result.cached,
+                    "error": result.error
+                }
+                for index, result in enumerate(self.results())
+            ]
+        }
+
+class JobService:
+    """Takes runs over HTTP and hands them to a BatchRunner, so they share its scheduler and the result cache."""
+    def __init__(self, runner, max_pending=DEFAULT_MAX_PENDING, profiles_file=None):
+        self.runner = runner
+        self.max_pending = max_pending
+        self.profiles_file = profiles_file
+        self.runs = {}
+        self.ids = itertools.count(1)
+        self.lock = threading.Lock()
+
+    def pending_jobs(self):
+        return len(self.runner.scheduler.pending)
+
+    def outstanding(self):
+        """Commands of unfinished runs that haven't finished, including the ones in stages not started yet."""
+        count = 0
+        for run in list(self.runs.values()):
+            if not run.finished:
+                count += sum(len(stage) for stage in run.stages) - sum(1 for result in run.results() if result.done.is_set())
+        return count
+
+    def stages_for(self, request):
+        """The stages a submission asks for: a "profile", a "command" with "parameters", or a list of "commands"."""
+        commands = self.runner.commands
+        if request.get("profile"):
+            if not isinstance(request["profile"], str):
+                raise ServiceError(400, "\"profile\" must be a string")
+            profiles = load_profiles(self.profiles_file) if self.profiles_file else load_profiles()
+            profile = find_profile(profiles, request["profile"])
+            if profile is None:
+                raise ServiceError(404, f"Profile {request['profile']} not found")
+        elif request.get("command"):
+            check_step({"command": request["command"], "parameters": request.get("parameters", "")})
+            profile = {"stages": [[{"command": request["command"], "parameters": request.get("parameters", "")}]]}
+        elif request.get("commands"):
+            if not isinstance(request["commands"], list):
+                raise ServiceError(400, "\"commands\" must be a list of command names or {\"command\", \"parameters\"} objects")
+            for step in request["commands"]:
+                check_step(step)
+            profile = {"stages": [request["commands"]]}
+        else:
+            raise ServiceError(400, "Give a profile, a command or a list of commands")
+
+        missing = missing_commands(profile, commands)  # Custom command lines are never run for a client
+        if missing:
+            raise ServiceError(400, f"Commands that are not in commands.json: {', '.join(missing)}")
+        stages = get_stages(profile)
+        for stage in stages:
+            for command, parameters in stage:
+                try:
+                    shlex.split(parameters or "")  # vol.py gets them as separate arguments, never through a shell
+                except ValueError as e:
+                    raise ServiceError(400, f"Could not read the parameters of {command}: {e}")
+        return stages
+
+    def submit(self, request):
+        dump = request.get("dump")
+        if not isinstance(dump, str) or not os.path.isfile(dump):
+            raise ServiceError(400, f"Not a file: {dump}")
+        stages = self.stages_for(request)
+        with self.lock:
+            # Backpressure: the queue stays bounded, the client is asked to come back later
+            outstanding = self.outstanding()
+            if outstanding and outstanding + sum(len(stage) for stage in stages) > self.max_pending:
+                raise ServiceError(429, f"{outstanding} commands are queued or running, try again later")
+            run = ServiceRun(next(self.ids), os.path.abspath(dump), stages)
+            self.runs[run.id] = run
+            self.forget_old_runs()
+        run.pipeline = self.runner.start(run.dump, stages, on_finished=lambda pipeline, r=run: self.run_finished(r))
+        print(f"Service run {run.id}: {sum(len(stage) for stage in stages)} commands on {run.dump}")
+        return run
+
+    def run_finished(self, run):
+        run.finished = time.time()
+
+    def forget_old_runs(self):
+        finished = [run for run in self.runs.values() if run.finished]
+        for run in sorted(finished, key=lambda run: run.finished)[:max(0, len(finished) - FINISHED_RUNS)]:
+            del self.runs[run.id]
+
+    def get_run(self, run_id):
+        run = self.runs.get(run_id)
+        if run is None:
+            raise ServiceError(404, f"No run {run_id}")
+        return run
+
+    def get_result(self, run_id, index):
+        results = self.get_run(run_id).results()
+        if index >= len(results):
+            raise ServiceError(404, f"Run {run_id} has no result {index} yet")
+        return results[index]
+
+    def cancel_run(self, run_id):
+        run = self.get_run(run_id)
+        if run.pipeline is None:
+            return run
+        run.stages = run.pipeline["stages"] = run.pipeline["stages"][:run.pipeline["stage"]]  # Later stages are never started
+        for result in run.results():
+            if result.job and not result.done.is_set():
+                self.runner.scheduler.cancel_job(result.job.id, "Cancelled by the client.")
+        return run
+
+    def write_package(self, run, zip_path):
+        commands = [{"command": result.command, "highlights": [], "chunks": result.chunks} for result in run.results()]
+        write_package(zip_path, commands, compression=self.runner.settings.get('export_compression', DEFAULT_COMPRESSION))
+
+    def status(self):
+        scheduler = self.runner.scheduler
+        return {
+            "max_workers": scheduler.max_workers,
+            "memory_limit_mb": scheduler.memory_limit // MB if scheduler.memory_limit else "unknown",
+            "pending": self.pending_jobs(),
+            "outstanding": self.outstanding(),
+            "running": len(scheduler.running),
+            "max_pending": self.max_pending,
+            "runs": len(self.runs)
+        }
+
+    def jobs(self):
+        """The scheduler's jobs the way the Job Queue window shows them."""
+        return [
+            {
+                "id": job.id,
+                "name": job.name,
+                "dump": job.dump,
+                "priority": PRIORITY_NAMES.get(job.priority, job.priority),
+                "state": job.state,
+                "memory_mb": job.memory // MB,
+                "runtime": job.runtime(),
+                "started": job.started,
+                "timeout": job.timeout,
+                "cancel_requested": job.cancel_requested
+            }
+            for job in self.runner.scheduler.jobs()
+        ]
+
+def iter_live(result, jsonl=False):
+    """The text (or jsonl rows) of a result, rows of a running command are passed on as they come in."""
+    sent = 0
+    header_sent = False
+    while True:
+        finished = result.done.is_set()
+        table = result.table
+        if table.columns is not None:
+            if not header_sent and not jsonl:
+                yield table.header_text()
+            header_sent = True
+            count = len(table)
+            if count > sent:
+                if jsonl:
+                    yield "".join(json.dumps(dict(zip(table.columns, table.row(index)), __depth=table.depths[index])) + "\n" for index in range(sent, count))
+                else:
+                    yield "".join(table.format_row(index) for index in range(sent, count))
+                sent = count
+        if finished:
+            break
+        result.done.wait(STREAM_POLL_INTERVAL)
+    if not jsonl:
+        if not header_sent and not result.notes:
+            yield "No output received."
+        yield "".join(result.notes)
+
+class ServiceRequestHandler(BaseHTTPRequestHandler):
+    server_version = "VolGUI"
+    protocol_version = "HTTP/1.1"  # Keep-alive and chunked result streams
+
+    def address_string(self):
+        # Unix socket clients have no host and port
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    def log_message(self, format, *args):
+        print(f"Service {self.address_string()}: {format % args}")
+
+    def do_GET(self):
+        self.handle_request("GET")
+
+    def do_POST(self):
+        self.handle_request("POST")
+
+    def do_DELETE(self):
+        self.handle_request("DELETE")
+
+    def check_request(self, method):
+        """Turn away anything a web page in the analyst's browser could send, and clients without the token."""
+        if self.headers.get("Origin") is not None:
+            raise ServiceError(403, "Requests from web pages are not accepted")
+        host = (self.headers.get("Host") or "").lower()
+        if host.startswith("["):
+            host = host[:host.index("]") + 1] if "]" in host else host
+        else:
+            host = host.rsplit(":", 1)[0]
+        if host not in LOCAL_HOSTS and host != self.server.host:
+            raise ServiceError(403, f"Unexpected Host {host}")  # DNS rebinding
+        token = self.headers.get("Authorization", "")
+        if not token.startswith("Bearer ") or not hmac.compare_digest(token[len("Bearer "):].encode('utf-8'), self.server.token.encode('utf-8')):
+            raise ServiceError(401, f"Missing or wrong token, it is in {self.server.token_file}")
+        if method == "POST" and (self.headers.get("Content-Type") or "").split(";")[0].strip().lower() != "application/json":
+            raise ServiceError(415, "Send the request body as application/json")
+
+    def handle_request(self, method):
+        url = urlparse(self.path)
+        parts = [part for part in url.path.split("/") if part]
+        service = self.server.service
+        try:
+            self.check_request(method)
+            if method == "GET" and parts == ["status"]:
+                return self.send_json(200, service.status())
+            if method == "GET" and parts == ["jobs"]:
+                return self.send_json(200, service.jobs())
+            if method == "POST" and len(parts) == 3 and parts[0] == "jobs":
+                return self.change_job(int(parts[1]), parts[2], self.read_json())
+            if method == "GET" and parts == ["runs"]:
+                return self.send_json(200, [run.to_dict() for run in list(service.runs.values())])
+            if method == "POST" and parts == ["runs"]:
+                run = service.submit(self.read_json())
+                return self.send_json(202, run.to_dict())
+            if len(parts) >= 2 and parts[0] == "runs":
+                run_id = int(parts[1])
+                if method == "GET" and len(parts) == 2:
+                    return self.send_json(200, service.get_run(run_id).to_dict())
+                if method == "DELETE" and len(parts) == 2:
+                    return self.send_json(200, service.cancel_run(run_id).to_dict())
+                if method == "GET" and len(parts) == 4 and parts[2] == "results":
+                    jsonl = parse_qs(url.query).get("format", ["text"])[0] == "jsonl"
+                    return self.send_stream(iter_live(service.get_result(run_id, int(parts[3])), jsonl), "application/x-ndjson" if jsonl else "text/plain; charset=utf-8")
+                if method == "GET" and parts[2:] == ["package"]:
+                    return self.send_package(service.get_run(run_id))
+            raise ServiceError(404, f"No such endpoint: {method} {url.path}")
+        except ServiceError as e:
+            if e.status in (401, 403, 415):
+                self.close_connection = True  # The body was never read, it can't be the next request
+            self.send_json(e.status, {"error": str(e)})
+        except (ValueError, KeyError, TypeError) as e:
+            self.send_json(400, {"error": f"Bad request: {e}"})
+
+    def change_job(self, job_id, action, body):
+        scheduler = self.server.service.runner.scheduler
+        if action == "cancel":
+            changed = scheduler.cancel_job(job_id, "Cancelled by the client.")
+        elif action == "priority":
+            if body.get("priority") not in PRIORITIES:
+                raise ServiceError(400, f"Priority must be one of {', '.join(PRIORITIES)}")
+            changed = scheduler.set_priority(job_id, PRIORITIES[body["priority"]])
+        elif action == "timeout":
+            changed = scheduler.set_timeout(job_id, int(body.get("timeout") or 0))
+        else:
+            raise ServiceError(404, f"Unknown job action {action}")
+        self.send_json(200, {"id": job_id, "changed": changed})
+
+    def read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        body = json.loads(self.rfile.read(length))
+        if not isinstance(body, dict):
+            raise ServiceError(400, "The request body must be a JSON object")
+        return body
+
+    def send_json(self, status, data):
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if status == 429:
+            self.send_header("Retry-After", str(RETRY_AFTER))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_stream(self, chunks, content_type):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for chunk in chunks:
+            data = chunk.encode('utf-8')
+            if data:
+                self.wfile.write(f"{len(data):x}\r\n".encode('ascii') + data + b"\r\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def send_package(self, run):
+        if not run.finished:
+            raise ServiceError(409, f"Run {run.id} is still {run.state()}")
+        handle, zip_path = tempfile.mkstemp(suffix=".zip")
+        os.close(handle)
+        try:
+            self.server.service.write_package(run, zip_path)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/zip")
+            self.send_header("Content-Length", str(os.path.getsize(zip_path)))
+            self.send_header("Content-Disposition", f'attachment; filename="run_{run.id}.zip"')
+            self.end_headers()
+            with open(zip_path, 'rb') as file:
+                while True:
+                    data = file.read(1024 * 1024)
+                    if not data:
+                        break
+                    self.wfile.write(data)
+        finally:
+            os.remove(zip_path)
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+def start_server(service, host=DEFAULT_HOST, port=DEFAULT_PORT, socket_path=None, token_file=TOKEN_FILE):
+    """An HTTP server for the service on host:port (localhost by default) or a Unix socket, serve_forever() runs it.
+
+    Every start writes a new token to token_file, requests have to send it as "Authorization: Bearer <token>".
+    """
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)  # Left behind by an earlier run
+        server = UnixHTTPServer(socket_path, ServiceRequestHandler)
+        os.chmod(socket_path, 0o600)  # Only this user can submit jobs
+    else:
+        server = ThreadingHTTPServer((host, port), ServiceRequestHandler)
+        server.daemon_threads = True
+    server.service = service
+    server.host = "localhost" if socket_path else host.lower()
+    server.token_file = token_file
+    server.token = create_token(token_file)
+    return server
@@ -0,0 +1,42 @@
+import codecs
+import json
+import shutil
+import zipfile
+from logic.src.dump_packer import extract_dump
+
+READ_CHUNK_SIZE = 256 * 1024
+
+def read_metadata(zip_path):
+    """metadata.json of an exported package, only the zip directory and that one member are read."""
+    with zipfile.ZipFile(zip_path) as zf:
+        metadata = json.loads(zf.read("metadata.json"))
+    if not isinstance(metadata.get("commands"), list):
+        raise ValueError("metadata.json has no list of commands")
+    for number, entry in enumerate(metadata["commands"], 1):
+        if not isinstance(entry, dict) or not isinstance(entry.get("command"), str) or not isinstance(entry.get("output_file"), str):
+            raise ValueError(f"command {number} of metadata.json has no command name or output file")
+        if not isinstance(entry.get("highlights", []), list):
+            raise ValueError(f"the highlights of command {number} in metadata.json are not a list")
+    return metadata
+
+def iter_output(zip_path, member):
+    """Text of one output member in decoded chunks, straight from the archive."""
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    with zipfile.ZipFile(zip_path) as zf, zf.open(member) as source:
+        while True:
+            data = source.read(READ_CHUNK_SIZE)
+            if not data:
+                break
+            yield decoder.decode(data)
+    yield decoder.decode(b"", final=True)
+
+def extract_package_dump(zip_path, metadata, target_path, progress=None):
+    """Write the memory dump of a package to target_path, from its chunks or (older packages) a plain member."""
+    name = metadata.get("memory_dump_file")
+    if not name:
+        raise ValueError("The package does not include a memory dump")
+    if metadata.get("memory_dump_folder"):
+        return extract_dump(zip_path, name, target_path, progress)
+    with zipfile.ZipFile(zip_path) as zf, zf.open(name) as source, open(target_path, 'wb') as output:
+        shutil.copyfileobj(source, output, READ_CHUNK_SIZE)
+    return target_path
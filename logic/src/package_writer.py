@@ -0,0 +1,70 @@
+import json
+import os
+import zipfile
+from logic.src.dump_packer import pack_dump, dump_folder
+
+COMPRESSION_METHODS = {"deflate": zipfile.ZIP_DEFLATED, "lzma": zipfile.ZIP_LZMA, "store": zipfile.ZIP_STORED}
+DEFAULT_COMPRESSION = "deflate"
+
+def output_file_names(commands):
+    """windows_pslist.txt style names, numbered when the same plugin ran more than once."""
+    names = []
+    used = set()
+    for command in commands:
+        base = command['command'].replace('.', '_').replace(' ', '_')
+        if command.get("dump"):
+            base = os.path.splitext(command["dump"])[0] + "_" + base  # Packages of several dumps
+        name = f"{base}.txt"
+        number = 2
+        while name in used:
+            name = f"{base}_{number}.txt"
+            number += 1
+        used.add(name)
+        names.append(name)
+    return names
+
+def write_package(zip_path, commands, memory_dump_file=None, include_highlighting=True, compression=DEFAULT_COMPRESSION, progress=None):
+    """Stream the outputs, metadata.json and optionally the dump (packed in parallel chunks) straight into a zip.
+
+    Each command is a dict with "command", "highlights" and "chunks", a callable returning the output text in
+    pieces (e.g. TextStore.read_chunks or ResultTable.iter_text), and optionally the name of the "dump" it ran on.
+    progress is called with a status message.
+    """
+    method = COMPRESSION_METHODS.get(compression, zipfile.ZIP_DEFLATED)
+    names = output_file_names(commands)
+    entries = []
+    for command, name in zip(commands, names):
+        entry = {
+            "command": command["command"],
+            "highlights": command.get("highlights", []) if include_highlighting else [],
+            "output_file": name
+        }
+        if command.get("dump"):
+            entry["dump"] = command["dump"]
+        entries.append(entry)
+    metadata = {
+        "memory_dump_file": os.path.basename(memory_dump_file) if memory_dump_file else None,
+        # The dump is stored as checksummed chunks with a manifest, see dump_packer
+        "memory_dump_folder": dump_folder(os.path.basename(memory_dump_file)) if memory_dump_file else None,
+        "commands": entries
+    }
+
+    try:
+        with zipfile.ZipFile(zip_path, 'w', compression=method, allowZip64=True) as zf:
+            # metadata.json first, so a reader finds the table of contents without scanning the archive
+            zf.writestr("metadata.json", json.dumps(metadata, indent=4))
+            for index, (command, name) in enumerate(zip(commands, names)):
+                if progress:
+                    progress(f"Exporting {name} ({index + 1} of {len(commands)})...")
+                with zf.open(name, 'w', force_zip64=True) as member:
+                    for chunk in command["chunks"]():
+                        member.write(chunk.encode('utf-8'))
+                print(f"Added {name} to zip file {zip_path}")
+            if memory_dump_file:
+                pack_dump(zf, memory_dump_file, compression, progress)
+    except BaseException:
+        # No half written archive is left behind
+        if os.path.exists(zip_path):
+            os.remove(zip_path)
+        raise
+    return metadata
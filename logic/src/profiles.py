@@ -0,0 +1,42 @@
+import json
+
+PROFILES_FILE = 'profiles.json'  # Lives next to commands.json
+
+def load_profiles(path=PROFILES_FILE):
+    try:
+        with open(path, 'r') as file:
+            return json.load(file)
+    except FileNotFoundError:
+        print(f"Profiles file {path} not found.")
+        return []
+    except json.JSONDecodeError as e:
+        print(f"Error decoding the profiles file: {e}")
+        return []
+
+def save_profiles(profiles, path=PROFILES_FILE):
+    with open(path, 'w') as file:
+        json.dump(profiles, file, indent=4)
+
+def find_profile(profiles, name):
+    for profile in profiles:
+        if profile.get("name") == name:
+            return profile
+    return None
+
+def get_stages(profile):
+    """The profile's stages as lists of (command, parameters), a step can be a plain command name or a dict."""
+    stages = []
+    for stage in profile.get("stages", []):
+        steps = []
+        for step in stage:
+            if isinstance(step, dict):
+                steps.append((step["command"], step.get("parameters", "")))
+            else:
+                steps.append((step, ""))
+        stages.append(steps)
+    return stages
+
+def missing_commands(profile, commands):
+    """Commands used by the profile that are not in commands.json."""
+    known = {command['command'] for command in commands}
+    return [command for stage in get_stages(profile) for command, parameters in stage if command not in known]
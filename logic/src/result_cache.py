@@ -0,0 +1,246 @@
+import gzip
+import hashlib
+import json
+import os
+import shlex
+import threading
+import time
+from logic.src.file_lock import FileLock
+from logic.src.result_table import ResultTable
+
+CACHE_DIR = os.path.join('.volgui_cache', 'results')
+DEFAULT_MAX_SIZE = 2048 * 1024 * 1024  # Bytes of compressed results kept on disk
+READ_CHUNK_SIZE = 256 * 1024
+ORPHAN_AGE = 24 * 3600  # Seconds before a result file that no index entry points to is removed
+
+def normalize_parameters(parameters):
+    """Sort the options so '--pid 4 --dump' and '--dump --pid 4' share a cache entry."""
+    try:
+        tokens = shlex.split(parameters or "")
+    except ValueError:
+        return (parameters or "").strip()
+
+    options = []
+    for token in tokens:
+        if token.startswith("--") or not options:
+            options.append([token])
+        else:
+            options[-1].append(token)
+    return " ".join(" ".join(option) for option in sorted(options))
+
+class CacheWriter:
+    """Writes a result into the cache while it is being produced, it only becomes visible on commit."""
+    def __init__(self, cache, key, info):
+        self.cache = cache
+        self.key = key
+        self.info = info
+        self.temp_path = cache.entry_path(key) + f".{threading.get_ident()}.tmp"
+        self.file = gzip.open(self.temp_path, 'wt', encoding='utf-8', compresslevel=1)
+
+    def write(self, data):
+        self.file.write(data)
+
+    def commit(self):
+        self.file.close()
+        os.replace(self.temp_path, self.cache.entry_path(self.key))
+        self.cache.add_entry(self.key, self.info)
+
+    def discard(self):
+        self.file.close()
+        if os.path.exists(self.temp_path):
+            os.remove(self.temp_path)
+
+class TableCacheWriter:
+    """Stands in for a CacheWriter while a result table fills up, the table is stored on commit."""
+    def __init__(self, cache, key, info, table):
+        self.cache = cache
+        self.key = key
+        self.info = info
+        self.table = table
+
+    def write(self, data):
+        pass  # The text is only a view of the table
+
+    def commit(self):
+        if self.table.columns is not None:
+            self.cache.put_table(self.key, self.table, self.info)
+
+    def discard(self):
+        pass
+
+class ResultCache:
+    """Plugin results on disk, keyed by dump, command, parameters and volatility version, evicted least recently used first.
+
+    The GUI, 'volgui run' and 'volgui serve' can share one cache directory. Every change to index.json is made under
+    a file lock on the index as it is on disk, and reads pick up what the other processes wrote.
+    """
+    def __init__(self, cache_dir=CACHE_DIR, max_size=DEFAULT_MAX_SIZE):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.index_path = os.path.join(cache_dir, 'index.json')
+        self.lock = threading.RLock()
+        os.makedirs(cache_dir, exist_ok=True)
+        self.file_lock = FileLock(os.path.join(cache_dir, 'index.lock'))
+        self.index_stamp = None
+        with self.lock, self.file_lock:
+            self.index = self.load_index()
+            # Drop entries whose result file went missing, and result files no entry points to
+            self.index["entries"] = {key: entry for key, entry in self.index["entries"].items() if os.path.exists(self.entry_path(key))}
+            self.remove_orphans()
+            self.save_index()
+
+    def load_index(self):
+        try:
+            with open(self.index_path, 'r') as file:
+                index = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            index = {}
+        index.setdefault("entries", {})
+        index.setdefault("hits", 0)
+        index.setdefault("misses", 0)
+        self.index_stamp = self.file_stamp()
+        return index
+
+    def file_stamp(self):
+        try:
+            stat = os.stat(self.index_path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    def refresh(self):
+        # Another process changed the index since we last read it
+        if self.file_stamp() != self.index_stamp:
+            self.index = self.load_index()
+
+    def save_index(self):
+        temp_path = f"{self.index_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'w') as file:
+            json.dump(self.index, file, indent=4)
+        os.replace(temp_path, self.index_path)
+        self.index_stamp = self.file_stamp()
+
+    def update_index(self, change):
+        """Apply change(index) to the index as it is on disk and save it, returns what change returned."""
+        with self.lock, self.file_lock:
+            self.index = self.load_index()
+            result = change(self.index)
+            self.save_index()
+        return result
+
+    def remove_orphans(self):
+        # Left by a process that crashed between writing a result and indexing it, or by an older version of the cache
+        now = time.time()
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if not (name.endswith('.txt.gz') or name.endswith('.tmp')) or name[:64] in self.index["entries"]:
+                continue
+            try:
+                if now - os.path.getmtime(path) > ORPHAN_AGE:
+                    os.remove(path)
+                    print(f"Removed orphaned cache file {name}")
+            except OSError:
+                pass
+
+    def make_key(self, dump_id, command, parameters, volatility_version):
+        key_data = json.dumps([dump_id, command, normalize_parameters(parameters), volatility_version])
+        return hashlib.sha256(key_data.encode('utf-8')).hexdigest()
+
+    def entry_path(self, key):
+        return os.path.join(self.cache_dir, key + '.txt.gz')
+
+    def lookup(self, key):
+        """Return the path of a cached result and count the hit or miss."""
+        def change(index):
+            entry = index["entries"].get(key)
+            if entry and os.path.exists(self.entry_path(key)):
+                entry["last_used"] = time.time()
+                index["hits"] += 1
+                return self.entry_path(key)
+            index["entries"].pop(key, None)
+            index["misses"] += 1
+            return None
+        return self.update_index(change)
+
+    def contains(self, key):
+        """Whether a result is cached, without counting it as a lookup."""
+        with self.lock:
+            self.refresh()
+            return key in self.index["entries"] and os.path.exists(self.entry_path(key))
+
+    def read_chunks(self, key):
+        with gzip.open(self.entry_path(key), 'rt', encoding='utf-8') as file:
+            while True:
+                chunk = file.read(READ_CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+
+    def entry_format(self, key):
+        with self.lock:
+            self.refresh()
+            entry = self.index["entries"].get(key, {})
+            return entry.get("format", "text")
+
+    def load_table(self, key, table=None):
+        """Read a stored table, into the given one if there is one."""
+        table = table if table is not None else ResultTable()
+        with gzip.open(self.entry_path(key), 'rt', encoding='utf-8') as file:
+            table.load_dict(json.load(file))
+        return table
+
+    def open_writer(self, key, info=None):
+        return CacheWriter(self, key, info or {})
+
+    def open_table_writer(self, key, table, info=None):
+        return TableCacheWriter(self, key, info or {}, table)
+
+    def put_table(self, key, table, info=None):
+        writer = self.open_writer(key, dict(info or {}, format="table"))
+        json.dump(table.to_dict(), writer.file, separators=(',', ':'))
+        writer.commit()
+
+    def put(self, key, text, info=None):
+        writer = self.open_writer(key, info)
+        writer.write(text)
+        writer.commit()
+
+    def add_entry(self, key, info):
+        entry = dict(info)
+        entry["size"] = os.path.getsize(self.entry_path(key))
+        entry["last_used"] = time.time()
+
+        def change(index):
+            index["entries"][key] = entry
+            self.evict(index)
+        self.update_index(change)
+
+    def evict(self, index):
+        entries = index["entries"]
+        total_size = sum(entry["size"] for entry in entries.values())
+        for key in sorted(entries, key=lambda k: entries[k]["last_used"]):
+            if total_size <= self.max_size:
+                break
+            total_size -= entries[key]["size"]
+            del entries[key]
+            if os.path.exists(self.entry_path(key)):
+                os.remove(self.entry_path(key))
+            print(f"Evicted cached result {key}")
+
+    def stats(self):
+        with self.lock:
+            self.refresh()
+            return {
+                "hits": self.index["hits"],
+                "misses": self.index["misses"],
+                "entries": len(self.index["entries"]),
+                "size": sum(entry["size"] for entry in self.index["entries"].values())
+            }
+
+    def clear(self):
+        def change(index):
+            for key in index["entries"]:
+                if os.path.exists(self.entry_path(key)):
+                    os.remove(self.entry_path(key))
+            index.update({"entries": {}, "hits": 0, "misses": 0})
+        self.update_index(change)
@@ -0,0 +1,111 @@
+# Columns that identify the same object in two runs, by plugin. Other plugins match rows on all their columns.
+IDENTITY_COLUMNS = {
+    "windows.pslist": ("PID", "ImageFileName", "CreateTime"),
+    "windows.psscan": ("PID", "ImageFileName", "CreateTime"),
+    "windows.pstree": ("PID", "ImageFileName", "CreateTime"),
+    "windows.cmdline": ("PID", "Process"),
+    "windows.netscan": ("Proto", "LocalAddr", "LocalPort", "ForeignAddr", "ForeignPort", "PID"),
+    "windows.netstat": ("Proto", "LocalAddr", "LocalPort", "ForeignAddr", "ForeignPort", "PID"),
+    "windows.dlllist": ("PID", "Base", "Path"),
+    "windows.ldrmodules": ("Pid", "Base", "MappedPath"),
+    "windows.modules": ("Base", "Name", "Path"),
+    "windows.modscan": ("Base", "Name", "Path"),
+    "windows.handles": ("PID", "HandleValue", "Type", "Name"),
+    "windows.svcscan": ("Name", "Binary"),
+    "windows.malfind": ("PID", "Start VPN", "End VPN"),
+    "windows.registry.hivelist": ("FileFullPath",),
+    "linux.pslist": ("PID", "COMM"),
+    "linux.pstree": ("PID", "COMM"),
+    "linux.lsmod": ("Name",),
+    "mac.pslist": ("PID", "COMM"),
+}
+# Columns that differ between runs without the object changing, e.g. paths of dumped files
+IGNORED_COLUMNS = ("File output",)
+
+def identity_columns(command, old, new):
+    """Key columns of a plugin that both tables have, all shared columns when the plugin has none.
+
+    Raises ValueError when the tables have no column in common, every row would otherwise match every other.
+    """
+    shared = [name for name in new.columns if name in old.columns]
+    if not shared:
+        raise ValueError("the results have no columns in common")
+    columns = [name for name in IDENTITY_COLUMNS.get(command, ()) if name in shared]
+    return columns or shared
+
+def keyed_rows(table, key_columns):
+    """Row index of every key, hashed in one pass over the key columns."""
+    keys = list(zip(*[table.data[table.column_index(name)] for name in key_columns]))
+    rows = dict(zip(keys, range(len(keys))))
+    if len(rows) < len(keys):
+        # The same key more than once (e.g. two identical handles), repeats are numbered so they pair up in order
+        seen = {}
+        rows = {}
+        for index, key in enumerate(keys):
+            count = seen.get(key, 0)
+            seen[key] = count + 1
+            rows[key + (count,) if count else key] = index
+    return rows
+
+def row_values(table, columns):
+    if not columns:
+        return [()] * len(table)
+    return list(zip(*[table.data[table.column_index(name)] for name in columns]))
+
+class TableDiff:
+    """Rows added, removed and changed between two results of a plugin, matched by identity columns."""
+    def __init__(self, old, new, key_columns):
+        self.old = old
+        self.new = new
+        self.key_columns = key_columns
+        shared = [name for name in new.columns if name in old.columns]
+        self.compare_columns = [name for name in shared if name not in key_columns and name not in IGNORED_COLUMNS]
+        self.added = []  # Row indices in new
+        self.removed = []  # Row indices in old
+        self.changed = []  # (old index, new index, names of the changed columns)
+        self.unchanged = 0
+
+    def compute(self):
+        old_rows = keyed_rows(self.old, self.key_columns)
+        new_rows = keyed_rows(self.new, self.key_columns)
+        old_values = row_values(self.old, self.compare_columns)
+        new_values = row_values(self.new, self.compare_columns)
+        for key, new_index in new_rows.items():
+            old_index = old_rows.pop(key, None)
+            if old_index is None:
+                self.added.append(new_index)
+            elif old_values[old_index] == new_values[new_index]:
+                self.unchanged += 1
+            else:
+                names = [name for name, old_value, new_value in zip(self.compare_columns, old_values[old_index], new_values[new_index]) if old_value != new_value]
+                self.changed.append((old_index, new_index, names))
+        self.removed = list(old_rows.values())  # Keys only the old result has
+        self.added.sort()
+        self.removed.sort()
+        self.changed.sort(key=lambda change: change[1])
+        return self
+
+    def summary(self):
+        return f"{len(self.added)} added, {len(self.removed)} removed, {len(self.changed)} changed, {self.unchanged} unchanged"
+
+    def fill_table(self, sink):
+        """Write the differences as rows of a table (or TableSink): the change, the changed columns and the row."""
+        columns = list(self.new.columns) + [name for name in self.old.columns if name not in self.new.columns]
+        types = dict(zip(self.old.columns, self.old.types))
+        types.update(zip(self.new.columns, self.new.types))
+        sink.set_columns([("Change", "str"), ("Changed Columns", "str")] + [(name, types[name]) for name in columns])
+
+        def values_of(table, index):
+            return [table.data[table.column_index(name)][index] if name in table.columns else None for name in columns]
+
+        for index in self.removed:
+            sink.add_row(["removed", ""] + values_of(self.old, index))
+        for index in self.added:
+            sink.add_row(["added", ""] + values_of(self.new, index))
+        for old_index, new_index, names in self.changed:
+            # The row as it is now, followed by the old values one level down
+            sink.add_row(["changed", ", ".join(names)] + values_of(self.new, new_index))
+            sink.add_row(["was", ""] + values_of(self.old, old_index), 1)
+
+def diff_tables(old, new, command=None):
+    return TableDiff(old, new, identity_columns(command, old, new)).compute()
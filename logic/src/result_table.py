@@ -0,0 +1,167 @@
+import json
+
+# Volatility's JSON renderers drop the Hex format hint, these column names are shown as hex like the quick renderer does
+HEX_COLUMN_HINTS = ("offset", "address", "base", "start", "end", "vpn", "pte")
+TEXT_BATCH_ROWS = 5000  # Rows per chunk when a table is rendered as text
+TEXT_LIMIT_NOTE = "\n[The text view stops here, the table view has all rows]\n"
+
+def json_type(name, value):
+    if any(hint in name.lower() for hint in HEX_COLUMN_HINTS):
+        return "hex"
+    if isinstance(value, bool):
+        return "bool"
+    if isinstance(value, int):
+        return "int"
+    if isinstance(value, float):
+        return "float"
+    return "str"
+
+class ResultTable:
+    """Plugin output stored as typed columns, every row keeps its tree depth (e.g. children in pstree)."""
+    def __init__(self, columns=None):
+        self.columns = None  # Column names, None until the plugin reported them
+        self.types = []
+        self.data = []  # One list of values per column
+        self.depths = []
+        if columns is not None:
+            self.set_columns(columns)
+
+    def set_columns(self, columns):
+        """columns is a list of (name, type) pairs."""
+        self.columns = [name for name, column_type in columns]
+        self.types = [column_type for name, column_type in columns]
+        self.data = [[] for name in self.columns]
+        self.depths = []
+
+    def add_row(self, values, depth=0):
+        for column, value in zip(self.data, values):
+            column.append(value)
+        self.depths.append(depth)
+        return len(self.depths) - 1
+
+    def __len__(self):
+        return len(self.depths)
+
+    def row(self, index):
+        return [column[index] for column in self.data]
+
+    def column_index(self, name):
+        return self.columns.index(name)
+
+    def format_value(self, column, value):
+        if value is None:
+            return "N/A"
+        column_type = self.types[column]
+        if column_type == "hex" and isinstance(value, int):
+            return hex(value)
+        if column_type == "bin" and isinstance(value, int):
+            return bin(value)
+        return str(value)
+
+    def format_row(self, index):
+        # Same tab separated layout as the quick text renderer, children are prefixed with one "*" per level
+        depth = self.depths[index]
+        prefix = "*" * depth + " " if depth else ""
+        return prefix + "\t".join(self.format_value(column, values[index]) for column, values in enumerate(self.data)) + "\n"
+
+    def header_text(self):
+        return "\t".join(self.columns) + "\n\n"
+
+    def iter_text(self, order=None):
+        """The table as quick renderer text, in chunks of rows so large tables don't build one huge string."""
+        if self.columns is None:
+            return
+        yield self.header_text()
+        order = range(len(self)) if order is None else order
+        for start in range(0, len(order), TEXT_BATCH_ROWS):
+            yield "".join(self.format_row(index) for index in order[start:start + TEXT_BATCH_ROWS])
+
+    def to_text(self, order=None):
+        return "".join(self.iter_text(order))
+
+    def sort_order(self, name, reverse=False):
+        """Row indices ordered by one column, empty values always last."""
+        values = self.data[self.column_index(name)]
+        present = [index for index in range(len(values)) if values[index] is not None]
+        missing = [index for index in range(len(values)) if values[index] is None]
+        try:
+            present.sort(key=values.__getitem__, reverse=reverse)
+        except TypeError:
+            present.sort(key=lambda index: str(values[index]), reverse=reverse)  # Mixed types in one column
+        return present + missing
+
+    def filter_order(self, text, name=None, order=None):
+        """Row indices whose formatted value (in one column or any) contains text, ignoring case."""
+        text = text.lower()
+        columns = [self.column_index(name)] if name else range(len(self.columns))
+        order = range(len(self)) if order is None else order
+        return [index for index in order if any(text in self.format_value(column, self.data[column][index]).lower() for column in columns)]
+
+    def value_counts(self, name):
+        counts = {}
+        for value in self.data[self.column_index(name)]:
+            counts[value] = counts.get(value, 0) + 1
+        return counts
+
+    def to_dict(self):
+        return {"columns": [[name, column_type] for name, column_type in zip(self.columns, self.types)], "depths": self.depths, "data": self.data}
+
+    def load_dict(self, values):
+        self.set_columns(values["columns"])
+        self.data = values["data"]
+        self.depths = values["depths"]
+
+    @classmethod
+    def from_dict(cls, values):
+        table = cls()
+        table.load_dict(values)
+        return table
+
+class JsonLinesReader:
+    """Feeds the rows of volatility's jsonl renderer (one top level row per line, children nested) into a table."""
+    def __init__(self, sink):
+        self.sink = sink
+        self.columns = None
+
+    def feed(self, line):
+        """Add the rows of one line, False when it isn't a jsonl row (e.g. a custom plugin printing text)."""
+        try:
+            record = json.loads(line)
+        except ValueError:
+            return False
+        if not isinstance(record, dict):
+            return False
+        self.add_record(record, 0)
+        return True
+
+    def add_record(self, record, depth):
+        if self.columns is None:
+            self.columns = [name for name in record if name != "__children"]
+            self.sink.set_columns([(name, json_type(name, record[name])) for name in self.columns])
+        self.sink.add_row([record.get(name) for name in self.columns], depth)
+        for child in record.get("__children", []):
+            self.add_record(child, depth + 1)
+
+class TableSink:
+    """Fills a table and writes the rows as text as well, e.g. into the OutputStream of a tab.
+
+    Past text_limit rows only the table grows and on_limit is called once.
+    """
+    def __init__(self, table, write, text_limit=None, on_limit=None):
+        self.table = table
+        self.write = write
+        self.text_limit = text_limit
+        self.on_limit = on_limit
+
+    def set_columns(self, columns):
+        self.table.set_columns(columns)
+        self.write(self.table.header_text())
+
+    def add_row(self, values, depth=0):
+        index = self.table.add_row(values, depth)
+        if self.text_limit is None or index < self.text_limit:
+            self.write(self.table.format_row(index))
+        elif index == self.text_limit:
+            self.write(TEXT_LIMIT_NOTE)
+            if self.on_limit:
+                self.on_limit()
@@ -0,0 +1,124 @@
+import array
+import bisect
+import re
+import threading
+
+MAX_INDEXED_SIZE = 256 * 1024 * 1024  # Bytes of output held in memory for searching, bigger outputs are scanned from disk
+SCAN_BLOCK_LINES = 50000  # Lines read from the store at a time when there is no index
+MAX_HITS = 100000  # Hit positions kept per output and query
+
+def find_spans(text, pattern, regex, folded):
+    """(offset, length) of every match, text is already lower case when folded is True."""
+    if regex:
+        compiled = re.compile(pattern, re.IGNORECASE | re.MULTILINE)
+        for match in compiled.finditer(text):
+            if match.end() > match.start():
+                yield match.start(), match.end() - match.start()
+    elif folded:
+        # str.find runs at memory speed, much faster than a case-insensitive regex
+        term = pattern.lower()
+        position = text.find(term)
+        while position != -1:
+            yield position, len(term)
+            position = text.find(term, position + len(term))
+    else:
+        for match in re.finditer(re.escape(pattern), text, re.IGNORECASE):
+            yield match.start(), len(pattern)
+
+def search_table_rows(table, pattern, regex=False, start=0, limit=MAX_HITS):
+    """Rows of a ResultTable from start on whose text matches pattern, for rows the text view doesn't hold."""
+    if regex:
+        compiled = re.compile(pattern, re.IGNORECASE | re.MULTILINE)
+        matches = lambda text: compiled.search(text) is not None
+    else:
+        term = pattern.lower()
+        matches = lambda text: term in text.lower()
+    rows = []
+    for index in range(start, len(table)):
+        if matches(table.format_row(index)):
+            rows.append(index)
+            if len(rows) >= limit:
+                break
+    return rows
+
+def line_starts_of(text):
+    starts = array.array('q', [0])
+    starts.extend(match.end() for match in re.finditer("\n", text))
+    return starts
+
+class SearchIndex:
+    """Case-insensitive search over one output: the text folded to lower case plus a table of line starts.
+
+    Hits are (line, column, length) with lines counted from 1 over the whole output, the coordinates the
+    windowed text view uses. Results are kept per query until the output changes.
+    """
+    def __init__(self, store):
+        self.store = store
+        self.text = None
+        self.folded = False
+        self.line_starts = None
+        self.indexed_size = -1
+        self.results = {}
+        self.lock = threading.Lock()
+
+    def build(self):
+        size = self.store.size
+        if size > MAX_INDEXED_SIZE:
+            return  # Searched block by block from the store instead
+        text = self.store.get_text()
+        folded_text = text.lower()
+        folded = len(folded_text) == len(text)  # Some characters change length when lowered, the offsets would shift
+        line_starts = line_starts_of(text)
+        with self.lock:
+            self.text = folded_text if folded else text
+            self.folded = folded
+            self.line_starts = line_starts
+            self.indexed_size = size
+            self.results = {}
+
+    def is_built(self):
+        return self.indexed_size == self.store.size
+
+    def search(self, pattern, regex=False):
+        """Hits of pattern, re.error is raised for an invalid regular expression."""
+        key = (pattern, regex)
+        with self.lock:
+            if self.indexed_size == self.store.size and key in self.results:
+                return self.results[key]
+            text, folded, line_starts, size = self.text, self.folded, self.line_starts, self.indexed_size
+
+        if text is not None and size == self.store.size:
+            hits = self.collect_hits(text, pattern, regex, folded, line_starts, 1)
+        else:
+            hits = self.scan_store(pattern, regex)
+
+        with self.lock:
+            if size == self.store.size:
+                self.results[key] = hits
+        return hits
+
+    def collect_hits(self, text, pattern, regex, folded, line_starts, first_line, limit=MAX_HITS):
+        hits = []
+        line = 0
+        for offset, length in find_spans(text, pattern, regex, folded):
+            line = bisect.bisect_right(line_starts, offset, line) - 1  # Matches come in order, so search from the last line
+            hits.append((first_line + line, offset - line_starts[line], length))
+            if len(hits) >= limit:
+                break
+        return hits
+
+    def scan_store(self, pattern, regex):
+        # Outputs that are too big to hold (or still being written) are searched a block of lines at a time
+        hits = []
+        start = 0
+        while len(hits) < MAX_HITS:
+            lines = self.store.get_lines(start, start + SCAN_BLOCK_LINES)
+            if not lines:
+                break
+            text = "\n".join(lines)
+            folded_text = text.lower()
+            folded = len(folded_text) == len(text)
+            text = folded_text if folded else text
+            hits += self.collect_hits(text, pattern, regex, folded, line_starts_of(text), start + 1, MAX_HITS - len(hits))
+            start += len(lines)
+        return hits
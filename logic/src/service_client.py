@@ -0,0 +1,117 @@
+import http.client
+import json
+import socket
+import threading
+from logic.src.job_scheduler import PRIORITY_NAMES, MB
+from logic.src.job_service import DEFAULT_HOST, DEFAULT_PORT, read_token
+
+DEFAULT_ADDRESS = f"{DEFAULT_HOST}:{DEFAULT_PORT}"
+POLL_INTERVAL = 0.5  # Seconds between job list updates
+REQUEST_TIMEOUT = 5
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, socket_path, timeout=REQUEST_TIMEOUT):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+class ServiceClient:
+    """Talks to a job service at "host:port" or "unix:/path/to/socket", with the token the service wrote at its start."""
+    def __init__(self, address=DEFAULT_ADDRESS, token=None):
+        self.address = address
+        self.token = token or read_token()
+
+    def connection(self):
+        if self.address.startswith("unix:"):
+            return UnixHTTPConnection(self.address[len("unix:"):])
+        host, separator, port = self.address.rpartition(":")
+        if not separator:
+            host, port = self.address, DEFAULT_PORT
+        return http.client.HTTPConnection(host, int(port), timeout=REQUEST_TIMEOUT)
+
+    def request(self, method, path, body=None):
+        connection = self.connection()
+        try:
+            headers = {"Content-Type": "application/json"} if body is not None else {}
+            if self.token:
+                headers["Authorization"] = f"Bearer {self.token}"
+            connection.request(method, path, json.dumps(body) if body is not None else None, headers)
+            response = connection.getresponse()
+            data = json.loads(response.read() or b"null")
+        finally:
+            connection.close()
+        if response.status >= 400:
+            raise RuntimeError(data.get("error") if isinstance(data, dict) else f"HTTP {response.status}")
+        return data
+
+class RemoteJob:
+    """A job of the service, with the attributes the Job Queue window reads from a local Job."""
+    def __init__(self, values):
+        self.id = values["id"]
+        self.name = values["name"]
+        self.dump = values["dump"]
+        self.priority = {name: priority for priority, name in PRIORITY_NAMES.items()}.get(values["priority"], values["priority"])
+        self.state = values["state"]
+        self.memory = values["memory_mb"] * MB
+        self.started = values["started"]
+        self.timeout = values["timeout"]
+        self.cancel_requested = values["cancel_requested"]
+        self.seconds = values["runtime"]
+
+    def runtime(self):
+        return self.seconds
+
+class RemoteScheduler:
+    """Stands in for the JobScheduler in the Job Queue window, the jobs of a service are polled in the background."""
+    def __init__(self, client):
+        self.client = client
+        self.snapshot = []
+        self.error = None
+        self.stopped = threading.Event()
+        self.poll()  # Fails straight away when there is no service to attach to
+        threading.Thread(target=self.poll_loop, name="service-poll", daemon=True).start()
+
+    def poll(self):
+        self.snapshot = [RemoteJob(values) for values in self.client.request("GET", "/jobs")]
+
+    def poll_loop(self):
+        while not self.stopped.wait(POLL_INTERVAL):
+            try:
+                self.poll()
+                self.error = None
+            except (OSError, ValueError, RuntimeError) as e:
+                if self.error is None:
+                    print(f"Lost the job service at {self.client.address}: {e}")
+                self.error = str(e)
+
+    def jobs(self):
+        return self.snapshot
+
+    def find_job(self, job_id):
+        for job in self.snapshot:
+            if job.id == job_id:
+                return job
+        return None
+
+    def change_job(self, job_id, action, body=None):
+        try:
+            return self.client.request("POST", f"/jobs/{job_id}/{action}", body or {})["changed"]
+        except (OSError, ValueError, RuntimeError) as e:
+            print(f"Could not {action} job {job_id} on the service: {e}")
+            return False
+
+    def set_priority(self, job_id, priority):
+        return self.change_job(job_id, "priority", {"priority": PRIORITY_NAMES[priority]})
+
+    def cancel_job(self, job_id, reason=None):
+        return self.change_job(job_id, "cancel")
+
+    def set_timeout(self, job_id, timeout):
+        return self.change_job(job_id, "timeout", {"timeout": timeout or 0})
+
+    def close(self):
+        self.stopped.set()
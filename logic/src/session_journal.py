@@ -0,0 +1,109 @@
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from logic.src.file_lock import FileLock
+
+SESSION_DIR = os.path.join('.volgui_cache', 'session')
+JOURNAL_NAME = 'journal.db'
+LOCK_NAME = 'session.lock'
+
+class SessionInUse(RuntimeError):
+    """Another VolGUI window owns the session directory."""
+
+class SessionJournal:
+    """Append-only record of the workspace (loaded dumps, tabs, where their results live, highlights).
+
+    Every event is committed to SQLite in WAL mode as it happens, so a crash loses at most the event being
+    written. Replaying the events gives the workspace to restore, compact() then rewrites it as a snapshot.
+
+    One window at a time owns a session directory, a second one gets SessionInUse and must not touch it.
+    """
+    def __init__(self, directory=SESSION_DIR):
+        self.directory = directory
+        self.outputs_dir = os.path.join(directory, 'outputs')
+        os.makedirs(self.outputs_dir, exist_ok=True)
+        self.owner_lock = FileLock(os.path.join(directory, LOCK_NAME))
+        if not self.owner_lock.try_acquire():
+            raise SessionInUse(f"{directory} is used by another VolGUI window")
+        self.lock = threading.Lock()
+        try:
+            self.connection = sqlite3.connect(os.path.join(directory, JOURNAL_NAME), check_same_thread=False)
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")  # Durable across application crashes, cheap per event
+            self.connection.execute("CREATE TABLE IF NOT EXISTS events (id INTEGER PRIMARY KEY, kind TEXT NOT NULL, tab TEXT, data TEXT NOT NULL)")
+            self.connection.commit()
+        except sqlite3.Error:
+            self.owner_lock.release()
+            raise
+
+    def record(self, kind, tab=None, **data):
+        with self.lock:
+            if self.connection is None:
+                return
+            self.connection.execute("INSERT INTO events (kind, tab, data) VALUES (?, ?, ?)", (kind, tab, json.dumps(data)))
+            self.connection.commit()
+
+    def is_empty(self):
+        with self.lock:
+            return self.connection.execute("SELECT 1 FROM events LIMIT 1").fetchone() is None
+
+    def events(self):
+        with self.lock:
+            rows = self.connection.execute("SELECT kind, tab, data FROM events ORDER BY id").fetchall()
+        return [(kind, tab, json.loads(data)) for kind, tab, data in rows]
+
+    def replay(self):
+        """Loaded files and open tabs as of the last event, tabs in the order they were opened."""
+        files = []
+        tabs = {}
+        for kind, tab, data in self.events():
+            if kind == "file_loaded" and data["path"] not in files:
+                files.append(data["path"])
+            elif kind == "file_removed" and data["path"] in files:
+                files.remove(data["path"])
+            elif kind == "files_reset":
+                files = []
+            elif kind == "tab_opened":
+                tabs[tab] = {"title": data["title"], "command": data["command"], "source": data.get("source"), "highlights": []}
+            elif kind == "tab_result" and tab in tabs:
+                tabs[tab]["source"] = data["source"]
+            elif kind == "tab_highlights" and tab in tabs:
+                tabs[tab]["highlights"] = data["highlights"]
+            elif kind == "tab_closed":
+                tabs.pop(tab, None)
+        return {"files": files, "tabs": list(tabs.values())}
+
+    def compact(self, state):
+        """Replace the events with the ones that rebuild state, and drop saved outputs nothing refers to any more."""
+        with self.lock:
+            with self.connection:
+                self.connection.execute("DELETE FROM events")
+                for path in state["files"]:
+                    self.connection.execute("INSERT INTO events (kind, tab, data) VALUES (?, ?, ?)", ("file_loaded", None, json.dumps({"path": path})))
+                for tab in state["tabs"]:
+                    self.connection.execute("INSERT INTO events (kind, tab, data) VALUES (?, ?, ?)", ("tab_opened", tab["id"], json.dumps({"title": tab["title"], "command": tab["command"], "source": tab["source"]})))
+                    if tab["highlights"]:
+                        self.connection.execute("INSERT INTO events (kind, tab, data) VALUES (?, ?, ?)", ("tab_highlights", tab["id"], json.dumps({"highlights": tab["highlights"]})))
+        used = {os.path.abspath(tab["source"]["path"]) for tab in state["tabs"] if tab["source"] and tab["source"].get("kind") == "saved"}
+        for name in os.listdir(self.outputs_dir):
+            path = os.path.abspath(os.path.join(self.outputs_dir, name))
+            if path not in used:
+                os.remove(path)
+
+    def save_output(self, chunks):
+        """Keep the text of a result that has no other home (e.g. a Custom command) next to the journal."""
+        path = os.path.join(self.outputs_dir, uuid.uuid4().hex + ".txt")
+        with open(path + ".partial", 'w', encoding='utf-8') as file:
+            for chunk in chunks:
+                file.write(chunk)
+        os.replace(path + ".partial", path)
+        return path
+
+    def close(self):
+        with self.lock:
+            if self.connection is not None:
+                self.connection.close()
+                self.connection = None
+            self.owner_lock.release()
@@ -0,0 +1,164 @@
+import gzip
+import lzma
+import mmap
+import os
+import re
+import shutil
+import struct
+import threading
+import zipfile
+
+# Windows ISF files live at windows/<pdb name>/<GUID>-<age>.json(.xz|.gz), loose or inside a symbol pack zip
+ISF_PATH = re.compile(r"(?:^|/)windows/([^/]+\.pdb)/([0-9A-Fa-f]{32}-[0-9]+)\.json(\.xz|\.gz)?$")
+# CodeView record in the kernel image of a dump: "RSDS", GUID, age, then the kernel's pdb name
+KERNEL_PDB = re.compile(rb"RSDS(.{16})(.{4})(nt(?:krnlmp|oskrnl|krpamp|krnlpa)\.pdb)\x00", re.DOTALL)
+COPY_CHUNK_SIZE = 4 * 1024 * 1024
+# winload puts the kernel image in low physical memory, so a 64 GB dump isn't read end to end looking for it
+KERNEL_SCAN_LIMIT = 4 * 1024 * 1024 * 1024
+
+def isf_id(guid_bytes, age_bytes):
+    """<GUID>-<age> the way volatility names the ISF file of a pdb."""
+    data1, data2, data3 = struct.unpack("<IHH", guid_bytes[:8])
+    return f"{data1:08X}{data2:04X}{data3:04X}{guid_bytes[8:].hex().upper()}-{struct.unpack('<I', age_bytes)[0]}"
+
+def find_kernel_pdb(dump_path, limit=KERNEL_SCAN_LIMIT):
+    """(pdb name, GUID-age) of the Windows kernel in the first limit bytes of a dump, None when there is none (e.g. Linux dumps)."""
+    with open(dump_path, 'rb') as file:
+        size = os.fstat(file.fileno()).st_size
+        if size == 0:
+            return None
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            # find() runs at memory speed, only the places that start with RSDS get the regex
+            end = min(size, limit)
+            position = data.find(b"RSDS", 0, end)
+            while position != -1:
+                match = KERNEL_PDB.match(data[position:position + 64])
+                if match:
+                    return match.group(3).decode('ascii'), isf_id(match.group(1), match.group(2))
+                position = data.find(b"RSDS", position + 4, end)
+    return None
+
+class SymbolCache:
+    """A local directory of volatility symbol tables (ISF), indexed by pdb name and GUID/age.
+
+    The directory is passed to volatility with symbol lookups online turned off, symbol packs in it are unpacked
+    and the table of a dump's kernel is decompressed ahead of time so plugin runs find it straight away.
+
+    Safe to use from several jobs: a dump is scanned once and only jobs on that dump wait for its scan.
+    """
+    def __init__(self, directory):
+        self.directory = directory
+        self.entries = {}  # (pdb name, GUID-age) -> (file or zip pack, member in the pack or None)
+        self.dump_matches = {}  # dump path -> (pdb name, GUID-age) or None
+        self.dump_locks = {}  # dump path -> lock held while that dump is scanned
+        self.lock = threading.RLock()  # Indexing and unpacking, never held during a scan
+
+    def index(self):
+        entries = {}
+        for root, dirs, files in os.walk(self.directory):
+            for name in files:
+                path = os.path.join(root, name)
+                if name.lower().endswith(".zip"):
+                    try:
+                        with zipfile.ZipFile(path) as pack:
+                            members = pack.namelist()
+                    except (OSError, zipfile.BadZipFile) as e:
+                        print(f"Skipping symbol pack {path}: {e}")
+                        continue
+                    for member in members:
+                        match = ISF_PATH.search(member)
+                        if match:
+                            entries.setdefault((match.group(1).lower(), match.group(2).upper()), (path, member))
+                    continue
+                match = ISF_PATH.search(os.path.relpath(path, self.directory).replace(os.sep, "/"))
+                if match:
+                    # Loose files win over pack members, a plain .json over a compressed one
+                    key = (match.group(1).lower(), match.group(2).upper())
+                    if key not in entries or entries[key][1] is not None or not match.group(3):
+                        entries[key] = (path, None)
+        self.entries = entries
+        print(f"Indexed {len(entries)} symbol tables in {self.directory}")
+        return entries
+
+    def match_dump(self, dump_path):
+        with self.lock:
+            dump_lock = self.dump_locks.setdefault(dump_path, threading.Lock())
+        with dump_lock:
+            if dump_path not in self.dump_matches:
+                self.dump_matches[dump_path] = find_kernel_pdb(dump_path)
+            return self.dump_matches[dump_path]
+
+    def match_in_background(self, dump_paths):
+        """Scan dumps that haven't been scanned yet on a thread of their own, e.g. as soon as they are loaded."""
+        def scan(dump_path):
+            try:
+                self.match_dump(dump_path)
+            except OSError as e:
+                print(f"Could not scan {dump_path} for its kernel: {e}")
+        for dump_path in dump_paths:
+            with self.lock:
+                if dump_path in self.dump_locks:
+                    continue  # Scanned or being scanned
+                self.dump_locks[dump_path] = threading.Lock()
+            threading.Thread(target=scan, args=(dump_path,), name="kernel-scan", daemon=True).start()
+
+    def dump_status(self, dump_path):
+        """One line report: the kernel pdb of the dump and whether its symbol table is here."""
+        match = self.match_dump(dump_path)
+        if match is None:
+            return "no Windows kernel found"
+        pdb_name, guid_age = match
+        entry = self.entries.get((pdb_name.lower(), guid_age))
+        if entry is None:
+            return f"{pdb_name} {guid_age} missing"
+        path, member = entry
+        if member is not None:
+            return f"{pdb_name} {guid_age} in {os.path.basename(path)}"
+        return f"{pdb_name} {guid_age} ready" if path.endswith(".json") else f"{pdb_name} {guid_age} compressed"
+
+    def prewarm(self, dump_path):
+        """Unpack and decompress the kernel symbol table of a dump, True when it is ready to load."""
+        match = self.match_dump(dump_path)
+        if match is None:
+            return False
+        pdb_name, guid_age = match
+        entry = self.entries.get((pdb_name.lower(), guid_age))
+        if entry is None:
+            return False
+        path, member = entry
+        if member is None and path.endswith(".json"):
+            return True
+
+        target = os.path.join(self.directory, "windows", pdb_name, guid_age + ".json")
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        partial = f"{target}.{os.getpid()}.partial"
+        if member is not None:
+            with zipfile.ZipFile(path) as pack, pack.open(member) as source:
+                self.decompress(source, member, partial)
+        else:
+            with open(path, 'rb') as source:
+                self.decompress(source, path, partial)
+        os.replace(partial, target)  # Volatility never sees a half written file
+        self.entries[(pdb_name.lower(), guid_age)] = (target, None)
+        print(f"Prepared symbol table {target}")
+        return True
+
+    def prepare(self, dump_path):
+        """Index the directory if needed and get the dump's symbol table ready, problems are only reported."""
+        try:
+            self.match_dump(dump_path)  # Outside self.lock, other dumps don't wait for this scan
+            with self.lock:
+                if not self.entries:
+                    self.index()
+                if not self.prewarm(dump_path):
+                    print(f"Symbol table for {dump_path}: {self.dump_status(dump_path)}")
+        except (OSError, lzma.LZMAError, zipfile.BadZipFile) as e:
+            print(f"Could not prepare the symbol table for {dump_path}: {e}")
+
+    def decompress(self, source, name, target):
+        if name.endswith(".xz"):
+            source = lzma.open(source)
+        elif name.endswith(".gz"):
+            source = gzip.open(source)
+        with open(target, 'wb') as output:
+            shutil.copyfileobj(source, output, COPY_CHUNK_SIZE)
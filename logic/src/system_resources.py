@@ -0,0 +1,74 @@
+import ctypes
+import os
+
+def cpu_count():
+    return os.cpu_count() or 1
+
+def read_meminfo():
+    # Linux: values in /proc/meminfo are in kB
+    values = {}
+    with open('/proc/meminfo', 'r') as file:
+        for line in file:
+            name, value = line.split(':', 1)
+            values[name] = int(value.split()[0]) * 1024
+    return values
+
+def windows_memory_status():
+    class MEMORYSTATUSEX(ctypes.Structure):
+        _fields_ = [
+            ("dwLength", ctypes.c_ulong),
+            ("dwMemoryLoad", ctypes.c_ulong),
+            ("ullTotalPhys", ctypes.c_ulonglong),
+            ("ullAvailPhys", ctypes.c_ulonglong),
+            ("ullTotalPageFile", ctypes.c_ulonglong),
+            ("ullAvailPageFile", ctypes.c_ulonglong),
+            ("ullTotalVirtual", ctypes.c_ulonglong),
+            ("ullAvailVirtual", ctypes.c_ulonglong),
+            ("ullAvailExtendedVirtual", ctypes.c_ulonglong),
+        ]
+    status = MEMORYSTATUSEX()
+    status.dwLength = ctypes.sizeof(MEMORYSTATUSEX)
+    ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status))
+    return status
+
+def total_memory():
+    """Physical memory in bytes, 0 when it can't be determined."""
+    try:
+        import psutil
+        return psutil.virtual_memory().total
+    except ImportError:
+        pass
+    try:
+        if os.name == 'nt':
+            return windows_memory_status().ullTotalPhys
+        return read_meminfo()['MemTotal']
+    except (OSError, KeyError, ValueError, AttributeError):
+        return 0
+
+def available_memory():
+    """Memory in bytes that can be used without swapping, 0 when it can't be determined."""
+    try:
+        import psutil
+        return psutil.virtual_memory().available
+    except ImportError:
+        pass
+    try:
+        if os.name == 'nt':
+            return windows_memory_status().ullAvailPhys
+        meminfo = read_meminfo()
+        return meminfo.get('MemAvailable', meminfo['MemFree'])
+    except (OSError, KeyError, ValueError, AttributeError):
+        return 0
+
+def process_memory():
+    """Resident memory of the current process in bytes, 0 when it can't be determined."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open('/proc/self/statm', 'r') as file:
+            return int(file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return 0
@@ -0,0 +1,98 @@
+import array
+import codecs
+import os
+import re
+import tempfile
+import threading
+
+INDEX_CHUNK_SIZE = 4 * 1024 * 1024  # Bytes scanned for line breaks at a time when indexing an existing file
+READ_CHUNK_SIZE = 256 * 1024
+NEWLINE = re.compile(b"\n")
+
+class TextStore:
+    """Output text kept in a file with an index of where every line starts, so a view can read any range of lines.
+
+    Without a path the text is appended to a temporary file as it arrives. With a path an existing file is shown
+    as it is, its lines are indexed on a background thread so the first lines can be read right away.
+    """
+    def __init__(self, path=None):
+        self.path = path
+        self.lock = threading.Lock()
+        self.line_starts = array.array('q', [0])  # Byte offset of every line
+        self.indexed_size = 0  # Bytes already scanned for line breaks
+        if path:
+            self.file = open(path, 'rb')
+            self.size = os.path.getsize(path)
+            threading.Thread(target=self.index_file, daemon=True).start()
+        else:
+            self.file = tempfile.TemporaryFile()
+            self.size = 0
+
+    def index_chunk(self, data, offset):
+        self.line_starts.extend(match.end() + offset for match in NEWLINE.finditer(data))
+
+    def index_file(self):
+        with open(self.path, 'rb') as file:
+            while True:
+                data = file.read(INDEX_CHUNK_SIZE)
+                if not data:
+                    break
+                with self.lock:
+                    self.index_chunk(data, self.indexed_size)
+                    self.indexed_size += len(data)
+
+    def append(self, text):
+        data = text.encode('utf-8')
+        with self.lock:
+            self.file.seek(self.size)
+            self.file.write(data)
+            self.index_chunk(data, self.size)
+            self.size += len(data)
+            self.indexed_size = self.size
+
+    def is_indexed(self):
+        return self.indexed_size >= self.size
+
+    def line_count(self):
+        """Number of lines, estimated from the average line length while a file is still being indexed."""
+        with self.lock:
+            if self.indexed_size >= self.size or not self.indexed_size:
+                return len(self.line_starts)
+            return int(len(self.line_starts) * self.size / self.indexed_size)
+
+    def get_lines(self, start, end):
+        """Lines start to end (0-based, end exclusive) without their line breaks, as far as they are indexed."""
+        with self.lock:
+            start = max(0, start)
+            end = min(end, len(self.line_starts))
+            if start >= end:
+                return []
+            start_offset = self.line_starts[start]
+            end_offset = self.line_starts[end] if end < len(self.line_starts) else self.indexed_size
+            self.file.seek(start_offset)
+            data = self.file.read(end_offset - start_offset)
+        lines = data.decode('utf-8', errors='replace').split("\n")
+        if end < len(self.line_starts):
+            lines.pop()  # Empty string after the break that ends the last line
+        return [line.rstrip("\r") for line in lines]
+
+    def read_chunks(self):
+        """The whole text in decoded chunks, e.g. for exporting it."""
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        offset = 0
+        while True:
+            with self.lock:
+                self.file.seek(offset)
+                data = self.file.read(READ_CHUNK_SIZE)
+            if not data:
+                break
+            offset += len(data)
+            yield decoder.decode(data)
+        yield decoder.decode(b"", final=True)
+
+    def get_text(self):
+        return "".join(self.read_chunks())
+
+    def close(self):
+        with self.lock:
+            self.file.close()
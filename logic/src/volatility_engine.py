@@ -0,0 +1,208 @@
+import datetime
+import os
+import shlex
+import sys
+
+# Requirement types whose configured values describe the dump itself (layers, kernel, symbols)
+# rather than the plugin options, these are what we carry over between plugins on the same dump.
+SHARED_REQUIREMENT_TYPES = ("TranslationLayerRequirement", "ModuleRequirement", "SymbolTableRequirement")
+
+class DumpContext:
+    """Keeps the volatility context of one memory dump alive between plugin runs."""
+    def __init__(self, dump_path):
+        from urllib import request  # Only needed once a plugin runs, it is slow to import
+        from volatility3.framework import automagic, contexts
+
+        self.dump_path = dump_path
+        self.context = contexts.Context()
+        self.context.config['automagic.LayerStacker.single_location'] = "file:" + request.pathname2url(os.path.abspath(dump_path))
+        self.automagics = automagic.available(self.context)
+        self.shared_config = {}  # requirement name -> configuration branch found by automagic
+        self.runs = 0
+
+    def apply_shared_config(self, plugin, config_path):
+        """Point the plugin at the layers and symbols an earlier plugin already built, so automagic can skip them."""
+        from volatility3.framework import interfaces
+
+        for requirement in plugin.get_requirements():
+            if requirement.name not in self.shared_config:
+                continue
+            if type(requirement).__name__ not in SHARED_REQUIREMENT_TYPES:
+                continue
+            requirement_path = interfaces.configuration.path_join(config_path, requirement.name)
+            for key, value in self.shared_config[requirement.name].items():
+                self.context.config[interfaces.configuration.path_join(requirement_path, key) if key else requirement_path] = value
+
+    def remember_shared_config(self, plugin, config_path):
+        from volatility3.framework import interfaces
+
+        for requirement in plugin.get_requirements():
+            if type(requirement).__name__ not in SHARED_REQUIREMENT_TYPES:
+                continue
+            requirement_path = interfaces.configuration.path_join(config_path, requirement.name)
+            if requirement_path not in self.context.config:
+                continue
+            values = {"": self.context.config[requirement_path]}
+            branch = self.context.config.branch(requirement_path)
+            for key in branch:
+                values[key] = branch[key]
+            self.shared_config[requirement.name] = values
+
+class VolatilityEngine:
+    """Runs volatility3 plugins through the library API instead of starting vol.py for every command."""
+    def __init__(self, volatility_path, symbol_dir=None):
+        self.volatility_path = volatility_path
+        self.symbol_dir = symbol_dir
+        self.framework = None
+        self.plugin_list = {}
+        self.dump_contexts = {}  # Not thread safe, callers run plugins one at a time (the "inprocess" exclusive job key)
+
+    def load_framework(self):
+        if self.framework is not None:
+            return self.framework
+
+        if self.volatility_path and os.path.isdir(self.volatility_path) and self.volatility_path not in sys.path:
+            sys.path.insert(0, self.volatility_path)
+
+        import volatility3.framework as framework
+        import volatility3.plugins
+        import volatility3.symbols
+        from volatility3.framework import constants
+
+        framework.require_interface_version(2, 0, 0)
+        if self.symbol_dir:
+            # Same as vol.py -s <dir> --offline: the local symbol tables first, never download any
+            volatility3.symbols.__path__ = [os.path.abspath(self.symbol_dir)] + constants.SYMBOL_BASEPATHS
+            constants.OFFLINE = True
+        failures = framework.import_files(volatility3.plugins, True)
+        if failures:
+            print(f"Volatility plugins that failed to load: {failures}")
+        self.plugin_list = framework.list_plugins()
+        self.framework = framework
+        print(f"Loaded volatility3 framework from {self.volatility_path} with {len(self.plugin_list)} plugins")
+        return framework
+
+    def find_plugin(self, command):
+        if command in self.plugin_list:
+            return self.plugin_list[command]
+
+        # Commands are stored the way vol.py accepts them, e.g. "windows.pslist" for "windows.pslist.PsList"
+        matches = [name for name in self.plugin_list if name.lower().startswith(command.lower() + ".")]
+        if len(matches) == 1:
+            return self.plugin_list[matches[0]]
+        if not matches:
+            raise ValueError(f"Unknown volatility plugin: {command}")
+        raise ValueError(f"Ambiguous volatility plugin {command}, matches: {', '.join(matches)}")
+
+    def get_dump_context(self, dump_path):
+        dump_path = os.path.abspath(dump_path)
+        if dump_path not in self.dump_contexts:
+            self.dump_contexts[dump_path] = DumpContext(dump_path)
+        return self.dump_contexts[dump_path]
+
+    def forget_dump(self, dump_path):
+        self.dump_contexts.pop(os.path.abspath(dump_path), None)
+
+    def run_plugin(self, dump_path, command, parameters, sink):
+        """Run a plugin and hand its columns and rows to sink (set_columns/add_row, e.g. a ResultTable)."""
+        from volatility3.framework import automagic, interfaces, plugins
+
+        self.load_framework()
+        plugin = self.find_plugin(command)
+        dump = self.get_dump_context(dump_path)
+
+        config_path = interfaces.configuration.path_join("plugins", plugin.__name__)
+        apply_parameters(dump.context, config_path, plugin, parameters)
+        dump.apply_shared_config(plugin, config_path)
+
+        automagics = automagic.choose_automagic(dump.automagics, plugin)
+        constructed = plugins.construct_plugin(dump.context, automagics, plugin, "plugins", None, get_file_handler())
+        dump.remember_shared_config(plugin, config_path)
+        dump.runs += 1
+
+        fill_table(constructed.run(), sink)
+
+    def shutdown(self):
+        # Let go of every dump's layers and symbol tables
+        self.dump_contexts.clear()
+
+def get_file_handler():
+    # Same file handler vol.py uses, so dumping plugins write their files to the working directory
+    try:
+        from volatility3.cli import CLIDirectFileHandler
+        return CLIDirectFileHandler
+    except ImportError:
+        return None
+
+def apply_parameters(context, config_path, plugin, parameters):
+    """Translate a vol.py style parameter string such as '--pid 1234 --dump' into plugin configuration."""
+    from volatility3.framework import interfaces
+
+    plugin_requirements = {requirement.name: requirement for requirement in plugin.get_requirements()}
+
+    # The context is reused between runs, so clear the options an earlier run of this plugin set
+    for name, requirement in plugin_requirements.items():
+        option_path = interfaces.configuration.path_join(config_path, name)
+        if type(requirement).__name__ not in SHARED_REQUIREMENT_TYPES and option_path in context.config:
+            del context.config[option_path]
+
+    tokens = shlex.split(parameters or "")
+    index = 0
+    while index < len(tokens):
+        token = tokens[index]
+        if not token.startswith("--"):
+            raise ValueError(f"Unexpected parameter: {token}")
+        name = token[2:].replace("-", "_")
+        if name not in plugin_requirements:
+            raise ValueError(f"Unknown option {token} for {plugin.__name__}")
+        requirement = plugin_requirements[name]
+        index += 1
+
+        values = []
+        while index < len(tokens) and not tokens[index].startswith("--"):
+            values.append(tokens[index])
+            index += 1
+
+        requirement_type = type(requirement).__name__
+        if requirement_type == "BooleanRequirement":
+            value = True
+        elif requirement_type == "ListRequirement":
+            value = [convert_value(item, requirement.element_type) for item in values]
+        elif values:
+            value = convert_value(values[0], getattr(requirement, "instance_type", str))
+        else:
+            raise ValueError(f"Option {token} needs a value")
+
+        context.config[interfaces.configuration.path_join(config_path, name)] = value
+
+def convert_value(value, value_type):
+    if value_type is int:
+        return int(value, 0)  # Accept 0x addresses as well as plain numbers
+    if value_type is bool:
+        return value.lower() in ("1", "true", "yes")
+    return value_type(value)
+
+def fill_table(grid, sink):
+    """Pass a TreeGrid on row by row as plain python values, the column types keep the hex/bin display hints."""
+    from volatility3.framework import interfaces
+    from volatility3.framework.renderers import format_hints
+
+    def plain_value(value):
+        if isinstance(value, interfaces.renderers.BaseAbsentValue):
+            return None
+        if isinstance(value, (format_hints.Hex, format_hints.Bin)):
+            return int(value)
+        if isinstance(value, bytes):
+            return value.hex()
+        if isinstance(value, datetime.datetime):
+            return value.isoformat(sep=" ")
+        if isinstance(value, (bool, int, float, str)):
+            return value
+        return str(value)
+
+    def visitor(node, accumulator):
+        sink.add_row([plain_value(value) for value in node.values], node.path_depth - 1)
+        return accumulator
+
+    sink.set_columns([(column.name, column.type.__name__.lower()) for column in grid.columns])
+    grid.populate(visitor, None)
@@ -0,0 +1,212 @@
+import multiprocessing
+import os
+import threading
+from logic.src.job_scheduler import current_job
+from logic.src.result_table import ResultTable
+from logic.src.symbol_cache import SymbolCache
+from logic.src.system_resources import process_memory
+from logic.src.volatility_engine import VolatilityEngine
+
+DEFAULT_MAX_JOBS = 25  # Plugin runs before a worker is replaced with a fresh one
+DEFAULT_MEMORY_LIMIT = 4 * 1024 * 1024 * 1024  # Bytes of resident memory before a worker is replaced
+DEFAULT_WARMUP_COMMAND = "windows.info"
+PIPE_BATCH_ROWS = 1000  # Result rows sent to the GUI in one message
+
+class PipeSink:
+    """Batches plugin rows so the worker doesn't send one pipe message per row."""
+    def __init__(self, connection):
+        self.connection = connection
+        self.pending = []
+
+    def set_columns(self, columns):
+        self.connection.send(("columns", columns))
+
+    def add_row(self, values, depth=0):
+        self.pending.append((values, depth))
+        if len(self.pending) >= PIPE_BATCH_ROWS:
+            self.flush()
+
+    def flush(self):
+        if self.pending:
+            self.connection.send(("rows", self.pending))
+            self.pending = []
+
+def worker_main(connection, volatility_path, dump_path, warmup_command, symbol_dir=None):
+    engine = VolatilityEngine(volatility_path, symbol_dir)
+    try:
+        if symbol_dir:
+            # Unpack the dump's kernel symbol table before the warmup plugin looks for it
+            symbols = SymbolCache(symbol_dir)
+            symbols.index()
+            symbols.prewarm(dump_path)
+        engine.load_framework()
+        if warmup_command:
+            # Builds the layer stack and symbol tables once, the output itself is thrown away
+            engine.run_plugin(dump_path, warmup_command, "", ResultTable())
+    except Exception as e:
+        print(f"Worker for {dump_path} could not warm up: {e}")
+    connection.send(("ready", process_memory()))
+
+    while True:
+        try:
+            job = connection.recv()
+        except EOFError:
+            break
+        if job is None:
+            break
+
+        command, parameters = job
+        sink = PipeSink(connection)
+        try:
+            engine.run_plugin(dump_path, command, parameters, sink)
+            sink.flush()
+            connection.send(("done", process_memory()))
+        except ImportError as e:
+            sink.flush()
+            connection.send(("import_error", f"{type(e).__name__}: {e}", process_memory()))  # The GUI falls back to vol.py
+        except Exception as e:
+            sink.flush()
+            connection.send(("error", f"{type(e).__name__}: {e}", process_memory()))
+    connection.close()
+
+class WorkerStopped(Exception):
+    pass
+
+class WarmWorker:
+    """A volatility process pinned to one memory dump that takes plugin jobs over a pipe."""
+    def __init__(self, volatility_path, dump_path, warmup_command=DEFAULT_WARMUP_COMMAND, symbol_dir=None):
+        self.dump_path = dump_path
+        self.jobs = 0
+        self.memory = 0
+        self.ready = False
+        self.stopped = False
+        self.lock = threading.Lock()
+
+        context = multiprocessing.get_context("spawn")
+        self.connection, child_connection = context.Pipe()
+        self.process = context.Process(target=worker_main, args=(child_connection, volatility_path, dump_path, warmup_command, symbol_dir), daemon=True)
+        self.process.start()
+        child_connection.close()
+        print(f"Started worker {self.process.pid} for {dump_path}")
+
+    def is_alive(self):
+        return self.process.is_alive()
+
+    def run(self, command, parameters, sink):
+        with self.lock:
+            if self.stopped:
+                raise WorkerStopped()
+            job = current_job()
+            if job:
+                job.attach_process(self.process, group=False)  # Cancelling the job kills this worker, the pool starts a new one
+            self.connection.send((command, parameters))
+            while True:
+                try:
+                    message = self.connection.recv()
+                except EOFError:
+                    raise RuntimeError(f"Worker for {os.path.basename(self.dump_path)} exited unexpectedly")
+
+                kind = message[0]
+                if kind == "ready":
+                    self.ready = True
+                    self.memory = message[1]
+                elif kind == "columns":
+                    sink.set_columns(message[1])
+                elif kind == "rows":
+                    for values, depth in message[1]:
+                        sink.add_row(values, depth)
+                elif kind == "done":
+                    self.jobs += 1
+                    self.memory = message[1]
+                    return
+                elif kind in ("error", "import_error"):
+                    self.jobs += 1
+                    self.memory = message[2]
+                    raise (ImportError if kind == "import_error" else RuntimeError)(message[1])
+
+    def stop(self):
+        # Waits for a running job to finish, jobs queued behind it get WorkerStopped and move to the replacement
+        with self.lock:
+            self.stopped = True
+            try:
+                self.connection.send(None)
+            except (OSError, ValueError):
+                pass
+            self.process.join(timeout=2)
+            self.terminate()
+
+    def terminate(self):
+        self.stopped = True
+        if self.process.is_alive():
+            self.process.terminate()
+        self.connection.close()
+        print(f"Stopped worker for {self.dump_path}")
+
+class WorkerPool:
+    """Keeps one warm worker per loaded dump and replaces workers that did too much or grew too big."""
+    def __init__(self, volatility_path, max_jobs=DEFAULT_MAX_JOBS, memory_limit=DEFAULT_MEMORY_LIMIT, warmup_command=DEFAULT_WARMUP_COMMAND, symbol_dir=None):
+        self.volatility_path = volatility_path
+        self.symbol_dir = symbol_dir
+        self.max_jobs = max_jobs
+        self.memory_limit = memory_limit
+        self.warmup_command = warmup_command
+        self.workers = {}
+        self.lock = threading.Lock()
+
+    def start_worker(self, dump_path):
+        worker = WarmWorker(self.volatility_path, dump_path, self.warmup_command, self.symbol_dir)
+        self.workers[dump_path] = worker
+        return worker
+
+    def sync(self, dump_paths):
+        """Start workers for newly loaded dumps and stop the ones whose dump was closed."""
+        with self.lock:
+            for dump_path in list(self.workers):
+                if dump_path not in dump_paths:
+                    self.workers.pop(dump_path).terminate()
+            for dump_path in dump_paths:
+                if dump_path not in self.workers:
+                    self.start_worker(dump_path)
+
+    def get_worker(self, dump_path):
+        with self.lock:
+            worker = self.workers.get(dump_path)
+            if worker is None or worker.stopped or not worker.is_alive():
+                worker = self.start_worker(dump_path)
+            return worker
+
+    def run(self, dump_path, command, parameters, sink):
+        while True:
+            worker = self.get_worker(dump_path)
+            try:
+                worker.run(command, parameters, sink)
+                return
+            except WorkerStopped:
+                continue  # The worker was recycled while this job waited for it
+            finally:
+                self.recycle_if_needed(worker)
+
+    def recycle_if_needed(self, worker):
+        reason = None
+        if worker.stopped:
+            return
+        if not worker.is_alive():
+            reason = "it exited"
+        elif worker.jobs >= self.max_jobs:
+            reason = f"it ran {worker.jobs} jobs"
+        elif self.memory_limit and worker.memory > self.memory_limit:
+            reason = f"it uses {worker.memory // (1024 * 1024)} MB"
+        if reason is None:
+            return
+
+        print(f"Recycling worker for {worker.dump_path} because {reason}")
+        with self.lock:
+            if self.workers.get(worker.dump_path) is worker:
+                self.start_worker(worker.dump_path)  # Warm the replacement right away
+        worker.stop()
+
+    def shutdown(self):
+        with self.lock:
+            for worker in self.workers.values():
+                worker.terminate()
+            self.workers = {}
@@ -1,86 +1,107 @@
-import concurrent.futures
+import copy
 import json
 import os
-import subprocess
 import textwrap
+import threading
+import itertools
+import time
 import re
+import shlex
+import zipfile
 from tkinter import ttk
 import tkinter as tk
 from tkinter import filedialog, messagebox, colorchooser
+from logic.src.volatility_engine import VolatilityEngine
+from logic.src.job_scheduler import JobScheduler, JobCancelled, current_job, get_cost_hint, PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_LOW, MB
+from logic.src.profiles import load_profiles, find_profile, get_stages, missing_commands
+from logic.src.result_cache import ResultCache, DEFAULT_MAX_SIZE
+from logic.src.result_table import ResultTable, TableSink, TEXT_LIMIT_NOTE
+from logic.src.command_catalog import load_commands, save_commands, get_command_store, get_settings_store, get_setting, volatility_script, command_timeout
+from logic.src.command_runner import command_line, display_command, run_command_line
+from logic.src.worker_pool import WorkerPool, DEFAULT_MAX_JOBS, DEFAULT_MEMORY_LIMIT, DEFAULT_WARMUP_COMMAND
+from logic.src.result_diff import diff_tables
+from logic.src.package_reader import read_metadata, iter_output, extract_package_dump
+from logic.src.search_index import SearchIndex, search_table_rows
+from logic.src.symbol_cache import SymbolCache
+from logic.src.text_store import TextStore
+
+STREAM_FLUSH_INTERVAL = 100  # ms between text widget updates while a command is still running
+TEXT_VIEW_MAX_ROWS = 20000  # Rows of a result table written to the text view, the table view shows all of them
 
 class CustomText(tk.Text):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
 class LineNumberCanvas(tk.Canvas):
-    def __init__(self, master, text_widget, start_line=5, **kwargs):
+    def __init__(self, master, text_widget, start_line=5, line_offset=None, **kwargs):
         super().__init__(master, **kwargs)
         self.text_widget = text_widget
         self.start_line = start_line
-        self.text_widget.bind("<KeyRelease>", self.on_key_release)
-        self.text_widget.bind("<MouseWheel>", self.on_scroll)
-
-        self.text_widget.bind("<KeyRelease>", self.on_content_change)
-        self.text_widget.bind("<MouseWheel>", self.on_content_change)
-        self.text_widget.bind("<<Change>>", self.on_content_change)
-        self.text_widget.bind("<Configure>", self.on_content_change)
-        self.text_widget.bind("<Button-1>", self.on_content_change)
-
-        # Synchronize scrolling
-        self.text_widget.bind("<MouseWheel>", self.on_text_widget_scroll)
-        self.text_widget.bind("<Button-4>", self.on_text_widget_scroll)
-        self.text_widget.bind("<Button-5>", self.on_text_widget_scroll)
-        self.text_widget.bind("<KeyPress>", self.on_text_widget_scroll)
-        self.text_widget.bind("<Motion>", self.on_text_widget_scroll)
-        self.text_widget.bind("<ButtonRelease-1>", self.on_text_widget_scroll)
-        self.text_widget.bind("<<ScrollbarVisible>>", self.on_text_widget_scroll)
+        self.line_offset = line_offset  # Optional callable, lines of the output before the widget's first line (windowed views)
+        self.update_pending = False
+        self.items = []  # Text items reused between redraws, one per visible line
+        self.drawn_range = None
 
-        self.update_line_numbers()
-
-    def on_content_change(self, event=None):
-        self.update_line_numbers()
+        # Every event only schedules a redraw, so a burst of them costs one redraw in the next idle cycle
+        for sequence in ("<KeyPress>", "<KeyRelease>", "<MouseWheel>", "<Button-4>", "<Button-5>", "<Button-1>",
+                         "<B1-Motion>", "<ButtonRelease-1>", "<Configure>", "<<Change>>", "<<ScrollbarVisible>>"):
+            self.text_widget.bind(sequence, self.schedule_update, add="+")
 
-    def on_text_widget_scroll(self, event):
         self.update_line_numbers()
-        return "break"
 
-    def on_mouse_scroll(self, event):
-        self.text_widget.yview_scroll(int(-1 * (event.delta / 120)), "units")
-        self.update_line_numbers()
-        return "break"
+    def schedule_update(self, event=None):
+        if not self.update_pending:
+            self.update_pending = True
+            self.after_idle(self.update_line_numbers)
 
-    def on_scroll(self, event=None):
-        self.update_line_numbers()
-
-    def on_key_release(self, event=None):
-        self.update_line_numbers()
+    def visible_range(self):
+        first = self.text_widget.index("@0,0")
+        dline = self.text_widget.dlineinfo(first)
+        offset = self.line_offset() if self.line_offset else 0
+        return first, self.text_widget.index(f"@0,{self.text_widget.winfo_height()}"), dline[1] if dline else None, offset
 
     def update_line_numbers(self):
-        self.delete("all")
-        # Calculate the starting line index
-        visible_start_index = self.text_widget.index("@0,0")
-        line_index = int(visible_start_index.split(".")[0])
-        line_count = max(1, line_index - self.start_line + 1)
-
-        i = self.text_widget.index(f"{visible_start_index}")
-
+        self.update_pending = False
+        try:
+            visible_range = self.visible_range()
+        except tk.TclError:
+            return  # The text widget is gone
+        if visible_range == self.drawn_range:
+            return  # Same lines at the same place, e.g. the mouse only moved
+        self.drawn_range = visible_range
+        offset = visible_range[3]
+
+        count = 0
+        index = visible_range[0]
         while True:
-            dline = self.text_widget.dlineinfo(i)
+            dline = self.text_widget.dlineinfo(index)
             if dline is None:
                 break
-            y = dline[1]
-            if int(i.split(".")[0]) >= self.start_line:
-                self.create_text(2, y, anchor="nw", text=str(line_count), font=("Arial", 10), fill="white")
-                line_count += 1
-            i = self.text_widget.index(f"{i}+1line")
+            line = int(index.split(".")[0])
+            if line >= self.start_line:
+                text = str(offset + line - self.start_line + 1)
+                if count < len(self.items):
+                    # Move an existing item instead of deleting and recreating all of them
+                    item = self.items[count]
+                    self.coords(item, 2, dline[1])
+                    if self.itemcget(item, "text") != text:
+                        self.itemconfigure(item, text=text)
+                    self.itemconfigure(item, state="normal")
+                else:
+                    self.items.append(self.create_text(2, dline[1], anchor="nw", text=text, font=("Arial", 10), fill="white"))
+                count += 1
+            next_index = self.text_widget.index(f"{index}+1line")
+            if next_index == index:
+                break
+            index = next_index
 
-    def attach(self, widget):
-        widget.bind("<MouseWheel>", self.on_mouse_scroll)
-        widget.bind("<Button-4>", self.on_mouse_scroll)
-        widget.bind("<Button-5>", self.on_mouse_scroll)
+        for item in self.items[count:]:
+            self.itemconfigure(item, state="hidden")
 
-    def on_mouse_scroll(self, event):
-        self.update_line_numbers()
+    def attach(self, widget):
+        widget.bind("<MouseWheel>", self.schedule_update, add="+")
+        widget.bind("<Button-4>", self.schedule_update, add="+")
+        widget.bind("<Button-5>", self.schedule_update, add="+")
 
 class ToolTip(object):
     def __init__(self, widget, text, delay=900):
@@ -142,6 +163,54 @@ class RedirectOutput:
     def flush(self):
         pass
 
+class OutputStream:
+    """Appends command output to the TextStore of a tab on a worker thread and refreshes its view in batches."""
+    def __init__(self, view, flush_interval=STREAM_FLUSH_INTERVAL, tee=None):
+        self.view = view
+        self.text_widget = view.text_widget
+        self.tee = tee  # Optional second destination, e.g. a result cache writer
+        self.failed = False
+        self.flush_interval = flush_interval
+        self.flush_scheduled = False
+        self.closed = False
+        self.lock = threading.Lock()
+
+    def write(self, data):
+        if self.tee:
+            self.tee.write(data)
+        if self.closed:
+            return
+        try:
+            # The store is a file, so a fast plugin never waits for Tk, only the view refresh is batched
+            self.view.store.append(data)
+        except ValueError:
+            self.closed = True  # The tab was closed and its store with it
+            return
+        with self.lock:
+            schedule = not self.flush_scheduled
+            self.flush_scheduled = True
+        if schedule:
+            self.text_widget.after(self.flush_interval, self.flush)
+
+    def flush(self):
+        with self.lock:
+            self.flush_scheduled = False
+        try:
+            self.view.refresh()
+        except (tk.TclError, ValueError):
+            self.closed = True  # The tab was closed while the command was still running
+
+    def close(self):
+        if self.tee:
+            if self.failed:
+                self.tee.discard()
+            else:
+                self.tee.commit()
+            self.tee = None
+        with self.lock:
+            self.flush_scheduled = True
+        self.text_widget.after(0, self.flush)
+
 class CustomDropdown(tk.Frame):
     def __init__(self, parent, options, var, *args, **kwargs):
         super().__init__(parent, *args, **kwargs)
@@ -257,15 +326,41 @@ class CustomDropdown(tk.Frame):
             print("Entry widget is not focused.")
 
 class WorkspaceFrameLogic:
-    def __init__(self, parent, file_handler):
+    def __init__(self, parent, file_handler, create_text_view, create_table_view, journal=None):
         self.parent = parent
         self.file_handler = file_handler
+        # The widgets come from the UI: create_text_view(text_widget, store, scrollbar) returns the view the
+        # output is written to, create_table_view(tab, table) adds a table view of a result to its tab
+        self.create_text_view = create_text_view
+        self.create_table_view = create_table_view
+        self.journal = journal  # SessionJournal the workspace is recorded in, None to keep no record
         self.command_tabs = {}
         self.commands = self.load_commands()
+        get_command_store().subscribe(self.on_commands_changed)  # Edits in the Manage Commands screen or on disk show up without a restart
         self.command_details = {}
-        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=4)
-        self.running_process = None
+        # Schedules jobs by priority, CPU count and available memory instead of a fixed number of threads
+        max_workers = self.get_setting('scheduler_max_workers')
+        memory_limit = self.get_setting('scheduler_memory_limit_mb')
+        self.executor = JobScheduler(
+            max_workers=int(max_workers) if max_workers else None,
+            memory_limit=int(memory_limit) * MB if memory_limit else None
+        )
+        self.tab_jobs = {}  # tab -> (job, cancel button) while the tab's command is queued or running
+        self.result_tables = {}  # tab -> ResultTable behind the tab's text
+        self.text_views = {}  # tab -> WindowedTextView over the tab's TextStore
+        self.search_indexes = {}  # tab -> SearchIndex of the same store, built once the output is complete
         self.futures = []
+        self.batch_total = 0  # Commands started since the last time everything was idle
+        self.batch_done = 0
+        self.stream_output = True  # Show output in the tab while the command is still running
+        self.engine = None
+        self.worker_pool = None
+        self.result_cache = None
+        self.symbol_cache = None
+        self.lazy_tabs = {}  # tab -> (loader, args) that fills the tab the first time it is shown
+        self.watching_tabs = False
+        self.tab_sources = {}  # tab -> cached result its running command is written to, for the journal
+        self.symbol_lock = threading.Lock()  # One SymbolCache is created at a time
 
     def update_loaded_file_label(self, loaded_files=None):
         if loaded_files is None:
@@ -278,11 +373,12 @@ class WorkspaceFrameLogic:
             self.parent.select_first_file_in_sidebar()
         else:
             self.parent.hide_sidebar()
+        self.sync_worker_pool()
+        self.scan_loaded_dumps()
 
     def save_commands(self):
         try:
-            with open('commands.json', 'w') as file:
-                json.dump(self.commands, file, indent=4)
+            save_commands(self.commands)
         except Exception as e:
             messagebox.showerror("Error", f"Failed to save commands: {str(e)}")
 
@@ -305,22 +401,23 @@ class WorkspaceFrameLogic:
             "description": f"This is your custom plugin {plugin_name}"
         }
         self.commands.append(custom_plugin_details)
-        self.save_commands()  # Save changes to disk or other storage
-        messagebox.showinfo("Restart Required", "Please restart the application for this to work.")
+        self.save_commands()  # The command store tells every screen about the new command
 
     def reload_commands_from_file(self):
-        try:
-            with open('commands.json', 'r') as file:
-                self.commands = json.load(file)
-                print("Commands reloaded from file:", self.commands)
-        except Exception as e:
-            print("Failed to reload commands:", str(e))
-            self.commands = []  # Default to an empty list on failure
+        # Only reads commands.json when it changed, on_commands_changed picks up the new list
+        get_command_store().refresh()
+
+    def on_commands_changed(self, commands):
+        # Called by the command store, possibly on a job's thread
+        self.parent.after(0, self.apply_commands, copy.deepcopy(commands))
+
+    def apply_commands(self, commands):
+        self.commands = commands
+        self.parent.update_command_options()
 
     def load_commands(self):
         try:
-            with open('commands.json', 'r') as file:
-                return json.load(file)
+            return load_commands()
         except FileNotFoundError:
             messagebox.showerror("Error", "Commands file not found.")
             return []
@@ -332,14 +429,47 @@ class WorkspaceFrameLogic:
         self.parent.switch_to_export_frame()
 
     def get_volatility_path(self):
-        with open('settings.json', 'r') as file:
-            settings = json.load(file)
+        return volatility_script(get_settings_store().get())
+
+    def get_setting(self, key, default=None):
+        return get_setting(key, default)
+
+    def get_engine(self):
+        # One engine per volatility installation, it keeps the per dump contexts warm between runs
+        base_path = self.get_setting('volatility_path', '')
+        symbol_dir = self.get_setting('symbol_directory') or None
+        if self.engine is None or self.engine.volatility_path != base_path or self.engine.symbol_dir != symbol_dir:
+            if self.engine:
+                self.engine.shutdown()
+            self.engine = VolatilityEngine(base_path, symbol_dir)
+        return self.engine
+
+    def get_symbol_cache(self, directory=None):
+        """The local symbol table directory from the settings (or the one given), None when there is none."""
+        directory = directory or self.get_setting('symbol_directory')
+        if not directory or not os.path.isdir(directory):
+            return None
+        with self.symbol_lock:
+            if self.symbol_cache is None or self.symbol_cache.directory != directory:
+                self.symbol_cache = SymbolCache(directory)
+            return self.symbol_cache
+
+    def prepare_symbols(self, dump_path):
+        cache = self.get_symbol_cache()
+        if cache is None:
+            return
+        cache.prepare(dump_path)  # Locks per dump, jobs on other dumps don't wait for this one's scan
 
-        base_path = settings.get('volatility_path', '')
-        full_path = os.path.join(base_path, 'vol.py')
-        full_path = full_path.replace('/', os.sep)
+    def scan_loaded_dumps(self):
+        # Find each new dump's kernel while the user picks a command, so the first run doesn't scan it
+        cache = self.get_symbol_cache()
+        if cache is not None:
+            cache.match_in_background(self.file_handler.get_loaded_files())
 
-        return full_path
+    def run_prepared(self, dump_path, function, *args):
+        # The dump's kernel symbol table is unpacked before the plugin looks for it
+        self.prepare_symbols(dump_path)
+        return function(*args)
 
     def update_command_info(self, event):
         selected_command = self.parent.command_var.get()
@@ -357,25 +487,60 @@ class WorkspaceFrameLogic:
                 self.parent.command_info_label.config(text=wrapped_text)
                 self.parent.run_command_button.config(state=tk.NORMAL)
 
-    def command_finished(self, future, command_name, file_path):
+    def command_finished(self, future, command_name, file_path, stream=None, tab=None, table=None):
         try:
-            if future.done():
+            if future.cancelled():
+                print(f"{command_name} on {file_path} was cancelled before it started")
+                if stream:
+                    stream.failed = True
+                    stream.write("Cancelled before it started.")
+                    stream.close()
+            elif future.done():
                 command_result, findings = future.result()
-                self.parent.after(0, self.add_tab, file_path, command_name, findings)
                 tab_title = f"{command_name} ({os.path.basename(file_path)})"
-                self.command_details[tab_title] = {
-                    "command": command_name,
-                                        "output": findings,
-                    "highlights": []
-                }
-                self.check_all_commands_finished()
+                if findings is None:
+                    # Streamed commands already have their tab, the output lives in the text widget
+                    self.command_details[tab_title] = {
+                        "command": command_name,
+                        "table": table,
+                        "highlights": []
+                    }
+                else:
+                    self.parent.after(0, self.add_tab, file_path, command_name, findings)
+                    self.command_details[tab_title] = {
+                        "command": command_name,
+                        "output": findings,
+                        "table": table,
+                        "highlights": []
+                    }
         except Exception as e:
-            messagebox.showerror("Error", f"Error executing command {command_name}: {str(e)}")
+            self.parent.after(0, messagebox.showerror, "Error", f"Error executing command {command_name}: {str(e)}")
             print(f"Exception when processing command result: {e}")
-
-    def add_tab(self, file_path, command_name, findings):
+        finally:
+            self.parent.after(0, self.command_done, tab)
+
+    def command_done(self, tab=None):
+        if tab is not None:
+            self.forget_tab_job(tab)
+            self.index_tab(tab)
+            self.record_result(tab)
+        self.batch_done += 1
+        self.check_all_commands_finished()
+        self.update_progress()
+
+    def add_tab(self, file_path, command_name, findings, from_cache=False, store=None, title=None):
         # Construct the title for the tab using the file name and command name
         tab_title = f"{command_name} ({os.path.basename(file_path)}) "
+        if from_cache:
+            tab_title += "[cached] "  # Mark results that were loaded instead of re-run
+        if title:
+            tab_title = title + " "  # e.g. a restored tab keeps the title it had
+
+        # Tabs are found by their title, so a title that is already open gets a number
+        base_title, number = tab_title, 2
+        while tab_title in self.command_tabs:
+            tab_title = f"{base_title.rstrip()} #{number} "
+            number += 1
 
         # Create a new frame in the notebook (tab control) and add it with the title
         new_tab = ttk.Frame(self.parent.tab_control)
@@ -390,13 +555,21 @@ class WorkspaceFrameLogic:
 
         # Create the text widget
         text_widget = CustomText(text_frame, wrap='none')  # Disable line wrapping
-        text_widget.insert('1.0', findings)  # Insert the findings at the start
         text_widget.config(state='disabled')  # Make the text widget read-only
 
         # Create the scroll bars
-        v_scrollbar = tk.Scrollbar(text_frame, orient='vertical', command=text_widget.yview)
+        v_scrollbar = tk.Scrollbar(text_frame, orient='vertical')
         h_scrollbar = tk.Scrollbar(text_frame, orient='horizontal', command=text_widget.xview)
-        text_widget.config(yscrollcommand=v_scrollbar.set, xscrollcommand=h_scrollbar.set)
+        text_widget.config(xscrollcommand=h_scrollbar.set)
+
+        # The text lives in a store on disk, the widget only holds the lines around what is on screen
+        if store is None:
+            store = TextStore()
+            store.append(findings)
+        self.text_views[str(new_tab)] = self.create_text_view(text_widget, store, v_scrollbar)
+        self.search_indexes[str(new_tab)] = SearchIndex(store)
+        if findings:
+            self.index_tab(new_tab)
 
         # Pack the widgets
         v_scrollbar.pack(side='right', fill='y')
@@ -404,37 +577,179 @@ class WorkspaceFrameLogic:
         text_widget.pack(side='left', fill='both', expand=True)
 
         self.parent.show_close_button(new_tab)
-
-    def execute_command(self, full_command):
-        process = subprocess.Popen(full_command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, shell=True)
-        stdout, stderr = process.communicate()
-
-        findings = stdout if stdout else "No output received."
+        return text_widget
+
+    def table_sink(self, table, write, stream=None):
+        # Past TEXT_VIEW_MAX_ROWS the rows only go into the table and the tab switches to the table view
+        if stream is None:
+            return TableSink(table, write)
+        tab = stream.text_widget.master.master
+        return TableSink(table, write, TEXT_VIEW_MAX_ROWS, lambda: tab.after(0, self.parent.show_table_view, tab))
+
+    def execute_command(self, full_command, table=None):
+        output = []
+        sink = self.table_sink(table, output.append) if table is not None else None
+        received_output, stderr, exit_code = run_command_line(full_command, output.append, sink)
+        job = current_job()
+        findings = "".join(output) or "No output received."
         if stderr:
             findings += "\nError:\n" + stderr
+        if job and job.cancel_requested:
+            findings += "\n" + job.cancel_reason
 
         return full_command, findings
 
-    def execute_command(self, full_command):
-        process = subprocess.Popen(full_command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, shell=True)
-        stdout, stderr = process.communicate()
-
-        findings = stdout if stdout else "No output received."
+    def execute_command_streaming(self, full_command, stream, table=None):
+        sink = self.table_sink(table, stream.write, stream) if table is not None else None
+        received_output, stderr, exit_code = run_command_line(full_command, stream.write, sink)
+        job = current_job()
+        if exit_code != 0:
+            stream.failed = True
+        if not received_output:
+            stream.write("No output received.")
         if stderr:
-            findings += "\nError:\n" + stderr
+            stream.write("\nError:\n" + stderr)
+        if job and job.cancel_requested:
+            stream.failed = True
+            stream.write("\n" + job.cancel_reason)
+        stream.close()
+
+        return full_command, None
+
+    def get_result_cache(self):
+        if self.result_cache is None:
+            max_size = int(self.get_setting('result_cache_size_mb', DEFAULT_MAX_SIZE // (1024 * 1024))) * 1024 * 1024
+            self.result_cache = ResultCache(max_size=max_size)
+        return self.result_cache
+
+    def open_cached_result(self, file_path, command_name, cache_key):
+        text_widget = self.add_tab(file_path, command_name, "", from_cache=True)
+        table = None
+        if self.get_result_cache().entry_format(cache_key) == "table":
+            table = ResultTable()
+            self.add_table_view(text_widget.master.master, table)
+        self.journal_tab(text_widget.master.master, command_name, {"kind": "cache", "key": cache_key, "table": table is not None})
+        tab_title = f"{command_name} ({os.path.basename(file_path)}) [cached]"
+        self.command_details[tab_title] = {
+            "command": command_name,
+            "table": table,
+            "highlights": []
+        }
+        self.executor.submit_job(self.load_cached_result, cache_key, OutputStream(self.get_text_view(text_widget.master.master)), table, name=f"{command_name} (cached)", dump=file_path, priority=PRIORITY_HIGH, cost={"memory_mb": 64, "cpu": 1})
 
-        return full_command, findings
+    def load_cached_result(self, cache_key, stream, table=None):
+        try:
+            if table is not None:
+                self.get_result_cache().load_table(cache_key, table)
+                chunks = table.iter_text(range(min(len(table), TEXT_VIEW_MAX_ROWS)))
+                if len(table) > TEXT_VIEW_MAX_ROWS:
+                    tab = stream.text_widget.master.master
+                    tab.after(0, self.parent.show_table_view, tab)
+                    chunks = itertools.chain(chunks, [TEXT_LIMIT_NOTE])
+            else:
+                chunks = self.get_result_cache().read_chunks(cache_key)
+            for chunk in chunks:
+                stream.write(chunk)
+        except (OSError, ValueError) as e:
+            stream.write("\nError:\nCould not read cached result: " + str(e))
+        stream.close()
+        index = self.search_indexes.get(str(stream.text_widget.master.master))
+        if index:
+            index.build()  # Already on a background thread
+
+    def get_worker_pool(self):
+        base_path = self.get_setting('volatility_path', '')
+        symbol_dir = self.get_setting('symbol_directory') or None
+        if self.worker_pool is None or self.worker_pool.volatility_path != base_path or self.worker_pool.symbol_dir != symbol_dir:
+            if self.worker_pool:
+                self.worker_pool.shutdown()
+            self.worker_pool = WorkerPool(
+                base_path,
+                symbol_dir=symbol_dir,
+                max_jobs=int(self.get_setting('worker_max_jobs', DEFAULT_MAX_JOBS)),
+                memory_limit=int(self.get_setting('worker_memory_limit_mb', DEFAULT_MEMORY_LIMIT // (1024 * 1024))) * 1024 * 1024,
+                warmup_command=self.get_setting('worker_warmup_command', DEFAULT_WARMUP_COMMAND)
+            )
+        return self.worker_pool
+
+    def sync_worker_pool(self):
+        # Keep one warm worker process for every loaded dump while the worker engine is selected
+        if self.get_setting('execution_engine', 'subprocess') == 'worker':
+            self.get_worker_pool().sync(list(self.file_handler.get_loaded_files()))
+        elif self.worker_pool:
+            self.worker_pool.shutdown()
+            self.worker_pool = None
+
+    def execute_in_worker(self, selected_file, command, command_parameters, full_command, table, stream=None):
+        output = []
+        write = stream.write if stream else output.append
+        job = current_job()
+        try:
+            self.get_worker_pool().run(selected_file, command, command_parameters, self.table_sink(table, write, stream))
+        except ImportError as e:
+            print(f"Worker could not import volatility3 ({e}), falling back to running vol.py")
+            if stream:
+                return self.execute_command_streaming(full_command, stream, table)
+            return self.execute_command(full_command, table)
+        except RuntimeError as e:
+            if job and job.cancel_requested:
+                write("\n" + job.cancel_reason)
+            else:
+                write("\nError:\n" + str(e))
+            if stream:
+                stream.failed = True
+
+        if stream:
+            stream.close()
+            return full_command, None
+        return full_command, "".join(output) or "No output received."
+
+    def execute_in_process(self, engine, selected_file, command, command_parameters, full_command, table, stream=None):
+        output = []
+        job = current_job()
+
+        def write(data):
+            # A plugin running in this process can't be killed, so stop it at its next row instead
+            if job:
+                job.check_cancelled()
+            if stream:
+                stream.write(data)
+            else:
+                output.append(data)
+
+        try:
+            engine.run_plugin(selected_file, command, command_parameters, self.table_sink(table, write, stream))
+        except JobCancelled as e:
+            output.append("\n" + str(e))
+            if stream:
+                stream.failed = True
+                stream.write("\n" + str(e))
+        except ImportError as e:
+            print(f"Could not import volatility3 ({e}), falling back to running vol.py")
+            if stream:
+                return self.execute_command_streaming(full_command, stream, table)
+            return self.execute_command(full_command, table)
+        except Exception as e:
+            write("\nError:\n" + str(e))
+            if stream:
+                stream.failed = True
+
+        if stream:
+            stream.close()
+            return full_command, None
+        return full_command, "".join(output) or "No output received."
 
     def check_all_commands_finished(self):
         if all(f.done() for f in self.futures):
             print("All commands have finished executing.")
+            self.futures = []
             self.prepare_export_data()
             self.parent.run_command_button.config(state=tk.NORMAL)  # Re-enable button
             self.parent.config(cursor="")
 
     def run_command(self, selected_command):
-        selected_file = self.file_handler.get_selected_file()
-        if not selected_file:
+        selected_files = self.file_handler.get_selected_files()
+        if not selected_files:
             messagebox.showerror("Error", "No file selected.")
             return
 
@@ -458,21 +773,493 @@ class WorkspaceFrameLogic:
         if command_parameters == placeholder_text:
             command_parameters = ""  # Treat as empty if it's the placeholder
 
-        vol_path = self.get_volatility_path()
-        full_command = f"python {vol_path} -f {selected_file} {command} {command_parameters}"
-        print(f"Running command: {full_command}")
+        try:
+            shlex.split(command_parameters)
+        except ValueError as e:
+            messagebox.showerror("Error", f"Could not read the parameters {command_parameters}: {e}")
+            return
+
+        if not self.futures:
+            # Nothing is running, so this starts a new batch for the progress indicator
+            self.batch_total = 0
+            self.batch_done = 0
+
+        # With several dumps selected in the sidebar the same command runs against each of them
+        for selected_file in selected_files:
+            self.start_command(selected_file, command, command_name, command_parameters)
+        self.update_progress()
+
+    def start_command(self, selected_file, command, command_name, command_parameters, priority=PRIORITY_NORMAL):
+        self.batch_total += 1
+
+        cache_key = None
+        if command_name != "Custom" and self.get_setting('use_result_cache', True):
+            cache = self.get_result_cache()
+            cache_key = cache.make_key(self.file_handler.get_fingerprint(selected_file), command, command_parameters, self.get_setting('volatility_version', ''))
+            if cache.lookup(cache_key):
+                print(f"Opening cached result of {command} {command_parameters} for {selected_file}")
+                self.open_cached_result(selected_file, command_name, cache_key)
+                self.batch_done += 1
+                return None
+
+        table = None
+        if command_name != "Custom":
+            # Structured output, the tab text is rendered from the table the rows are stored in
+            table = ResultTable()
+        try:
+            full_command = command_line(self.get_volatility_path(), selected_file, command, command_parameters, self.get_setting('symbol_directory'), structured=table is not None)
+        except ValueError as e:
+            messagebox.showerror("Error", f"Could not read the parameters {command_parameters}: {e}")
+            self.batch_done += 1
+            return None
+        print(f"Running command: {display_command(full_command)}")
 
         self.parent.run_command_button.config(state=tk.DISABLED)  # Disable button
         self.parent.config(cursor="wait")
 
-        future = self.executor.submit(self.execute_command, full_command)
-        future.add_done_callback(lambda f, cmd=command_name, fp=selected_file: self.command_finished(f, cmd, fp))
+        stream = None
+        tab = None
+        if self.stream_output:
+            text_widget = self.add_tab(selected_file, command_name, "")
+            tab = text_widget.master.master
+            if table is not None:
+                self.add_table_view(tab, table)
+            cache_writer = None
+            if cache_key:
+                cache_writer = self.get_result_cache().open_table_writer(cache_key, table, {"command": command, "parameters": command_parameters, "dump": selected_file})
+                self.tab_sources[str(tab)] = {"kind": "cache", "key": cache_key, "table": True}
+            stream = OutputStream(self.get_text_view(tab), tee=cache_writer)
+            self.journal_tab(tab, command_name)
+
+        job_options = {
+            "name": f"{command_name} {command_parameters}".strip(),
+            "dump": selected_file,
+            "priority": priority,
+            "cost": get_cost_hint(command, self.commands),
+            "timeout": self.get_timeout(command)
+        }
+        execution_engine = self.get_setting('execution_engine', 'subprocess')
+        if command_name != "Custom" and execution_engine == 'worker':
+            # Each dump has one warm worker, so its jobs take turns
+            job_args = (self.execute_in_worker, selected_file, command, command_parameters, full_command, table, stream)
+            job_options["exclusive"] = "worker:" + selected_file
+        elif command_name != "Custom" and execution_engine == 'inprocess':
+            # Volatility contexts are not thread safe, in-process jobs run one at a time
+            job_args = (self.execute_in_process, self.get_engine(), selected_file, command, command_parameters, full_command, table, stream)
+            job_options["exclusive"] = "inprocess"
+        elif stream:
+            job_args = (self.execute_command_streaming, full_command, stream, table)
+        else:
+            job_args = (self.execute_command, full_command, table)
+        job = self.executor.submit_job(self.run_prepared, selected_file, *job_args, **job_options)
+        future = job.future
+        self.futures.append(future)
+        if tab is not None:
+            self.tab_jobs[str(tab)] = (job, self.parent.show_cancel_button(tab))
+        future.add_done_callback(lambda f, cmd=command_name, fp=selected_file, st=stream, t=tab, tb=table: self.command_finished(f, cmd, fp, st, t, tb))
+        return future
+
+    def get_text_view(self, tab):
+        return self.text_views.get(str(tab))
+
+    def open_output_file(self):
+        file_path = filedialog.askopenfilename(title="Open Output File", filetypes=[("Text Files", "*.txt"), ("All Files", "*.*")])
+        if not file_path:
+            return  # User cancelled
+        # Shown straight from the file, its lines are indexed in the background
+        text_widget = self.add_tab(file_path, "Output", "", store=TextStore(file_path))
+        self.index_tab(text_widget.master.master)
+        self.journal_tab(text_widget.master.master, "Output", {"kind": "file", "path": file_path})
+        self.command_details[f"Output ({os.path.basename(file_path)})"] = {
+            "command": "Output",
+            "highlights": []
+        }
+
+    def open_package(self):
+        zip_path = filedialog.askopenfilename(title="Open Package", filetypes=[("Zip files", "*.zip"), ("All Files", "*.*")])
+        if not zip_path:
+            return  # User cancelled
+        try:
+            metadata = read_metadata(zip_path)
+        except (OSError, KeyError, ValueError, zipfile.BadZipFile) as e:
+            messagebox.showerror("Error", f"Could not open the package: {e}")
+            return
+
+        # One empty tab per command, its output is only read from the archive once the tab is shown
+        for entry in metadata["commands"]:
+            title = f"{entry['command']} ({entry['dump']})" if entry.get("dump") else None  # Packages of several dumps
+            text_widget = self.add_tab(zip_path, entry["command"], "", title=title)
+            tab = text_widget.master.master
+            self.add_lazy_tab(tab, self.load_package_tab, zip_path, entry["output_file"], entry.get("highlights", []))
+            self.journal_tab(tab, entry["command"], {"kind": "package", "zip": zip_path, "member": entry["output_file"]}, entry.get("highlights", []))
+            self.command_details[self.parent.tab_control.tab(tab, "text")] = {
+                "command": entry["command"],
+                "highlights": entry.get("highlights", [])
+            }
+        print(f"Opened package {zip_path} with {len(metadata['commands'])} outputs")
+        self.on_tab_changed()
+
+        if metadata.get("memory_dump_file") and messagebox.askyesno("Memory Dump", f"The package includes the memory dump {metadata['memory_dump_file']}. Extract it to run plugins on it?\n\nThe outputs can be reviewed without it."):
+            self.extract_package_dump(zip_path, metadata)
+
+    def add_lazy_tab(self, tab, loader, *args):
+        if not self.watching_tabs:
+            self.parent.tab_control.bind("<<NotebookTabChanged>>", self.on_tab_changed, add="+")
+            self.watching_tabs = True
+        self.lazy_tabs[str(tab)] = (loader, args)
+
+    def on_tab_changed(self, event=None):
+        entry = self.lazy_tabs.pop(self.parent.tab_control.select(), None)
+        if entry:
+            loader, args = entry
+            loader(self.parent.nametowidget(self.parent.tab_control.select()), *args)
+
+    def load_package_tab(self, tab, zip_path, member, highlights):
+        stream = OutputStream(self.get_text_view(tab))
+        self.executor.submit_job(self.read_package_output, zip_path, member, highlights, stream, name=f"Read {member}", priority=PRIORITY_HIGH, cost={"memory_mb": 64, "cpu": 1})
+
+    def read_package_output(self, zip_path, member, highlights, stream):
+        try:
+            for chunk in iter_output(zip_path, member):
+                stream.write(chunk)
+        except (OSError, KeyError, zipfile.BadZipFile) as e:
+            stream.write(f"\nError:\nCould not read {member} from the package: {e}")
+        stream.close()
+        tab = stream.text_widget.master.master
+        tab.after(0, self.restore_highlights, tab, highlights)
+        tab.after(0, self.index_tab, tab)
+
+    def restore_highlights(self, tab, highlights):
+        # All saved highlights go in at once, then the visible window is tagged a single time
+        view = self.get_text_view(tab)
+        if view is None:
+            return
+        for highlight in highlights:
+            try:
+                start = tuple(int(part) for part in highlight["start"].split("."))
+                end = tuple(int(part) for part in highlight["end"].split("."))
+            except (KeyError, ValueError, AttributeError):
+                continue
+            view.highlights.append((highlight.get("color", "#FF8C00"), start, end))
+        view.apply_highlights()
+
+    def extract_package_dump(self, zip_path, metadata):
+        target_path = filedialog.asksaveasfilename(title="Extract Memory Dump", initialfile=metadata["memory_dump_file"])
+        if not target_path:
+            return
+        self.executor.submit_job(self.run_extract_package_dump, zip_path, metadata, target_path, name=f"Extract {metadata['memory_dump_file']}", priority=PRIORITY_NORMAL, cost={"memory_mb": 256, "cpu": self.executor.max_workers})  # Chunks are unpacked on every core
+
+    def run_extract_package_dump(self, zip_path, metadata, target_path):
+        try:
+            extract_package_dump(zip_path, metadata, target_path)
+        except Exception as e:
+            self.parent.after(0, messagebox.showerror, "Error", f"Could not extract the memory dump: {e}")
+            return
+        self.parent.after(0, self.load_extracted_dump, target_path)
+
+    def load_extracted_dump(self, file_path):
+        try:
+            loaded = self.file_handler.load_files(file_path)
+        except OSError as e:
+            messagebox.showerror("Error", f"Could not read the extracted memory dump: {e}")
+            return
+        if loaded:
+            self.update_loaded_file_label()
+
+    def journal_tab(self, tab, command, source=None, highlights=None):
+        if not self.journal:
+            return
+        self.journal.record("tab_opened", str(tab), title=self.parent.tab_control.tab(tab, "text").strip(), command=command, source=source)
+        if highlights:
+            self.journal.record("tab_highlights", str(tab), highlights=highlights)
+
+    def journal_highlights(self, tab):
+        view = self.get_text_view(tab)
+        if self.journal and view is not None:
+            self.journal.record("tab_highlights", str(tab), highlights=view.highlight_ranges())
+
+    def record_result(self, tab):
+        # A finished result is found again through the cache, otherwise its text is kept next to the journal
+        source = self.tab_sources.pop(str(tab), None)
+        view = self.get_text_view(tab)
+        if not self.journal or view is None:
+            return
+        if source and self.get_result_cache().contains(source["key"]):
+            self.journal.record("tab_result", str(tab), source=source)
+            return
+        self.executor.submit_job(self.save_result, tab, self.result_chunks(tab), name="Save result for the session", priority=PRIORITY_LOW, cost={"memory_mb": 64, "cpu": 1})
+
+    def result_chunks(self, tab):
+        """Returns a function yielding the whole text of a tab, the same text its highlights refer to."""
+        table = self.result_tables.get(str(tab))
+        if table is not None and table.columns is not None and len(table) > TEXT_VIEW_MAX_ROWS:
+            return table.iter_text  # The text view stops at the limit, the rows are rendered from the table
+        return self.get_text_view(tab).store.read_chunks  # Keeps the diff summary, errors and the cancel reason
+
+    def save_result(self, tab, chunks):
+        try:
+            path = self.journal.save_output(chunks())
+        except (OSError, ValueError) as e:
+            print(f"Could not keep the result of {tab} for the session: {e}")
+            return
+        self.journal.record("tab_result", str(tab), source={"kind": "saved", "path": path})
+
+    def restore_session(self):
+        """Reopen the dumps and tabs of the last session from the journal, results load when their tab is shown."""
+        if not self.journal:
+            return False
+        start = time.time()
+        state = self.journal.replay()
+        for path in state["files"]:
+            if not os.path.isfile(path):
+                print(f"Not restoring {path}, the file is gone")
+                continue
+            try:
+                self.file_handler.load_files(path)
+            except OSError as e:
+                print(f"Not restoring {path}, it can't be read: {e}")  # e.g. a .vmem locked by the running VM
+        restored = []
+        for tab_state in state["tabs"]:
+            tab = self.restore_tab(tab_state)
+            restored.append(dict(tab_state, id=str(tab)))
+        # The new tabs have new names, so the journal starts over from what is open now
+        self.journal.compact({"files": list(self.file_handler.loaded_files), "tabs": restored})
+        if self.file_handler.loaded_files:
+            self.update_loaded_file_label()
+        self.on_tab_changed()
+        print(f"Restored {len(self.file_handler.loaded_files)} files and {len(restored)} tabs in {time.time() - start:.2f} s")
+        return bool(restored or self.file_handler.loaded_files)
+
+    def restore_tab(self, tab_state):
+        title, command, source, highlights = tab_state["title"], tab_state["command"], tab_state["source"], tab_state["highlights"]
+        kind = source["kind"] if source else None
+        if kind in ("file", "saved") and os.path.isfile(source["path"]):
+            text_widget = self.add_tab("", command, "", store=TextStore(source["path"]), title=title)
+            tab = text_widget.master.master
+            self.restore_highlights(tab, highlights)
+            self.index_tab(tab)
+        elif kind in ("cache", "package"):
+            text_widget = self.add_tab("", command, "", title=title)
+            tab = text_widget.master.master
+            if kind == "cache":
+                self.add_lazy_tab(tab, self.load_cached_tab, source["key"], source.get("table", False), highlights)
+            else:
+                self.add_lazy_tab(tab, self.load_package_tab, source["zip"], source["member"], highlights)
+        else:
+            message = "This command was still running when VolGUI closed, run it again to see its output.\n" if kind is None else "The output of this tab is no longer available.\n"
+            text_widget = self.add_tab("", command, message, title=title)
+            tab = text_widget.master.master
+        self.command_details[title] = {
+            "command": command,
+            "highlights": highlights
+        }
+        return tab
+
+    def load_cached_tab(self, tab, cache_key, has_table, highlights):
+        stream = OutputStream(self.get_text_view(tab))
+        if not self.get_result_cache().contains(cache_key):
+            stream.write("This result is no longer in the result cache, run the command again to see it.\n")
+            stream.close()
+            return
+        table = None
+        if has_table:
+            table = ResultTable()
+            self.add_table_view(tab, table)
+        self.executor.submit_job(self.read_cached_tab, cache_key, stream, table, highlights, name="Read cached result", priority=PRIORITY_HIGH, cost={"memory_mb": 64, "cpu": 1})
+
+    def read_cached_tab(self, cache_key, stream, table, highlights):
+        self.load_cached_result(cache_key, stream, table)
+        tab = stream.text_widget.master.master
+        tab.after(0, self.restore_highlights, tab, highlights)
+
+    def index_tab(self, tab):
+        index = self.search_indexes.get(str(tab))
+        if index is None or index.is_built():
+            return
+        size_mb = index.store.size // MB
+        self.executor.submit_job(index.build, name=f"Search index ({size_mb} MB)", priority=PRIORITY_LOW, cost={"memory_mb": max(64, 3 * size_mb), "cpu": 1})
+
+    def search_tabs(self, pattern, regex, done):
+        """Run a query against every tab off the Tk thread, done gets [(tab, hits)] in tab order and an error.
+
+        Hits are (line, column, length) in the text view, or ("row", row) for rows of a large result that are
+        only in its table.
+        """
+        tabs = [(tab, self.search_indexes.get(tab), self.result_tables.get(tab)) for tab in self.parent.tab_control.tabs() if tab in self.search_indexes or tab in self.result_tables]
+
+        def run():
+            results, error = [], None
+            try:
+                for tab, index, table in tabs:
+                    try:
+                        hits = index.search(pattern, regex) if index else []
+                        if table is not None and len(table) > TEXT_VIEW_MAX_ROWS:
+                            hits = hits + [("row", row) for row in search_table_rows(table, pattern, regex, TEXT_VIEW_MAX_ROWS)]
+                    except (ValueError, OSError) as e:
+                        print(f"Skipping tab {tab} in the search: {e}")  # Closed while we searched it
+                        continue
+                    results.append((tab, hits))
+            except re.error as e:
+                results, error = [], f"Invalid regex: {e}"
+            except Exception as e:
+                results, error = [], f"Search failed: {e}"
+            finally:
+                try:
+                    self.parent.after(0, done, results, error)  # "Searching..." always clears
+                except (RuntimeError, tk.TclError):
+                    pass  # The window is gone
+        threading.Thread(target=run, daemon=True).start()
+
+    def add_table_view(self, tab, table):
+        self.result_tables[str(tab)] = table
+        self.create_table_view(tab, table)
+
+    def comparable_tabs(self):
+        """(tab, title) of the finished tabs that have a result table, in tab order."""
+        tab_control = self.parent.tab_control
+        return [(tab, tab_control.tab(tab, "text").strip()) for tab in tab_control.tabs()
+                if tab in self.result_tables and tab not in self.tab_jobs and self.result_tables[tab].columns is not None]
+
+    def compare_tabs(self, old_tab, new_tab):
+        old_title = self.parent.tab_control.tab(old_tab, "text").strip()
+        new_title = self.parent.tab_control.tab(new_tab, "text").strip()
+        command = old_title.split(" (")[0]
+        old_name = old_title.split(" (", 1)[-1].split(")")[0]  # The dump name
+        new_name = new_title.split(" (", 1)[-1].split(")")[0]
+        old_table = self.result_tables[str(old_tab)]
+        new_table = self.result_tables[str(new_tab)]
+
+        # Rows are matched by the plugin's identity columns, so the tabs can come from different dumps or parameters
+        text_widget = self.add_tab(f"{old_name} vs {new_name}", f"Diff {command}", "")
+        tab = text_widget.master.master
+        table = ResultTable()
+        self.add_table_view(tab, table)
+        self.parent.tab_control.select(tab)
+        self.journal_tab(tab, f"Diff {command}")
+        self.command_details[f"Diff {command} ({old_name} vs {new_name})"] = {
+            "command": f"Diff {command}",
+            "table": table,
+            "highlights": []
+        }
+        stream = OutputStream(self.get_text_view(tab))
+        rows = len(old_table) + len(new_table)
+        self.executor.submit_job(self.compute_diff, old_table, new_table, command, table, stream, name=f"Diff {command}", priority=PRIORITY_HIGH, cost={"memory_mb": max(64, rows // 1000), "cpu": 1})
+
+    def compute_diff(self, old_table, new_table, command, table, stream):
+        tab = stream.text_widget.master.master
+        try:
+            diff = diff_tables(old_table, new_table, command)
+            print(f"Diff of {command}: {diff.summary()}")
+            stream.write(f"Matched on {', '.join(diff.key_columns)}: {diff.summary()}\n\n")
+            diff.fill_table(self.table_sink(table, stream.write, stream))
+        except ValueError as e:
+            message = f"Could not compare the results: {e}"
+            stream.failed = True
+            stream.write(f"\nError:\n{message}")
+            self.parent.after(0, lambda: messagebox.showerror("Compare Tabs", message))
+        except Exception as e:
+            stream.failed = True
+            stream.write(f"\nError:\nCould not compare the results: {e}")
+        stream.close()
+        self.parent.after(0, self.index_tab, tab)
+        self.parent.after(0, self.record_result, tab)
+
+    def get_timeout(self, command):
+        return command_timeout(self.commands, command, self.get_setting('default_timeout', 0))
+
+    def cancel_tab_job(self, tab):
+        entry = self.tab_jobs.get(str(tab))
+        if entry:
+            job = entry[0]
+            print(f"Cancelling job {job.id} ({job.name})")
+            self.executor.cancel_job(job.id)
+
+    def forget_tab_job(self, tab):
+        entry = self.tab_jobs.pop(str(tab), None)
+        if entry:
+            try:
+                entry[1].destroy()  # The cancel button
+            except tk.TclError:
+                pass  # Tab already closed
+
+    def shutdown(self):
+        # Stop queued and running plugins and their child processes
+        self.executor.shutdown()
+        if self.worker_pool:
+            self.worker_pool.shutdown()
+        if self.engine:
+            self.engine.shutdown()
+
+    def run_profile(self, profile_name):
+        profile = find_profile(load_profiles(), profile_name)
+        if profile is None:
+            messagebox.showerror("Error", f"Profile {profile_name} not found.")
+            return
+
+        missing = missing_commands(profile, self.commands)
+        if missing:
+            messagebox.showerror("Error", f"Profile {profile_name} uses commands that are not in commands.json: {', '.join(missing)}")
+            return
+
+        selected_files = self.file_handler.get_selected_files()
+        if not selected_files:
+            messagebox.showerror("Error", "No file selected.")
+            return
+
+        if not self.futures:
+            self.batch_total = 0
+            self.batch_done = 0
+
+        stages = get_stages(profile)
+        for selected_file in selected_files:
+            pipeline = {"name": profile_name, "file": selected_file, "stages": stages, "stage": 0, "remaining": 0}
+            self.run_profile_stage(pipeline)
+        self.update_progress()
+
+    def run_profile_stage(self, pipeline):
+        # Stages run one after another and the commands inside a stage run in parallel. The first stage
+        # (e.g. windows.info) builds the symbol and layer caches that the plugins in the later stages reuse.
+        while pipeline["stage"] < len(pipeline["stages"]):
+            stage = pipeline["stages"][pipeline["stage"]]
+            priority = PRIORITY_HIGH if pipeline["stage"] == 0 else PRIORITY_NORMAL  # Warm-up stages unblock everything else
+            pipeline["stage"] += 1
+            futures = [self.start_command(pipeline["file"], command, command, parameters, priority) for command, parameters in stage]
+            futures = [future for future in futures if future is not None]  # Cached results need no waiting
+            if futures:
+                pipeline["remaining"] = len(futures)
+                for future in futures:
+                    future.add_done_callback(lambda f, p=pipeline: self.parent.after(0, self.profile_step_finished, p))
+                return
+        print(f"Profile {pipeline['name']} finished for {pipeline['file']}")
+
+    def profile_step_finished(self, pipeline):
+        pipeline["remaining"] -= 1
+        if pipeline["remaining"] == 0:
+            self.run_profile_stage(pipeline)
+            self.update_progress()
+
+    def update_progress(self):
+        if self.batch_total <= 1 and not self.futures:
+            self.parent.hide_progress()
+            return
+        self.parent.show_progress(self.batch_done, self.batch_total)
 
     def show_close_button(self, tab):
         close_button = ttk.Button(tab, text="Close Tab", command=lambda: self.close_tab(tab))
         close_button.pack(side="top", anchor="ne", pady=5, padx=5)
 
     def close_tab(self, tab):
+        self.cancel_tab_job(tab)  # No point in finishing a command nobody will look at
+        self.result_tables.pop(str(tab), None)
+        self.parent.remove_table_view(tab)
+        self.search_indexes.pop(str(tab), None)
+        self.lazy_tabs.pop(str(tab), None)
+        self.tab_sources.pop(str(tab), None)
+        if self.journal:
+            self.journal.record("tab_closed", str(tab))
+        view = self.text_views.pop(str(tab), None)
+        if view is not None:
+            view.store.close()
         tab_title = self.parent.tab_control.tab(tab, "text")
         self.parent.tab_control.forget(tab)
         del self.command_tabs[tab_title]
@@ -491,10 +1278,9 @@ class WorkspaceFrameLogic:
         try:
             selected_tab = self.parent.tab_control.nametowidget(self.parent.tab_control.select())
             text_widget = selected_tab.winfo_children()[0].winfo_children()[0]  # Update to access the text widget
-            start = text_widget.index("sel.first")
-            end = text_widget.index("sel.last")
-            text_widget.tag_add(color, start, end)
-            text_widget.tag_config(color, background=color)
+            # Highlights are kept in lines of the whole output, the widget only holds part of it
+            start, end = self.get_text_view(selected_tab).add_highlight(color, text_widget.index("sel.first"), text_widget.index("sel.last"))
+            start, end = f"{start[0]}.{start[1]}", f"{end[0]}.{end[1]}"
             self.parent.highlights.append((color, start, end))
 
             title = self.parent.tab_control.tab(selected_tab, "text")
@@ -513,6 +1299,7 @@ class WorkspaceFrameLogic:
                         "end": end
                     }]
                 }
+            self.journal_highlights(selected_tab)
         except tk.TclError:
             print("No text selected")
 
@@ -520,10 +1307,8 @@ class WorkspaceFrameLogic:
      try:
         selected_tab = self.parent.tab_control.nametowidget(self.parent.tab_control.select())
         text_widget = selected_tab.winfo_children()[0].winfo_children()[0]  # Update to access the text widget
-        start = text_widget.index("sel.first")
-        end = text_widget.index("sel.last")
-        for tag in text_widget.tag_names():
-            text_widget.tag_remove(tag, start, end)
+        self.get_text_view(selected_tab).remove_highlights(text_widget.index("sel.first"), text_widget.index("sel.last"))
+        self.journal_highlights(selected_tab)
      except tk.TclError:
         print("No text selected")
 
@@ -1,14 +1,43 @@
+import time
+STARTED = time.perf_counter()  # Before the imports, they are part of the startup time
+
 import os
+import sqlite3
 import tkinter as tk
-from tkinter import filedialog, messagebox
+from tkinter import filedialog, messagebox, simpledialog
 from tkinterdnd2 import TkinterDnD
 from ui.import_frame import ImportFrame
 from ui.workspace_frame import WorkspaceFrame
 from ui.export_frame import ExportFrame
 from ui.settings_frame import SettingsFrame
 from ui.command_frame import CommandFrame
+from ui.job_queue_window import JobQueueWindow
+from ui.compare_dialog import CompareDialog
 from logic.src.file_handler import FileHandler
-from logic.workspace_logic import WorkspaceFrameLogic
+from logic.src.command_catalog import get_settings_store, get_command_store, get_setting, update_settings
+from logic.src.profiles import load_profiles
+from logic.src.session_journal import SessionJournal, SessionInUse
+
+STARTUP_BUDGET = 1.0  # Seconds to the first window before startup is reported as slow
+THEMES = ("dark", "light")
+CONFIG_POLL_INTERVAL = 2000  # ms between checks of settings.json and commands.json for edits made outside the app
+
+class LazyFrames(dict):
+    """The application's frames by class, each one is built the first time it is looked up.
+
+    "in" and get() only see the frames that exist, so checking for a frame never builds it.
+    """
+    def __init__(self, factories):
+        super().__init__()
+        self.factories = factories
+
+    def __missing__(self, frame_class):
+        started = time.perf_counter()
+        frame = self.factories[frame_class]()
+        frame.grid(row=0, column=0, sticky="nsew")
+        self[frame_class] = frame
+        print(f"Built {frame_class.__name__} in {(time.perf_counter() - started) * 1000:.0f} ms")
+        return frame
 
 class MainApplication(TkinterDnD.Tk):
     def __init__(self):
@@ -17,9 +46,18 @@ class MainApplication(TkinterDnD.Tk):
         self.geometry('1024x768')
 
         self.file_handler = FileHandler()  # Initialize FileHandler
+        try:
+            self.journal = SessionJournal()  # Records the workspace as it changes, so it survives a crash
+        except SessionInUse as e:
+            # The other window's journal and saved outputs are left alone
+            print(f"{e}, this window keeps no session journal")
+            self.journal = None
+        except (OSError, sqlite3.Error) as e:
+            print(f"Session journal unavailable, the workspace won't be restored: {e}")
+            self.journal = None
+        self.file_handler.journal = self.journal
 
         self.load_theme()
-        self.logic = WorkspaceFrameLogic(parent=self, file_handler=self.file_handler)
         self.menu_bar = tk.Menu(self)
         self.config(menu=self.menu_bar)
 
@@ -31,36 +69,52 @@ class MainApplication(TkinterDnD.Tk):
         # File Menu
         file_menu = tk.Menu(self.menu_bar, tearoff=0)
         file_menu.add_command(label="Open...", command=self.open_file)
+        file_menu.add_command(label="Open Output File...", command=self.open_output_file)
+        file_menu.add_command(label="Open Package...", command=self.open_package)
         file_menu.add_command(label="New...", command=self.new_session)
         file_menu.add_command(label="Export...", command=self.switch_to_export_frame)
         file_menu.add_separator()
-        file_menu.add_command(label="Exit", command=self.quit)
+        file_menu.add_command(label="Exit", command=self.quit_app)
         self.menu_bar.add_cascade(label="File", menu=file_menu)
 
         # Edit Menu
         edit_menu = tk.Menu(self.menu_bar, tearoff=0)
         edit_menu.add_command(label="Settings", command=self.switch_to_settings_frame)
         edit_menu.add_command(label="Manage Commands", command=self.switch_to_command_frame)
-        edit_menu.add_command(label="Add Custom Plugins", command=self.logic.add_custom_plugin)
+        edit_menu.add_command(label="Add Custom Plugins", command=self.add_custom_plugin)
+        edit_menu.add_command(label="Job Queue", command=self.show_job_queue)
+        edit_menu.add_command(label="Attach to Job Service...", command=self.attach_to_service)
+        edit_menu.add_command(label="Compare Tabs...", command=self.show_compare_dialog)
         self.menu_bar.add_cascade(label="Edit", menu=edit_menu)
 
-        self.frames = {}
-
-        # Initialize all frames properly
-        self.frames[ImportFrame] = ImportFrame(self, app=self, file_handler=self.file_handler, switch_to_workspace_frame=self.switch_to_workspace_frame)
-        self.frames[WorkspaceFrame] = WorkspaceFrame(self, app=self, file_handler=self.file_handler, switch_to_export_frame=self.switch_to_export_frame)
-        self.frames[ExportFrame] = ExportFrame(self, switch_frame_callback=self.switch_to_workspace_frame, scan_result=self.scan_result, commands_used=self.commands_used, highlights=self.highlights)
-        self.frames[SettingsFrame] = SettingsFrame(self, app=self)
-        self.frames[CommandFrame] = CommandFrame(self, app=self)
-
-        # Grid all frames
-        for frame in self.frames.values():
-            frame.grid(row=0, column=0, sticky="nsew")
+        # View Menu
+        view_menu = tk.Menu(self.menu_bar, tearoff=0)
+        view_menu.add_radiobutton(label="Dark Theme", variable=self.theme_var, value="dark", command=self.switch_theme)
+        view_menu.add_radiobutton(label="Light Theme", variable=self.theme_var, value="light", command=self.switch_theme)
+        self.menu_bar.add_cascade(label="View", menu=view_menu)
+
+        # Profiles Menu, rebuilt from profiles.json every time it opens
+        self.profiles_menu = tk.Menu(self.menu_bar, tearoff=0, postcommand=self.refresh_profiles_menu)
+        self.menu_bar.add_cascade(label="Profiles", menu=self.profiles_menu)
+
+        # Frames are only built when they are first needed, at startup that is the import frame alone
+        self.frames = LazyFrames({
+            ImportFrame: lambda: ImportFrame(self, app=self, file_handler=self.file_handler, switch_to_workspace_frame=self.switch_to_workspace_frame),
+            WorkspaceFrame: lambda: WorkspaceFrame(self, app=self, file_handler=self.file_handler, switch_to_export_frame=self.switch_to_export_frame),
+            ExportFrame: lambda: ExportFrame(self, switch_frame_callback=self.switch_to_workspace_frame, scan_result=self.scan_result, commands_used=self.commands_used, highlights=self.highlights),
+            SettingsFrame: lambda: SettingsFrame(self, app=self),
+            CommandFrame: lambda: CommandFrame(self, app=self)
+        })
+        self.job_queue_window = None
 
         self.grid_rowconfigure(0, weight=1)
         self.grid_columnconfigure(0, weight=1)
         self.show_frame(ImportFrame)
+        self.bind("<Map>", self.report_startup_time, add="+")
+        self.after_idle(self.restore_session)
+        self.after(CONFIG_POLL_INTERVAL, self.check_config_files)
 
+        self.protocol("WM_DELETE_WINDOW", self.quit_app)
         self.bind('<Control-q>', self.quit_app)
         self.bind('<Control-f>', self.search_text)
         self.bind('<Control-o>', self.open_file)
@@ -68,6 +122,13 @@ class MainApplication(TkinterDnD.Tk):
         self.bind_all('<Control-e>', self.switch_to_export_frame)
         self.bind_all('<Control-r>', self.toggle_refresh_button)
 
+    def report_startup_time(self, event=None):
+        if event is not None and event.widget is not self:
+            return  # <Map> of a child widget
+        self.unbind("<Map>")
+        elapsed = time.perf_counter() - STARTED
+        print(f"First window after {elapsed * 1000:.0f} ms" + (f", over the {STARTUP_BUDGET * 1000:.0f} ms budget" if elapsed > STARTUP_BUDGET else ""))
+
     def toggle_refresh_button(self, event=None):
         if WorkspaceFrame in self.frames:
             workspace_frame = self.frames[WorkspaceFrame]
@@ -75,40 +136,49 @@ class MainApplication(TkinterDnD.Tk):
 
     def highlight_selected_text(self, event=None):
         """Highlight the selected text with a default or chosen color."""
+        if WorkspaceFrame not in self.frames:
+            return  # No tabs yet
         workspace_frame = self.frames[WorkspaceFrame]
-        selected_tab = workspace_frame.tab_control.select()
-        if not selected_tab:
+        if not workspace_frame.tab_control.select():
             return
-
-        tab_widget = workspace_frame.tab_control.nametowidget(selected_tab)
-        if not tab_widget:
-            return
-
-        text_widget = tab_widget.winfo_children()[0]
-        try:
-            start = text_widget.index("sel.first")
-            end = text_widget.index("sel.last")
-            if not start or not end:
-                return
-
-            default_color = "#FF8C00"
-            text_widget.tag_add("highlight", start, end)
-            text_widget.tag_config("highlight", background=default_color)
-            self.highlights.append((default_color, start, end))
-            print(f"Highlighted text from {start} to {end} with color {default_color}")
-
-        except tk.TclError:
-            print("No text selected or invalid selection range.")
+        # Same path as the highlight button, so the highlight is kept in the tab's view and the session journal
+        workspace_frame.logic.highlight_text("#FF8C00")
 
     def load_theme(self):
+        # Only the images of the theme in use are loaded, the other variant is sourced when the user switches to it
+        theme = get_setting('theme', 'dark')
+        if theme not in THEMES:
+            print(f"Unknown theme {theme}, using dark.")
+            theme = 'dark'
+        self.theme_var = tk.StringVar(self, value=theme)
         theme_dir = os.path.join(os.path.dirname(__file__), 'theme')
         azure_tcl_path = os.path.join(theme_dir, 'azure.tcl')
         if os.path.exists(azure_tcl_path):
             self.tk.call('source', azure_tcl_path)
-            self.tk.call('set_theme', 'dark')
+            self.tk.call('set_theme', theme)
         else:
             print(f"Theme file {azure_tcl_path} not found.")
 
+    def switch_theme(self):
+        theme = self.theme_var.get()
+        try:
+            started = time.perf_counter()
+            self.tk.call('set_theme', theme)
+            print(f"Switched to the {theme} theme in {(time.perf_counter() - started) * 1000:.0f} ms")
+        except tk.TclError as e:
+            messagebox.showerror("Error", f"Could not switch to the {theme} theme: {e}")
+            return
+        try:
+            update_settings({'theme': theme})
+        except OSError as e:
+            print(f"Could not save the theme setting: {e}")
+
+    def check_config_files(self):
+        # A stat of each file, they are only parsed again when they changed and the stores notify their subscribers
+        get_settings_store().refresh()
+        get_command_store().refresh()
+        self.after(CONFIG_POLL_INTERVAL, self.check_config_files)
+
     def show_frame(self, cont):
         frame = self.frames[cont]
         frame.tkraise()
@@ -120,11 +190,25 @@ class MainApplication(TkinterDnD.Tk):
         elif response is False:
             self.reset_to_import()
 
+    def restore_session(self):
+        if self.journal is None or self.journal.is_empty():
+            return  # Nothing to restore, the workspace can wait until it is needed
+        if self.frames[WorkspaceFrame].logic.restore_session():
+            self.switch_to_workspace_frame()
+
     def reset_to_import(self):
         self.file_handler = FileHandler()  # Reset the file handler
-        self.frames[ImportFrame].file_handler = self.file_handler
-        self.frames[WorkspaceFrame].file_handler = self.file_handler
-        self.update_loaded_file_label()
+        self.file_handler.journal = self.journal
+        if self.journal:
+            self.journal.record("files_reset")
+        # Frames built later get the new file handler when they are built
+        if ImportFrame in self.frames:
+            self.frames[ImportFrame].file_handler = self.file_handler
+            self.frames[ImportFrame].logic.file_handler = self.file_handler
+        if WorkspaceFrame in self.frames:
+            self.frames[WorkspaceFrame].file_handler = self.file_handler
+            self.frames[WorkspaceFrame].logic.file_handler = self.file_handler
+            self.update_loaded_file_label()
         self.show_frame(ImportFrame)
 
     def switch_to_export_frame(self, event=None):
@@ -135,16 +219,65 @@ class MainApplication(TkinterDnD.Tk):
         self.show_frame(WorkspaceFrame)
 
     def switch_to_settings_frame(self):
+        self.frames[SettingsFrame].update_cache_stats()
         self.show_frame(SettingsFrame)
 
     def switch_to_command_frame(self):
         self.show_frame(CommandFrame)
 
+    def show_job_queue(self):
+        if self.job_queue_window and self.job_queue_window.winfo_exists():
+            self.job_queue_window.lift()
+            return
+        self.job_queue_window = JobQueueWindow(self, self.frames[WorkspaceFrame].logic.executor)
+
+    def add_custom_plugin(self):
+        self.frames[WorkspaceFrame].logic.add_custom_plugin()
+
+    def attach_to_service(self):
+        # Shows the jobs of a running 'python -m volgui serve' in a Job Queue window of their own
+        from logic.src.service_client import ServiceClient, RemoteScheduler, DEFAULT_ADDRESS  # http.client is slow to import, only load it here
+        address = simpledialog.askstring("Attach to Job Service", "Service address (host:port or unix:/path):", parent=self, initialvalue=get_setting('service_address', DEFAULT_ADDRESS))
+        if not address:
+            return
+        try:
+            scheduler = RemoteScheduler(ServiceClient(address.strip()))
+        except (OSError, ValueError, RuntimeError) as e:
+            messagebox.showerror("Error", f"Could not attach to the job service at {address}: {e}")
+            return
+        JobQueueWindow(self, scheduler, title=f"Job Service {address.strip()}")
+
+    def show_compare_dialog(self):
+        self.show_frame(WorkspaceFrame)
+        logic = self.frames[WorkspaceFrame].logic
+        if len(logic.comparable_tabs()) < 2:
+            messagebox.showinfo("Compare Tabs", "Open at least two finished plugin results to compare them.")
+            return
+        CompareDialog(self, logic)
+
+    def refresh_profiles_menu(self):
+        self.profiles_menu.delete(0, tk.END)
+        for profile in load_profiles():
+            self.profiles_menu.add_command(label=profile["name"], command=lambda name=profile["name"]: self.run_profile(name))
+
+    def run_profile(self, profile_name):
+        # Runs against the dumps selected in the sidebar, so don't reset the selection by switching frames
+        self.show_frame(WorkspaceFrame)
+        self.frames[WorkspaceFrame].logic.run_profile(profile_name)
+
     def open_file(self, event=None):
         file_paths = filedialog.askopenfilenames()
         if file_paths:
             self.frames[ImportFrame].handle_file(file_paths)
 
+    def open_output_file(self):
+        self.show_frame(WorkspaceFrame)
+        self.frames[WorkspaceFrame].logic.open_output_file()
+
+    def open_package(self):
+        self.show_frame(WorkspaceFrame)
+        self.frames[WorkspaceFrame].logic.open_package()
+
     def save_file(self):
         print("File saved")
 
@@ -158,6 +291,11 @@ class MainApplication(TkinterDnD.Tk):
         frame.update_selected_file_label(file)
 
     def quit_app(self, event=None):
+        # Stop running plugins and their child processes before the window goes away
+        if WorkspaceFrame in self.frames:
+            self.frames[WorkspaceFrame].logic.shutdown()
+        if self.journal:
+            self.journal.close()
         self.quit()
 
     def search_text(self, event=None):
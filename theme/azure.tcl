@@ -1,11 +1,19 @@
 # Copyright © 2021 rdbende <rdbende@gmail.com>
 
-source [file join [file dirname [info script]] theme light.tcl]
-source [file join [file dirname [info script]] theme dark.tcl]
+# The variants are sourced by set_theme the first time they are used, so only the active one's images are loaded
+set azure_theme_dir [file join [file dirname [info script]] theme]
 
 option add *tearOff 0
 
+proc load_theme_variant {mode} {
+	global azure_theme_dir
+	if {[lsearch -exact [ttk::style theme names] "azure-$mode"] < 0} {
+		source [file join $azure_theme_dir $mode.tcl]
+	}
+}
+
 proc set_theme {mode} {
+	load_theme_variant $mode
 	if {$mode == "dark"} {
 		ttk::style theme use "azure-dark"
 
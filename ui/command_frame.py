@@ -1,7 +1,7 @@
 import tkinter as tk
 from tkinter import ttk, Scrollbar, VERTICAL, messagebox
-import json
 from logic.command_logic import CommandFrameLogic
+from logic.src.command_catalog import save_commands
 
 class PlaceholderEntry(ttk.Entry):
     def __init__(self, master=None, placeholder="PLACEHOLDER", color="grey", **kwargs):
@@ -173,7 +173,6 @@ class CommandFrame(ttk.Frame, CommandFrameLogic):
         self.deleted_commands_count += 1
         del self.commands[index]
         self.load_commands_ui()
-        messagebox.showinfo("Restart Required", "Please restart the application for changes to take effect.")
 
     def save_commands(self):
         if self.deleted_commands_count > 0:
@@ -182,19 +181,19 @@ class CommandFrame(ttk.Frame, CommandFrameLogic):
                 return
 
         commands_to_save = []
-        for command_entry, type_entry, description_entry in zip(self.command_entries, self.type_entries, self.description_entries):
-            command = {
+        for existing, command_entry, type_entry, description_entry in zip(self.commands, self.command_entries, self.type_entries, self.description_entries):
+            command = dict(existing)  # Keeps keys the screen doesn't show, like "timeout" and "memory_mb"
+            command.update({
                 "command": command_entry.get(),
                 "type": type_entry.get(),
                 "description": description_entry.get()
-            }
+            })
             commands_to_save.append(command)
 
         try:
             new_commands_count = len(commands_to_save) - self.initial_commands_count + self.deleted_commands_count
 
-            with open('commands.json', 'w') as file:
-                json.dump(commands_to_save, file, indent=4)
+            save_commands(commands_to_save)  # The workspace's command list follows through the command store
 
             messages = []
             if new_commands_count > 0:
@@ -208,7 +207,5 @@ class CommandFrame(ttk.Frame, CommandFrameLogic):
 
             self.initial_commands_count = len(commands_to_save)  # Update initial count
             self.commands = commands_to_save  # Update current commands
-
-            messagebox.showinfo("Restart Required", "Please restart the application for changes to take effect.")
         except Exception as e:
             tk.messagebox.showerror("Error", f"Error saving commands: {e}")
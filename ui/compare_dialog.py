@@ -0,0 +1,38 @@
+import tkinter as tk
+from tkinter import ttk, messagebox
+
+class CompareDialog(tk.Toplevel):
+    """Picks a baseline and a second result tab and opens their diff in a new tab."""
+    def __init__(self, parent, logic):
+        super().__init__(parent)
+        self.title("Compare Tabs")
+        self.resizable(False, False)
+        self.logic = logic
+        self.tabs = logic.comparable_tabs()
+        titles = [title for tab, title in self.tabs]
+
+        ttk.Label(self, text="Baseline:").grid(row=0, column=0, padx=10, pady=5, sticky="w")
+        self.old_var = tk.StringVar(value=titles[0] if titles else "")
+        ttk.Combobox(self, textvariable=self.old_var, values=titles, state="readonly", width=50).grid(row=0, column=1, padx=10, pady=5)
+        ttk.Label(self, text="Compare with:").grid(row=1, column=0, padx=10, pady=5, sticky="w")
+        self.new_var = tk.StringVar(value=titles[1] if len(titles) > 1 else "")
+        ttk.Combobox(self, textvariable=self.new_var, values=titles, state="readonly", width=50).grid(row=1, column=1, padx=10, pady=5)
+
+        button_frame = ttk.Frame(self)
+        button_frame.grid(row=2, column=0, columnspan=2, sticky="e")
+        ttk.Button(button_frame, text="Cancel", command=self.destroy).pack(side="right", padx=10, pady=10)
+        ttk.Button(button_frame, text="Compare", command=self.compare).pack(side="right", pady=10)
+        self.transient(parent)
+
+    def compare(self):
+        tabs = {title: tab for tab, title in self.tabs}
+        old_tab = tabs.get(self.old_var.get())
+        new_tab = tabs.get(self.new_var.get())
+        if old_tab is None or new_tab is None:
+            messagebox.showerror("Error", "Select two finished plugin results to compare.", parent=self)
+            return
+        if old_tab == new_tab:
+            messagebox.showerror("Error", "Select two different tabs.", parent=self)
+            return
+        self.destroy()
+        self.logic.compare_tabs(old_tab, new_tab)
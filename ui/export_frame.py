@@ -1,7 +1,8 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 from logic.export_logic import ExportFrameLogic
-from PIL import Image, ImageTk, ImageSequence
+from logic.src.package_writer import COMPRESSION_METHODS
+from ui.images import load_animation
 import os
 import threading
 from ui.workspace_frame import WorkspaceFrame
@@ -30,11 +31,17 @@ class ExportFrame(ttk.Frame, ExportFrameLogic):
         self.include_memory_dump_check.grid(row=1, column=0, pady=(10), sticky="n", padx=20)
 
         self.include_highlighting_check = ttk.Checkbutton(frame, text="Include text formatting", variable=self.include_highlighting)
-        self.include_highlighting_check.grid(row=2, column=0, pady=(10, 30), sticky="n", padx=20)
+        self.include_highlighting_check.grid(row=2, column=0, pady=(10), sticky="n", padx=20)
+
+        compression_frame = ttk.Frame(frame)
+        compression_frame.grid(row=3, column=0, pady=(10, 30), sticky="n", padx=20)
+        ttk.Label(compression_frame, text="Compression:").pack(side="left", padx=5)
+        self.compression_combobox = ttk.Combobox(compression_frame, textvariable=self.compression, values=list(COMPRESSION_METHODS), state="readonly", width=10)
+        self.compression_combobox.pack(side="left", padx=5)
 
         # Buttons for exporting and cancelling
         button_frame = ttk.Frame(frame)
-        button_frame.grid(row=3, column=0, pady=(20), padx=20)
+        button_frame.grid(row=4, column=0, pady=(20), padx=20)
 
         export_button = ttk.Button(button_frame, text="\U0001F5BF Export", command=self.choose_save_location)
         export_button.grid(row=0, column=0, padx=(10))
@@ -44,16 +51,14 @@ class ExportFrame(ttk.Frame, ExportFrameLogic):
 
         # Loading GIF and message label (initially hidden)
         self.loading_frame = ttk.Frame(frame)
-        self.loading_frame.grid(row=4, column=0, pady=(10, 20), padx=20)
+        self.loading_frame.grid(row=5, column=0, pady=(10, 20), padx=20)
         self.loading_frame.grid_remove()
 
         self.loading_label = ttk.Label(self.loading_frame, text="Exporting... Please wait!", font=('Arial', 12))
         self.loading_label.pack(side=tk.TOP, pady=10)
 
-        # Resize the GIF to an appropriate size
-        self.loading_gif = Image.open("img/loading.gif")
-        self.loading_frames = [ImageTk.PhotoImage(frame.resize((50, 50), Image.LANCZOS)) for frame in ImageSequence.Iterator(self.loading_gif)]
-        
+        self.loading_frames = None  # Frames of img/loading.gif, decoded the first time an export runs
+
         self.loading_image_label = ttk.Label(self.loading_frame)  # Initialize loading_image_label
         self.loading_image_label.pack(side=tk.TOP)
 
@@ -67,7 +72,10 @@ class ExportFrame(ttk.Frame, ExportFrameLogic):
             threading.Thread(target=self.create_zip_file, args=(zip_path, self.parent.frames[WorkspaceFrame].get_export_data())).start()
 
     def show_loading(self):
+        self.loading_label.config(text="Exporting... Please wait!")
         self.loading_frame.grid()
+        if self.loading_frames is None:
+            self.loading_frames = load_animation("img/loading.gif", (50, 50))
         self.loading_animation = self.loading_image_label.after(100, self.animate_loading)
 
     def hide_loading(self):
@@ -76,6 +84,9 @@ class ExportFrame(ttk.Frame, ExportFrameLogic):
             self.loading_image_label.after_cancel(self.loading_animation)
             self.loading_animation = None
 
+    def show_progress(self, message):
+        self.loading_label.config(text=message)
+
     def animate_loading(self):
         frame = self.loading_frames[self.loading_frame_index]
         self.loading_image_label.configure(image=frame)
@@ -0,0 +1,71 @@
+import os
+import struct
+import tkinter as tk
+
+BASE_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ASSET_DIR = os.path.join('.volgui_cache', 'assets')
+
+def png_size(path):
+    """(width, height) from a PNG header, None for anything else."""
+    with open(path, 'rb') as file:
+        header = file.read(24)
+    if header[:8] != b"\x89PNG\r\n\x1a\n":
+        return None
+    return struct.unpack(">II", header[16:24])
+
+def cached_frames(path, size, asset_dir=ASSET_DIR):
+    """Paths of PNGs holding every frame of an image under img/ at the given size.
+
+    They are rendered with PIL once and rendered again when the source image changes, so later runs
+    hand Tk a file it can read as is.
+    """
+    source = os.path.join(BASE_DIRECTORY, path)
+    name = f"{os.path.splitext(os.path.basename(path))[0]}_{size[0]}x{size[1]}"
+    manifest = os.path.join(asset_dir, name + '.frames')  # "<source mtime> <frame count>", written last
+    source_mtime = os.stat(source).st_mtime_ns
+    try:
+        with open(manifest, 'r') as file:
+            mtime, count = file.read().split()
+        frames = [os.path.join(asset_dir, f"{name}_{index}.png") for index in range(int(count))]
+        if int(mtime) == source_mtime and all(os.path.exists(frame) for frame in frames):
+            return frames
+    except (OSError, ValueError):
+        pass  # Not built yet, or left half written
+
+    from PIL import Image, ImageSequence
+    print(f"Rendering {path} at {size[0]}x{size[1]} into the asset cache")
+    os.makedirs(asset_dir, exist_ok=True)
+    frames = []
+    with Image.open(source) as image:
+        for index, frame in enumerate(ImageSequence.Iterator(image)):
+            frame_path = os.path.join(asset_dir, f"{name}_{index}.png")
+            frame.convert("RGBA").resize(size, Image.LANCZOS).save(frame_path + '.tmp', format="PNG")
+            os.replace(frame_path + '.tmp', frame_path)
+            frames.append(frame_path)
+    with open(manifest + '.tmp', 'w') as file:
+        file.write(f"{source_mtime} {len(frames)}")
+    os.replace(manifest + '.tmp', manifest)
+    return frames
+
+def load_image(path, size):
+    """A PhotoImage of an image under img/ at the given size, resized copies come from the asset cache."""
+    source = os.path.join(BASE_DIRECTORY, path)
+    if png_size(source) == tuple(size):
+        return tk.PhotoImage(file=source)  # Tk reads PNG itself
+    try:
+        return tk.PhotoImage(file=cached_frames(path, size)[0])
+    except OSError as e:
+        print(f"Asset cache unavailable ({e}), resizing {path} in memory")
+    from PIL import Image, ImageTk
+    with Image.open(source) as image:
+        return ImageTk.PhotoImage(image.resize(size, Image.LANCZOS))
+
+def load_animation(path, size):
+    """Every frame of an animated GIF as a PhotoImage of the given size."""
+    try:
+        return [tk.PhotoImage(file=frame) for frame in cached_frames(path, size)]
+    except OSError as e:
+        print(f"Asset cache unavailable ({e}), resizing {path} in memory")
+    from PIL import Image, ImageTk, ImageSequence
+    with Image.open(os.path.join(BASE_DIRECTORY, path)) as image:
+        return [ImageTk.PhotoImage(frame.resize(size, Image.LANCZOS)) for frame in ImageSequence.Iterator(image)]
@@ -1,10 +1,9 @@
-import json
-import os
 import tkinter as tk
 from tkinter import ttk, filedialog
 from tkinterdnd2 import DND_FILES
-from PIL import Image, ImageTk
+from ui.images import load_image
 from logic.import_logic import ImportFrameLogic, ALLOWED_FILE_TYPES
+from logic.src.command_catalog import get_setting
 
 class ImportFrame(tk.Frame):
     def __init__(self, parent, app, file_handler, switch_to_workspace_frame):
@@ -20,23 +19,14 @@ class ImportFrame(tk.Frame):
         self.main_frame.grid_columnconfigure(0, weight=1)
 
         # Load images
-        logo_image = Image.open("img/Logo2.png")
-        logo_image = logo_image.resize((495, 174), Image.LANCZOS)
-        self.logo_image = ImageTk.PhotoImage(logo_image)
-
-        drag_image = Image.open("img/Drag3.png")
-        drag_image = drag_image.resize((120, 120), Image.LANCZOS)
-        self.drag_image = ImageTk.PhotoImage(drag_image)
+        self.logo_image = load_image("img/Logo2.png", (495, 174))
+        self.drag_image = load_image("img/Drag3.png", (120, 120))
 
         # Top logo
         self.logo_label = tk.Label(self.main_frame, image=self.logo_image, bg="#333333")
         self.logo_label.grid(row=0, column=0, pady=(10, 0), padx=(0, 60), sticky="n")
 
-        settings_file_path = os.path.join(os.path.dirname(__file__), '..', 'settings.json')
-        with open(settings_file_path, 'r') as f:
-            settings = json.load(f)
-
-        volatility_version = settings.get('volatility_version', 'Unknown')
+        volatility_version = get_setting('volatility_version', 'Unknown')
         version_text = f"VolGUI 1.0.0 and Volatility 3 Framework {volatility_version}"
 
         self.version_label = tk.Label(self.main_frame, text=version_text, font=('Arial', 11), bg="#333333", fg="white")
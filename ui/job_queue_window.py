@@ -0,0 +1,87 @@
+import os
+import tkinter as tk
+from tkinter import ttk, simpledialog
+from logic.src.job_scheduler import PRIORITY_HIGH, PRIORITY_LOW, PRIORITY_NAMES, MB
+
+REFRESH_INTERVAL = 500  # ms
+
+class JobQueueWindow(tk.Toplevel):
+    """Shows the pending, running and finished jobs of the scheduler (or of a job service the GUI attached to)."""
+    def __init__(self, parent, scheduler, title="Job Queue"):
+        super().__init__(parent)
+        self.title(title)
+        self.geometry("840x360")
+        self.scheduler = scheduler
+        self.refresh_id = None
+
+        columns = ("job", "dump", "priority", "state", "memory", "runtime", "timeout")
+        self.tree = ttk.Treeview(self, columns=columns, show="headings", selectmode="browse")
+        for column, heading, width in zip(columns, ("Job", "Dump", "Priority", "State", "Memory hint", "Runtime", "Timeout"), (200, 160, 70, 80, 90, 70, 70)):
+            self.tree.heading(column, text=heading)
+            self.tree.column(column, width=width, anchor="w")
+        scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+
+        button_frame = ttk.Frame(self)
+        ttk.Button(button_frame, text="Raise Priority", command=lambda: self.change_priority(PRIORITY_HIGH)).pack(side="left", padx=5, pady=5)
+        ttk.Button(button_frame, text="Lower Priority", command=lambda: self.change_priority(PRIORITY_LOW)).pack(side="left", padx=5, pady=5)
+        ttk.Button(button_frame, text="Set Timeout...", command=self.set_timeout).pack(side="left", padx=5, pady=5)
+        ttk.Button(button_frame, text="Cancel Job", command=self.cancel_job).pack(side="left", padx=5, pady=5)
+        self.summary_label = ttk.Label(button_frame, text="")
+        self.summary_label.pack(side="right", padx=5, pady=5)
+
+        button_frame.pack(side="bottom", fill="x")
+        scrollbar.pack(side="right", fill="y")
+        self.tree.pack(side="left", fill="both", expand=True)
+
+        self.protocol("WM_DELETE_WINDOW", self.close)
+        self.refresh()
+
+    def refresh(self):
+        selected = self.tree.selection()
+        self.tree.delete(*self.tree.get_children())
+        counts = {}
+        for job in self.scheduler.jobs():
+            counts[job.state] = counts.get(job.state, 0) + 1
+            runtime = f"{job.runtime():.0f} s" if job.started else ""
+            dump = os.path.basename(job.dump) if job.dump else ""
+            state = "cancelling" if job.cancel_requested and job.state == "running" else job.state
+            timeout = f"{job.timeout} s" if job.timeout else ""
+            self.tree.insert("", "end", iid=str(job.id), values=(job.name, dump, PRIORITY_NAMES.get(job.priority, job.priority), state, f"{job.memory // MB} MB", runtime, timeout))
+        existing = [iid for iid in selected if self.tree.exists(iid)]
+        if existing:
+            self.tree.selection_set(existing)
+
+        summary = ", ".join(f"{count} {state}" for state, count in counts.items())
+        if hasattr(self.scheduler, "memory_limit"):
+            memory_limit = self.scheduler.memory_limit
+            budget = f"memory budget {memory_limit // MB} MB" if memory_limit else "memory budget unknown"
+            summary = f"{summary}, {budget}" if summary else budget
+        if getattr(self.scheduler, "error", None):
+            summary = f"Service unreachable: {self.scheduler.error}"
+        self.summary_label.config(text=summary)
+        self.refresh_id = self.after(REFRESH_INTERVAL, self.refresh)
+
+    def change_priority(self, priority):
+        for iid in self.tree.selection():
+            self.scheduler.set_priority(int(iid), priority)
+
+    def cancel_job(self):
+        for iid in self.tree.selection():
+            self.scheduler.cancel_job(int(iid))
+
+    def set_timeout(self):
+        for iid in self.tree.selection():
+            job = self.scheduler.find_job(int(iid))
+            if job is None or job.state not in ("pending", "running"):
+                continue
+            timeout = simpledialog.askinteger("Set Timeout", f"Timeout for {job.name} in seconds (0 for none):", parent=self, minvalue=0, initialvalue=job.timeout or 0)
+            if timeout is not None:
+                self.scheduler.set_timeout(job.id, timeout)
+
+    def close(self):
+        if self.refresh_id:
+            self.after_cancel(self.refresh_id)
+        if hasattr(self.scheduler, "close"):
+            self.scheduler.close()  # Stop polling the service
+        self.destroy()
@@ -0,0 +1,203 @@
+import threading
+import tkinter as tk
+from tkinter import ttk
+
+POLL_INTERVAL = 300  # ms between checks for rows that arrived while the plugin is still running
+MAX_COLUMN_WIDTH = 400
+CHAR_WIDTH = 7  # Rough pixels per character for the initial column widths
+
+class ResultGrid(ttk.Frame):
+    """Table view of a ResultTable that only creates Treeview items for the rows on screen."""
+    def __init__(self, master, table, **kwargs):
+        super().__init__(master, **kwargs)
+        self.table = table
+        self.order = None  # Row indices after sorting or filtering, None for the plugin's order
+        self.sort_column = None
+        self.sort_reverse = False
+        self.top = 0  # Position of the first visible row
+        self.visible_rows = 1
+        self.item_rows = {}  # Treeview item -> table row it shows right now
+        self.selected = set()
+        self.shown_columns = None
+        self.shown_size = -1
+        self.poll_id = None
+        self.row_height = int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+
+        filter_frame = ttk.Frame(self)
+        ttk.Label(filter_frame, text="Filter:").pack(side="left", padx=5)
+        self.filter_var = tk.StringVar()
+        filter_entry = ttk.Entry(filter_frame, textvariable=self.filter_var)
+        filter_entry.pack(side="left", fill="x", expand=True, padx=5)
+        filter_entry.bind("<Return>", self.apply_filter)
+        self.count_label = ttk.Label(filter_frame, text="")
+        self.count_label.pack(side="right", padx=5)
+        filter_frame.pack(side="top", fill="x", pady=2)
+
+        self.tree = ttk.Treeview(self, show="headings", selectmode="extended")
+        # The scrollbar is mapped to the row count of the table, not to the few items in the Treeview
+        self.v_scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.yview)
+        h_scrollbar = ttk.Scrollbar(self, orient="horizontal", command=self.tree.xview)
+        self.tree.configure(xscrollcommand=h_scrollbar.set)
+        self.v_scrollbar.pack(side="right", fill="y")
+        h_scrollbar.pack(side="bottom", fill="x")
+        self.tree.pack(side="left", fill="both", expand=True)
+
+        self.tree.bind("<Configure>", self.on_resize)
+        self.tree.bind("<MouseWheel>", self.on_mouse_wheel)
+        self.tree.bind("<Button-4>", lambda event: self.scroll_rows(-3))
+        self.tree.bind("<Button-5>", lambda event: self.scroll_rows(3))
+        self.tree.bind("<Up>", lambda event: self.scroll_rows(-1))
+        self.tree.bind("<Down>", lambda event: self.scroll_rows(1))
+        self.tree.bind("<Prior>", lambda event: self.scroll_rows(-self.visible_rows))
+        self.tree.bind("<Next>", lambda event: self.scroll_rows(self.visible_rows))
+        self.tree.bind("<Home>", lambda event: self.scroll_to(0))
+        self.tree.bind("<End>", lambda event: self.scroll_to(self.row_count()))
+        self.tree.bind("<<TreeviewSelect>>", self.on_select)
+        self.tree.bind("<Control-c>", self.copy_selection)
+        self.bind("<Destroy>", self.on_destroy)
+
+        self.poll()
+
+    def row_count(self):
+        if self.order is None:
+            return len(self.table)
+        return len(self.order)
+
+    def row_at(self, position):
+        if self.order is None:
+            return position
+        return self.order[position]
+
+    def setup_columns(self):
+        columns = self.table.columns or []
+        self.tree.configure(columns=[str(index) for index in range(len(columns))])
+        for index, name in enumerate(columns):
+            self.tree.heading(str(index), text=name, command=lambda n=name: self.sort_by(n))
+            width = max([len(name)] + [len(self.table.format_value(index, self.table.data[index][row])) for row in range(min(len(self.table), 50))])
+            self.tree.column(str(index), width=min(width * CHAR_WIDTH + 16, MAX_COLUMN_WIDTH), stretch=False, anchor="w")
+        self.shown_columns = self.table.columns
+
+    def poll(self):
+        if self.table.columns is not self.shown_columns:
+            self.setup_columns()
+        if len(self.table) != self.shown_size:
+            self.shown_size = len(self.table)
+            self.render()
+        self.poll_id = self.after(POLL_INTERVAL, self.poll)
+
+    def on_destroy(self, event):
+        if event.widget is self and self.poll_id:
+            self.after_cancel(self.poll_id)
+            self.poll_id = None
+
+    def on_resize(self, event):
+        heading_height = self.row_height + 4
+        visible_rows = max(1, (event.height - heading_height) // self.row_height)
+        if visible_rows != self.visible_rows:
+            self.visible_rows = visible_rows
+            self.render()
+
+    def render(self):
+        # Reuse the same few items and only change their values, so scrolling costs the same at any table size
+        total = self.row_count()
+        self.top = max(0, min(self.top, total - self.visible_rows))
+        count = min(self.visible_rows, total - self.top)
+        items = self.tree.get_children()
+        if len(items) > count:
+            self.tree.delete(*items[count:])
+            items = items[:count]
+        for index in range(len(items), count):
+            items += (self.tree.insert("", "end"),)
+
+        self.item_rows = {}
+        selection = []
+        for position, item in enumerate(items):
+            row = self.row_at(self.top + position)
+            self.item_rows[item] = row
+            values = [self.table.format_value(column, self.table.data[column][row]) for column in range(len(self.table.data))]
+            depth = self.table.depths[row]
+            if depth and values:
+                values[0] = "*" * depth + " " + values[0]
+            self.tree.item(item, values=values)
+            if row in self.selected:
+                selection.append(item)
+        self.tree.selection_set(selection)
+
+        if total:
+            self.v_scrollbar.set(self.top / total, (self.top + count) / total)
+        else:
+            self.v_scrollbar.set(0, 1)
+        self.count_label.config(text=f"{total} of {len(self.table)} rows" if self.order is not None else f"{total} rows")
+
+    def yview(self, *args):
+        if args[0] == "moveto":
+            self.scroll_to(int(float(args[1]) * self.row_count()))
+        elif args[0] == "scroll":
+            amount = int(args[1])
+            self.scroll_rows(amount * self.visible_rows if args[2] == "pages" else amount)
+
+    def scroll_to(self, position):
+        self.top = position
+        self.render()
+        return "break"
+
+    def scroll_rows(self, amount):
+        return self.scroll_to(self.top + amount)
+
+    def show_row(self, row):
+        """Scroll to a table row and select it, sorting and a filter that hides it are cleared."""
+        position = row
+        if self.order is not None:
+            try:
+                position = self.order.index(row)
+            except ValueError:
+                self.filter_var.set("")
+                self.sort_column, self.sort_reverse = None, False
+                self.set_order(None, None, False)
+        self.selected = {row}
+        return self.scroll_to(max(0, position - self.visible_rows // 2))
+
+    def on_mouse_wheel(self, event):
+        return self.scroll_rows(-3 if event.delta > 0 else 3)
+
+    def on_select(self, event):
+        # Keep selected rows that are scrolled out of view, the items only know the visible ones
+        visible = set(self.item_rows.values())
+        self.selected = {row for row in self.selected if row not in visible} | {self.item_rows[item] for item in self.tree.selection() if item in self.item_rows}
+
+    def copy_selection(self, event=None):
+        rows = sorted(self.selected)
+        if rows:
+            self.clipboard_clear()
+            self.clipboard_append("".join(self.table.format_row(row) for row in rows))
+        return "break"
+
+    def sort_by(self, name):
+        reverse = not self.sort_reverse if self.sort_column == name else False
+        self.sort_column = name
+        self.sort_reverse = reverse
+        filter_text = self.filter_var.get().strip()
+        self.count_label.config(text="Sorting...")
+        threading.Thread(target=self.compute_order, args=(name, reverse, filter_text), daemon=True).start()
+
+    def apply_filter(self, event=None):
+        self.count_label.config(text="Filtering...")
+        threading.Thread(target=self.compute_order, args=(self.sort_column, self.sort_reverse, self.filter_var.get().strip()), daemon=True).start()
+
+    def compute_order(self, sort_column, reverse, filter_text):
+        # Sorting a million rows takes a moment, so it happens off the Tk thread
+        order = self.table.sort_order(sort_column, reverse) if sort_column else None
+        if filter_text:
+            order = self.table.filter_order(filter_text, order=order)
+        try:
+            self.after(0, self.set_order, order, sort_column, reverse)
+        except (RuntimeError, tk.TclError):
+            pass  # The tab was closed in the meantime
+
+    def set_order(self, order, sort_column, reverse):
+        self.order = order
+        for index, name in enumerate(self.table.columns or []):
+            arrow = (" ▼" if reverse else " ▲") if name == sort_column else ""
+            self.tree.heading(str(index), text=name + arrow)
+        self.top = 0
+        self.render()
@@ -1,8 +1,10 @@
-import json
 import os
+import threading
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 from logic.settings_logic import SettingsFrameLogic
+from ui.workspace_frame import WorkspaceFrame
+from logic.src.command_catalog import get_settings_store, update_settings
 
 class SettingsFrame(tk.Frame, SettingsFrameLogic):
     def __init__(self, parent, app):
@@ -64,49 +66,88 @@ class SettingsFrame(tk.Frame, SettingsFrameLogic):
         self.letter_distance_spinbox = ttk.Spinbox(self.main_frame, from_=0, to=10, width=5)
         self.letter_distance_spinbox.grid(row=5, column=1, sticky="ew", padx=10, pady=5)
 
+        # Execution Engine
+        self.execution_engine_label = tk.Label(self.main_frame, text="Execution engine:", font=('Arial', 12))
+        self.execution_engine_label.grid(row=6, column=0, sticky="w", padx=10, pady=5)
+        self.execution_engine_combobox = ttk.Combobox(self.main_frame, values=["inprocess", "worker", "subprocess"], state="readonly", width=12)
+        self.execution_engine_combobox.grid(row=6, column=1, sticky="w", padx=10, pady=5)
+
+        # Result Cache
+        self.result_cache_label = tk.Label(self.main_frame, text="Result cache:", font=('Arial', 12))
+        self.result_cache_label.grid(row=7, column=0, sticky="w", padx=10, pady=5)
+        self.result_cache_stats_label = tk.Label(self.main_frame, text="", font=('Arial', 12))
+        self.result_cache_stats_label.grid(row=7, column=1, sticky="w", padx=10, pady=5)
+        self.clear_cache_button = ttk.Button(self.main_frame, text="Clear Cache", command=self.clear_result_cache)
+        self.clear_cache_button.grid(row=7, column=2, sticky="w", padx=10, pady=5)
+
+        # Symbol Tables
+        self.symbol_directory_label = tk.Label(self.main_frame, text="Symbol directory:", font=('Arial', 12))
+        self.symbol_directory_label.grid(row=8, column=0, sticky="w", padx=10, pady=5)
+        self.symbol_directory_entry = ttk.Entry(self.main_frame, width=50)
+        self.symbol_directory_entry.grid(row=8, column=1, sticky="ew", padx=10, pady=5)
+        self.symbol_browse_button = ttk.Button(self.main_frame, text="\U0001F5C1 Browse", command=self.browse_symbol_folder)
+        self.symbol_browse_button.grid(row=8, column=2, sticky="w", padx=10, pady=5)
+        self.symbol_status_label = tk.Label(self.main_frame, text="", font=('Arial', 12), justify="left")
+        self.symbol_status_label.grid(row=9, column=1, sticky="w", padx=10, pady=5)
+        self.prepare_symbols_button = ttk.Button(self.main_frame, text="Prepare Symbols", command=self.prepare_symbols)
+        self.prepare_symbols_button.grid(row=9, column=2, sticky="w", padx=10, pady=5)
+
         # Save and Exit Buttons
         self.save_button = ttk.Button(self.main_frame, text="\U0001F5AA Save", command=self.save_settings)
-        self.save_button.grid(row=6, column=1, pady=20, padx=10, sticky="e")
+        self.save_button.grid(row=10, column=1, pady=20, padx=10, sticky="e")
         self.exit_button = ttk.Button(self.main_frame, text="\U000025C1 Back", command=self.exit_settings)
-        self.exit_button.grid(row=6, column=2, pady=20, padx=10, sticky="w")
+        self.exit_button.grid(row=10, column=2, pady=20, padx=10, sticky="w")
 
         # Version Label at Bottom Left corner
-        settings_file_path = os.path.join(os.path.dirname(__file__), '..', 'settings.json')
-        with open(settings_file_path, 'r') as f:
-            settings = json.load(f)
-
         # Extract the version information
-        volatility_version = settings.get('volatility_version', 'Unknown')
+        volatility_version = get_settings_store().get().get('volatility_version', 'Unknown')
         version_text = f"VolGUI 1.0.0 and Volatility 3 Framework {volatility_version}"
 
         self.version_label = tk.Label(self.bottom_frame, text=version_text)
         self.version_label.grid(row=0, column=0, sticky="w", padx=10, pady=10)
 
     def load_settings(self):
-        settings_file_path = os.path.join(os.path.dirname(__file__), '..', 'settings.json')
-        if os.path.exists(settings_file_path):
-            with open(settings_file_path, 'r') as f:
-                settings = json.load(f)
-                self.volatility_path_entry.insert(0, settings.get("volatility_path", ""))
-                self.font_size_spinbox.set(settings.get("font_size", "12"))
-                self.line_distance_spinbox.set(settings.get("line_distance", "1"))
-                self.letter_distance_spinbox.set(settings.get("letter_distance", "1"))
-        else:
-            messagebox.showerror("Error", f"Settings file not found at {settings_file_path}")
+        store = get_settings_store()
+        settings = store.get()
+        if store.error is not None:
+            messagebox.showerror("Error", f"Could not read the settings file {store.path}: {store.error}")
+            return
+        self.volatility_path_entry.delete(0, tk.END)
+        self.volatility_path_entry.insert(0, settings.get("volatility_path", ""))
+        self.font_size_spinbox.set(settings.get("font_size", "12"))
+        self.line_distance_spinbox.set(settings.get("line_distance", "1"))
+        self.letter_distance_spinbox.set(settings.get("letter_distance", "1"))
+        self.execution_engine_combobox.set(settings.get("execution_engine", "subprocess"))
+        self.symbol_directory_entry.delete(0, tk.END)
+        self.symbol_directory_entry.insert(0, settings.get("symbol_directory", ""))
 
     def save_settings(self):
-        settings = {
+        # Settings this frame doesn't show are kept, the workspace picks up the new font through the settings store
+        changes = {
             "volatility_path": self.volatility_path_entry.get(),
             "font_size": self.font_size_spinbox.get(),
             "line_distance": self.line_distance_spinbox.get(),
             "letter_distance": self.letter_distance_spinbox.get(),
-            "volatility_version": "2.7.0"  # Keep this constant for now
+            "volatility_version": "2.7.0",  # Keep this constant for now
+            "execution_engine": self.execution_engine_combobox.get() or "subprocess",
+            "symbol_directory": self.symbol_directory_entry.get().strip()
         }
-        settings_file_path = os.path.join(os.path.dirname(__file__), '..', 'settings.json')
-        with open(settings_file_path, 'w') as f:
-            json.dump(settings, f, indent=4)
+        try:
+            update_settings(changes)
+        except OSError as e:
+            messagebox.showerror("Error", f"Could not save the settings: {e}")
+            return
         messagebox.showinfo("Settings Saved", "Settings have been saved successfully.")
-        self.app.apply_font_settings_to_console()
+
+    def update_cache_stats(self):
+        stats = self.app.frames[WorkspaceFrame].logic.get_result_cache().stats()
+        size_mb = stats["size"] / (1024 * 1024)
+        self.result_cache_stats_label.config(text=f"{stats['entries']} results, {size_mb:.1f} MB, {stats['hits']} hits, {stats['misses']} misses")
+
+    def clear_result_cache(self):
+        if messagebox.askyesno("Clear Cache", "Remove all cached plugin results?"):
+            self.app.frames[WorkspaceFrame].logic.get_result_cache().clear()
+            self.update_cache_stats()
 
     def browse_folder(self):
         folder_path = filedialog.askdirectory()
@@ -114,5 +155,41 @@ class SettingsFrame(tk.Frame, SettingsFrameLogic):
             self.volatility_path_entry.delete(0, tk.END)
             self.volatility_path_entry.insert(0, folder_path)
 
+    def browse_symbol_folder(self):
+        folder_path = filedialog.askdirectory()
+        if folder_path:
+            self.symbol_directory_entry.delete(0, tk.END)
+            self.symbol_directory_entry.insert(0, folder_path)
+
+    def prepare_symbols(self):
+        cache = self.app.frames[WorkspaceFrame].logic.get_symbol_cache(self.symbol_directory_entry.get().strip())
+        if cache is None:
+            messagebox.showerror("Error", "Choose an existing symbol directory first.")
+            return
+        dump_paths = self.app.file_handler.get_loaded_files()
+        self.prepare_symbols_button.config(state=tk.DISABLED)
+        self.symbol_status_label.config(text="Indexing symbol tables...")
+        threading.Thread(target=self.run_prepare_symbols, args=(cache, dump_paths), daemon=True).start()
+
+    def run_prepare_symbols(self, cache, dump_paths):
+        # Find the kernel of every loaded dump, then index the directory and unpack their symbol tables
+        try:
+            for dump_path in dump_paths:
+                cache.match_dump(dump_path)
+            with cache.lock:
+                cache.index()
+                lines = [f"{len(cache.entries)} symbol tables"]
+                for dump_path in dump_paths:
+                    cache.prewarm(dump_path)
+                    lines.append(f"{os.path.basename(dump_path)}: {cache.dump_status(dump_path)}")
+            status = "\n".join(lines)
+        except Exception as e:
+            status = f"Could not prepare symbols: {e}"
+        self.after(0, self.show_symbol_status, status)
+
+    def show_symbol_status(self, status):
+        self.symbol_status_label.config(text=status)
+        self.prepare_symbols_button.config(state=tk.NORMAL)
+
     def exit_settings(self):
         self.app.switch_to_workspace_frame()
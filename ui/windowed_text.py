@@ -0,0 +1,210 @@
+import bisect
+import tkinter as tk
+
+WINDOW_LINES = 1000  # Lines of the store loaded into the Text widget at a time
+EDGE_LINES = 200  # The window moves when the viewport gets this close to one of its ends
+MAX_LINE_CHARS = 4000  # Longer lines are cut short until they are clicked
+INDEX_POLL_INTERVAL = 250  # ms between updates while a file is still being indexed
+SEARCH_CONTEXT_LINES = 5  # Lines shown above a search hit when jumping to it
+
+def parse_index(index):
+    line, column = str(index).split(".")
+    return int(line), int(column)
+
+class WindowedTextView:
+    """Shows the lines of a TextStore around the viewport in a Text widget, the scrollbar covers the whole store.
+
+    Positions such as highlights are kept in store coordinates ("line.column" with lines of the whole output),
+    the Text widget only holds lines window_start + 1 to window_start + window_lines.
+    """
+    def __init__(self, text_widget, store, scrollbar):
+        self.text_widget = text_widget
+        self.store = store
+        self.scrollbar = scrollbar
+        self.window_start = 0
+        self.window_lines = 0
+        self.expanded = set()  # Store lines shown in full although they are longer than MAX_LINE_CHARS
+        self.highlights = []  # (color, (line, column), (line, column)) in store coordinates
+        self.recenter_pending = False
+        self.search_hits = []  # (line, column, length) in store coordinates, in order
+        self.current_hit = None
+
+        text_widget.config(yscrollcommand=self.on_text_scroll)
+        scrollbar.config(command=self.yview)
+        text_widget.tag_config("truncated", foreground="grey")
+        text_widget.tag_bind("truncated", "<Button-1>", self.expand_line)
+        text_widget.tag_config("search_highlight", background="yellow", foreground="black")
+        text_widget.tag_config("search_current", background="orange", foreground="black")
+        if not store.is_indexed():
+            text_widget.after(INDEX_POLL_INTERVAL, self.poll_index)
+        self.load_window(0)
+
+    def poll_index(self):
+        try:
+            self.refresh()
+        except (tk.TclError, ValueError):
+            return  # The tab was closed
+        if not self.store.is_indexed():
+            self.text_widget.after(INDEX_POLL_INTERVAL, self.poll_index)
+
+    def display_line(self, line, text):
+        if len(text) <= MAX_LINE_CHARS or line in self.expanded:
+            return [text, ()]
+        return [text[:MAX_LINE_CHARS], (), f" ... [{len(text) - MAX_LINE_CHARS} more characters, click to show]", ("truncated",)]
+
+    def load_window(self, start):
+        total = self.store.line_count()
+        start = max(0, min(start, total - WINDOW_LINES))
+        lines = self.store.get_lines(start, start + WINDOW_LINES)
+        chunks = []
+        for offset, text in enumerate(lines):
+            if offset:
+                chunks += ["\n", ()]
+            chunks += self.display_line(start + offset, text)
+
+        self.text_widget.config(state='normal')
+        self.text_widget.delete("1.0", tk.END)
+        if chunks:
+            self.text_widget.insert("1.0", *chunks)
+        self.text_widget.config(state='disabled')
+        self.window_start = start
+        self.window_lines = len(lines)
+        self.apply_highlights()
+        self.apply_search_tags()
+        self.text_widget.event_generate("<<Change>>")
+
+    def top_line(self):
+        """Store line (0-based) at the top of the viewport."""
+        return self.window_start + parse_index(self.text_widget.index("@0,0"))[0] - 1
+
+    def show_line(self, line):
+        # Load the window around a store line and scroll it to the top of the viewport
+        if not self.window_start + EDGE_LINES <= line < self.window_start + self.window_lines - EDGE_LINES:
+            self.load_window(line - WINDOW_LINES // 2)
+        self.text_widget.yview(f"{line - self.window_start + 1}.0")
+
+    def reload(self):
+        # Same window again, e.g. after more output arrived, without moving the viewport
+        top = self.top_line()
+        xview = self.text_widget.xview()[0]
+        self.load_window(self.window_start)
+        self.text_widget.yview(f"{top - self.window_start + 1}.0")
+        self.text_widget.xview_moveto(xview)
+
+    def refresh(self):
+        """Call after the store grew, only a window that reaches the end of the output needs new lines."""
+        if self.window_lines < WINDOW_LINES or self.window_start + self.window_lines >= self.store.line_count() - 1:
+            self.reload()
+        else:
+            self.update_scrollbar()
+
+    def update_scrollbar(self):
+        total = max(1, self.store.line_count())
+        first, last = self.text_widget.yview()
+        top = self.window_start + first * self.window_lines
+        bottom = self.window_start + last * self.window_lines
+        self.scrollbar.set(top / total, bottom / total)
+
+    def on_text_scroll(self, first, last):
+        self.update_scrollbar()
+        self.apply_search_tags()
+        # Move the window before the viewport reaches its end, so scrolling with the wheel or keys never stops
+        top = float(first) * self.window_lines
+        bottom = float(last) * self.window_lines
+        near_start = self.window_start > 0 and top < EDGE_LINES
+        near_end = self.window_start + self.window_lines < self.store.line_count() and self.window_lines - bottom < EDGE_LINES
+        if (near_start or near_end) and not self.recenter_pending:
+            self.recenter_pending = True
+            self.text_widget.after_idle(self.recenter)
+
+    def recenter(self):
+        self.recenter_pending = False
+        try:
+            top = self.top_line()
+            xview = self.text_widget.xview()[0]
+            self.load_window(top - WINDOW_LINES // 2)
+            self.text_widget.yview(f"{top - self.window_start + 1}.0")
+            self.text_widget.xview_moveto(xview)
+        except (tk.TclError, ValueError):
+            pass  # The tab was closed
+
+    def yview(self, *args):
+        # Scrollbar commands are in terms of the whole store
+        if args[0] == "moveto":
+            self.show_line(int(float(args[1]) * self.store.line_count()))
+        elif args[0] == "scroll":
+            self.text_widget.yview_scroll(int(args[1]), args[2])
+
+    def expand_line(self, event):
+        line = self.window_start + parse_index(self.text_widget.index(f"@{event.x},{event.y}"))[0] - 1
+        self.expanded.add(line)
+        self.reload()
+
+    def to_store_index(self, index):
+        line, column = parse_index(self.text_widget.index(index))
+        return line + self.window_start, column
+
+    def to_widget_index(self, position):
+        return f"{position[0] - self.window_start}.{position[1]}"
+
+    def apply_highlights(self):
+        first = (self.window_start + 1, 0)
+        last = (self.window_start + self.window_lines + 1, 0)
+        for color, start, end in self.highlights:
+            if end <= first or start >= last:
+                continue
+            self.text_widget.tag_add(color, self.to_widget_index(max(start, first)), self.to_widget_index(min(end, last)))
+            self.text_widget.tag_config(color, background=color)
+
+    def add_highlight(self, color, start, end):
+        """Highlight between two Text widget indices, returns the range in store coordinates."""
+        start, end = self.to_store_index(start), self.to_store_index(end)
+        self.highlights.append((color, start, end))
+        self.apply_highlights()
+        return start, end
+
+    def remove_highlights(self, start, end):
+        for tag in self.text_widget.tag_names():
+            if tag not in ("sel", "truncated"):
+                self.text_widget.tag_remove(tag, start, end)
+        start, end = self.to_store_index(start), self.to_store_index(end)
+        remaining = []
+        for color, highlight_start, highlight_end in self.highlights:
+            if highlight_end <= start or highlight_start >= end:
+                remaining.append((color, highlight_start, highlight_end))
+                continue
+            # Keep the parts of the highlight outside the removed range
+            if highlight_start < start:
+                remaining.append((color, highlight_start, start))
+            if highlight_end > end:
+                remaining.append((color, end, highlight_end))
+        self.highlights = remaining
+
+    def highlight_ranges(self):
+        return [{"color": color, "start": f"{start[0]}.{start[1]}", "end": f"{end[0]}.{end[1]}"} for color, start, end in self.highlights]
+
+    def set_search_hits(self, hits):
+        self.search_hits = hits
+        self.current_hit = None
+        self.apply_search_tags()
+
+    def show_hit(self, hit):
+        self.current_hit = hit
+        self.show_line(max(0, hit[0] - 1 - SEARCH_CONTEXT_LINES))
+        self.text_widget.see(self.to_widget_index(hit[:2]))
+        self.apply_search_tags()
+
+    def apply_search_tags(self):
+        # Only the hits on screen get tagged, however many the whole output has
+        self.text_widget.tag_remove("search_highlight", "1.0", tk.END)
+        self.text_widget.tag_remove("search_current", "1.0", tk.END)
+        if not self.search_hits:
+            return
+        first = self.top_line() + 1
+        last = self.window_start + parse_index(self.text_widget.index(f"@0,{self.text_widget.winfo_height()}"))[0]
+        for line, column, length in self.search_hits[bisect.bisect_left(self.search_hits, (first,)):]:
+            if line > last:
+                break
+            index = self.to_widget_index((line, column))
+            tag = "search_current" if (line, column, length) == self.current_hit else "search_highlight"
+            self.text_widget.tag_add(tag, index, f"{index}+{length}c")
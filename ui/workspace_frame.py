@@ -3,8 +3,10 @@ from tkinter import ttk, filedialog
 from tkinter import messagebox
 from logic.workspace_logic import CustomDropdown, WorkspaceFrameLogic, ToolTip, CustomText, RedirectOutput
 from tkinter import PhotoImage
-from PIL import Image, ImageTk
-import json
+from ui.images import load_image
+from ui.result_grid import ResultGrid
+from ui.windowed_text import WindowedTextView
+from logic.src.command_catalog import get_settings_store
 import os
 
 class WorkspaceFrame(tk.Frame):
@@ -15,8 +17,11 @@ class WorkspaceFrame(tk.Frame):
         self.file_handler = file_handler
         self.switch_to_export_frame = switch_to_export_frame
 
-        self.logic = WorkspaceFrameLogic(parent=self, file_handler=self.file_handler)
+        self.result_grids = {}  # tab -> ResultGrid showing the tab's result table
+        self.logic = WorkspaceFrameLogic(parent=self, file_handler=self.file_handler, create_text_view=WindowedTextView,
+                                         create_table_view=self.add_table_view, journal=getattr(app, 'journal', None))
         self.font_settings = self.load_font_settings()
+        get_settings_store().subscribe(self.on_settings_changed)
 
         self.highlights = []  # Initialize the highlights attribute
 
@@ -24,7 +29,7 @@ class WorkspaceFrame(tk.Frame):
 
         # Command dropdown and input
         self.command_var = tk.StringVar()
-        self.command_options = ["-choose command-", "Custom"] + [cmd['command'] for cmd in self.logic.commands]
+        self.command_options = self.get_command_options()
         self.filtered_command_options = self.command_options.copy()
         self.command_dropdown = ttk.Combobox(self, textvariable=self.command_var, values=self.command_options)
         self.command_dropdown.grid(row=1, column=0, padx=10, pady=5, sticky="we")
@@ -48,10 +53,7 @@ class WorkspaceFrame(tk.Frame):
         self.command_info_label = ttk.Label(self, text="Command Info:")
         self.command_info_label.grid(row=2, column=0, columnspan=2, padx=10, pady=5, sticky="w")
 
-        image_path = "img/run_arrow.png"
-        img = Image.open(image_path)
-        img = img.resize((20, 20), Image.LANCZOS)
-        icon_image = ImageTk.PhotoImage(img)
+        icon_image = load_image("img/run_arrow.png", (20, 20))
 
         # Execute command button with icon
         self.run_command_button = ttk.Button(self, text="Run Command", command=self.run_command, image=icon_image, compound=tk.LEFT)
@@ -67,14 +69,8 @@ class WorkspaceFrame(tk.Frame):
         self.highlight_frame.grid(row=1, column=3, padx=10, pady=5, sticky="we")
 
         # Load icons for buttons
-        base_directory = os.path.dirname(os.path.dirname(__file__))
-        highlight_image = Image.open(os.path.join(base_directory, "img", "highlighter.png"))
-        eraser_image = Image.open(os.path.join(base_directory, "img", "eraser.png"))
-        highlight_image = highlight_image.resize((20, 20), Image.LANCZOS)  # Resize to 20x20 pixels
-        eraser_image = eraser_image.resize((20, 20), Image.LANCZOS)
-
-        self.highlight_icon = ImageTk.PhotoImage(highlight_image)
-        self.remove_highlight_icon = ImageTk.PhotoImage(eraser_image)
+        self.highlight_icon = load_image("img/highlighter.png", (20, 20))
+        self.remove_highlight_icon = load_image("img/eraser.png", (20, 20))
 
         # Button for removing highlight
         self.remove_highlight_button = ttk.Button(self.highlight_frame, image=self.remove_highlight_icon, command=self.logic.remove_highlight)
@@ -105,6 +101,18 @@ class WorkspaceFrame(tk.Frame):
         self.search_button = ttk.Button(self.search_frame, text="Search", command=self.search_text)
         self.search_button.pack(side="left", padx=5, pady=5)
         ToolTip(self.search_button, "Search for specific strings in the output.")
+
+        self.search_regex = tk.BooleanVar(value=False)
+        ttk.Checkbutton(self.search_frame, text="Regex", variable=self.search_regex, command=self.reset_search).pack(side="left", padx=5, pady=5)
+        ttk.Button(self.search_frame, text="◀", width=2, command=lambda: self.next_search_hit(-1)).pack(side="left", pady=5)
+        ttk.Button(self.search_frame, text="▶", width=2, command=lambda: self.next_search_hit(1)).pack(side="left", pady=5)
+        self.search_status = ttk.Label(self.search_frame, text="")
+        self.search_status.pack(side="left", padx=5, pady=5)
+        self.search_entry.bind("<Shift-Return>", lambda event: self.next_search_hit(-1))
+        self.search_query = None
+        self.search_hits = []  # (tab, hit) over all tabs in tab order
+        self.search_counts = {}
+        self.search_position = -1
         self.search_frame.grid_remove()
 
         # Bind Ctrl+F to show search bar
@@ -129,7 +137,7 @@ class WorkspaceFrame(tk.Frame):
         self.centered_frame.grid(row=1, column=0, padx=(20, 20), pady=5)  # Add padding to center
         self.centered_frame.grid_columnconfigure(0, weight=1)  # Center within the frame
 
-        self.sidebar_listbox = tk.Listbox(self.centered_frame, selectmode=tk.SINGLE)
+        self.sidebar_listbox = tk.Listbox(self.centered_frame, selectmode=tk.EXTENDED, exportselection=False)
         self.sidebar_listbox.grid(row=1, column=0, columnspan=2, sticky="nsew")
         self.sidebar_listbox.bind("<<ListboxSelect>>", self.on_file_select)
         self.sidebar_listbox.bind("<Motion>", self.show_file_tooltip)
@@ -153,6 +161,15 @@ class WorkspaceFrame(tk.Frame):
         self.toggle_sidebar_button.grid(row=0, column=3, padx=10, pady=5, sticky="e")
         ToolTip(self.toggle_sidebar_button, "Toggle the visibility of the sidebar to show or hide loaded files.")
 
+        # Progress of the commands running across the selected dumps (hidden while idle)
+        self.progress_frame = ttk.Frame(self)
+        self.progress_frame.grid(row=0, column=1, padx=10, pady=5, sticky="we")
+        self.progress_bar = ttk.Progressbar(self.progress_frame, mode="determinate", length=150)
+        self.progress_bar.pack(side="left", padx=5)
+        self.progress_label = ttk.Label(self.progress_frame, text="")
+        self.progress_label.pack(side="left", padx=5)
+        self.progress_frame.grid_remove()
+
         self.file_tooltip = ToolTip(self.sidebar_listbox, "")
         self.apply_font_settings()
 
@@ -211,6 +228,14 @@ class WorkspaceFrame(tk.Frame):
         self.file_handler.selected_file = file
         self.update_selected_file_label(file)
 
+    def get_command_options(self):
+        return ["-choose command-", "Custom"] + [cmd['command'] for cmd in self.logic.commands]
+
+    def update_command_options(self):
+        self.command_options = self.get_command_options()
+        self.filtered_command_options = self.command_options.copy()
+        self.command_dropdown['values'] = self.command_options
+
     def update_command_dropdown(self, command_options):
         self.command_dropdown['values'] = command_options
 
@@ -252,17 +277,30 @@ class WorkspaceFrame(tk.Frame):
 
     def select_all_files(self):
         self.sidebar_listbox.select_set(0, tk.END)
+        self.sidebar_listbox.event_generate("<<ListboxSelect>>")
 
     def on_file_select(self, event):
         selected_indices = self.sidebar_listbox.curselection()
         if selected_indices:
             selected_file_index = selected_indices[0]
             self.file_handler.selected_file = selected_file_index
+            self.file_handler.selected_files = list(selected_indices)
             selected_file = self.file_handler.get_selected_file()
             self.update_selected_file_label(selected_file)
 
+    def show_progress(self, done, total):
+        self.progress_bar.config(maximum=max(total, 1), value=done)
+        self.progress_label.config(text=f"{done}/{total} finished")
+        self.progress_frame.grid()
+
+    def hide_progress(self):
+        self.progress_frame.grid_remove()
+
     def update_selected_file_label(self, file):
-        if file:
+        selected_count = len(self.file_handler.get_selected_files())
+        if file and selected_count > 1:
+            display_text = f"Selected files:\n{selected_count} dumps"
+        elif file:
             filename_only = os.path.basename(file)  # Assuming you want just the file name, not the entire path
             display_text = f"Selected file:\n{filename_only}"
         else:
@@ -272,7 +310,11 @@ class WorkspaceFrame(tk.Frame):
     def add_file(self):
         file_paths = filedialog.askopenfilenames()
         if file_paths:
-            self.file_handler.load_files(file_paths)
+            for file_path in file_paths:
+                try:
+                    self.file_handler.load_files(file_path)
+                except OSError as e:
+                    messagebox.showerror("Error", f"Could not read {os.path.basename(file_path)}: {e}")
             self.show_sidebar(self.file_handler.loaded_files)
 
     def close_file(self):
@@ -280,8 +322,9 @@ class WorkspaceFrame(tk.Frame):
         if selected_indices:
             selected_file_index = selected_indices[0]
             selected_file = self.file_handler.loaded_files[selected_file_index]
-            self.file_handler.loaded_files.remove(selected_file)
+            self.file_handler.remove_file(selected_file_index)
             self.show_sidebar(self.file_handler.loaded_files)
+            self.logic.sync_worker_pool()
             if self.file_handler.loaded_files:
                 self.update_selected_file_label(self.file_handler.loaded_files[0])
             else:
@@ -296,29 +339,70 @@ class WorkspaceFrame(tk.Frame):
 
     def clear_search_highlight(self, event):
         if not self.search_entry.get().strip():
-            for tab_id in self.tab_control.tabs():
-                tab = self.tab_control.nametowidget(tab_id)
-                text_widget = tab.winfo_children()[0].winfo_children()[0]  # Update to access the text widget
-                text_widget.tag_remove('search_highlight', '1.0', tk.END)
+            self.reset_search()
+
+    def reset_search(self):
+        self.search_query = None
+        self.search_hits = []
+        self.search_status.config(text="")
+        for view in self.logic.text_views.values():
+            view.set_search_hits([])
 
     def search_text(self, event=None):
         search_term = self.search_entry.get().strip()
         if not search_term:
             return
 
-        for tab_id in self.tab_control.tabs():
-            tab = self.tab_control.nametowidget(tab_id)
-            text_widget = tab.winfo_children()[0].winfo_children()[0]  # Update to access the text widget
-            text_widget.tag_remove('search_highlight', '1.0', tk.END)
-            start_pos = '1.0'
-            while True:
-                start_pos = text_widget.search(search_term, start_pos, stopindex=tk.END, nocase=True)
-                if not start_pos:
-                    break
-                end_pos = f'{start_pos}+{len(search_term)}c'
-                text_widget.tag_add('search_highlight', start_pos, end_pos)
-                start_pos = end_pos
-            text_widget.tag_config('search_highlight', background='yellow', foreground='black')
+        query = (search_term, self.search_regex.get())
+        if query == self.search_query:
+            self.next_search_hit(1)  # Enter again moves on to the next hit
+            return
+        self.search_query = query
+        self.search_status.config(text="Searching...")
+        self.logic.search_tabs(search_term, query[1], self.show_search_results)
+
+    def show_search_results(self, results, error):
+        if error:
+            self.search_query = None
+            self.search_status.config(text=error)
+            return
+
+        self.search_hits = [(tab, hit) for tab, hits in results for hit in hits]
+        self.search_counts = {tab: len(hits) for tab, hits in results}
+        for tab, hits in results:
+            view = self.logic.get_text_view(tab)
+            if view:
+                view.set_search_hits([hit for hit in hits if hit[0] != "row"])  # Row hits are shown in the table
+        if not self.search_hits:
+            self.search_status.config(text="No matches")
+            return
+
+        # Start with the first hit in the tab that is open
+        current_tab = self.tab_control.select()
+        self.search_position = next((position for position, (tab, hit) in enumerate(self.search_hits) if tab == current_tab), 0) - 1
+        self.next_search_hit(1)
+
+    def next_search_hit(self, step):
+        if not self.search_hits:
+            return "break"
+        self.search_position = (self.search_position + step) % len(self.search_hits)
+        tab, hit = self.search_hits[self.search_position]
+        view = self.logic.get_text_view(tab)
+        grid = self.result_grids.get(tab)
+        if view is None or (hit[0] == "row" and grid is None):
+            self.reset_search()  # The tab was closed
+            return "break"
+        self.tab_control.select(tab)
+        if hit[0] == "row":
+            # A row past the text view, shown in the table
+            self.show_table_view(self.nametowidget(tab))
+            grid.show_row(hit[1])
+        else:
+            self.show_text_view(self.nametowidget(tab))
+            view.show_hit(hit)
+        tabs_with_hits = sum(1 for count in self.search_counts.values() if count)
+        self.search_status.config(text=f"{self.search_position + 1} of {len(self.search_hits)} ({self.search_counts[tab]} in this tab, {tabs_with_hits} tabs)")
+        return "break"
 
     def search_command(self, event=None):
         search_term = self.command_var.get().strip().lower()
@@ -368,43 +452,29 @@ class WorkspaceFrame(tk.Frame):
      }
      for tab_id in self.tab_control.tabs():
         tab_widget = self.tab_control.nametowidget(tab_id)
-        text_frame = tab_widget.winfo_children()[0]  # Access the frame within the tab
-        text_widget = text_frame.winfo_children()[0]  # Access the text widget within the frame
         command = self.tab_control.tab(tab_widget, "text").split(" (")[0]
-        output = text_widget.get("1.0", tk.END)
-        highlights = []
-        for tag in text_widget.tag_names():
-            if tag != 'sel':
-                ranges = text_widget.tag_ranges(tag)
-                for i in range(0, len(ranges), 2):
-                    highlights.append({
-                        "color": tag,
-                        "start": ranges[i].string,
-                        "end": ranges[i + 1].string
-                    })
+        table = self.logic.result_tables.get(str(tab_widget))
+        view = self.logic.get_text_view(tab_widget)
+        highlights = view.highlight_ranges()
         export_data["commands"].append({
             "command": command,
-            "output": output,
+            "chunks": self.logic.result_chunks(tab_widget),  # Read from the store, the widget only holds the lines around the viewport
+            "table": table,
             "highlights": highlights
         })
      return export_data
 
     def load_font_settings(self):
-        settings_file_path = os.path.join(os.path.dirname(__file__), '..', 'settings.json')
-        if os.path.exists(settings_file_path):
-            with open(settings_file_path, 'r') as f:
-                settings = json.load(f)
-                return {
-                    "font_size": settings.get("font_size", "12"),
-                    "line_distance": settings.get("line_distance", "1"),
-                    "letter_distance": settings.get("letter_distance", "1")
-                }
-        else:
-            return {
-                "font_size": "12",
-                "line_distance": "1",
-                "letter_distance": "1"
-            }
+        settings = get_settings_store().get()
+        return {
+            "font_size": settings.get("font_size", "12"),
+            "line_distance": settings.get("line_distance", "1"),
+            "letter_distance": settings.get("letter_distance", "1")
+        }
+
+    def on_settings_changed(self, settings):
+        # Called by the settings store, possibly on a job's thread
+        self.after(0, self.apply_font_settings_to_console)
 
     def apply_font_settings(self):
         font_size = int(self.font_settings.get("font_size", "12"))
@@ -422,5 +492,48 @@ class WorkspaceFrame(tk.Frame):
         close_button = ttk.Button(tab, text="Close Tab", command=lambda: self.logic.close_tab(tab))
         close_button.pack(side="top", anchor="ne", pady=5, padx=5)
 
+    def show_view_button(self, tab):
+        view_button = ttk.Button(tab, text="Table/Text View", command=lambda: self.toggle_table_view(tab))
+        view_button.pack(side="top", anchor="ne", pady=5, padx=5)
+        return view_button
+
+    def add_table_view(self, tab, table):
+        # The grid is built right away but stays hidden until the user or a large result switches to it
+        self.result_grids[str(tab)] = ResultGrid(tab, table)
+        self.show_view_button(tab)
+
+    def remove_table_view(self, tab):
+        grid = self.result_grids.pop(str(tab), None)
+        if grid is not None:
+            grid.destroy()  # Stops its polling
+
+    def show_table_view(self, tab):
+        grid = self.result_grids.get(str(tab))
+        if grid is None or grid.winfo_manager():
+            return
+        text_frame = tab.winfo_children()[0]
+        grid.pack(expand=True, fill='both', before=text_frame)
+        text_frame.pack_forget()
+
+    def show_text_view(self, tab):
+        grid = self.result_grids.get(str(tab))
+        if grid is None or not grid.winfo_manager():
+            return
+        text_frame = tab.winfo_children()[0]
+        text_frame.pack(expand=True, fill='both', before=grid)
+        grid.pack_forget()
+
+    def toggle_table_view(self, tab):
+        grid = self.result_grids.get(str(tab))
+        if grid is not None and grid.winfo_manager():
+            self.show_text_view(tab)
+        else:
+            self.show_table_view(tab)
+
+    def show_cancel_button(self, tab):
+        cancel_button = ttk.Button(tab, text="Cancel", command=lambda: self.logic.cancel_tab_job(tab))
+        cancel_button.pack(side="top", anchor="ne", pady=5, padx=5)
+        return cancel_button
+
     def close_tab(self, tab):
         self.logic.close_tab(tab)
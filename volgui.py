@@ -0,0 +1,138 @@
+"""VolGUI without the GUI.
+
+python -m volgui run --profile "Windows quick triage" --dumps dumps/ --out triage.zip
+python -m volgui serve --port 8765
+"""
+import argparse
+import os
+import shlex
+import socket
+import sys
+import time
+from logic.src.batch_runner import BatchRunner, EXECUTION_ENGINES, find_dumps
+from logic.src.command_catalog import load_commands, load_settings, COMMANDS_FILE, SETTINGS_FILE
+from logic.src.job_service import JobService, start_server, DEFAULT_HOST, DEFAULT_PORT, DEFAULT_MAX_PENDING, TOKEN_FILE
+from logic.src.package_writer import COMPRESSION_METHODS, DEFAULT_COMPRESSION
+from logic.src.profiles import load_profiles, find_profile, get_stages, missing_commands, PROFILES_FILE
+
+def parse_arguments(argv):
+    parser = argparse.ArgumentParser(prog="volgui", description="Run VolGUI commands and profiles without a display.")
+    subparsers = parser.add_subparsers(dest="action", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Run a profile or commands on memory dumps and export the results as a package.")
+    run_parser.add_argument("--profile", help="Name of a profile in profiles.json.")
+    run_parser.add_argument("--command", action="append", default=[], help="A command with its parameters, e.g. \"windows.pslist --pid 4\". Can be given more than once, the commands run after the profile.")
+    run_parser.add_argument("--dumps", nargs="+", required=True, help="Memory dumps, or directories whose dumps are all used.")
+    run_parser.add_argument("--out", required=True, help="Zip file the package is written to.")
+    run_parser.add_argument("--engine", choices=EXECUTION_ENGINES, help="Execution engine, the settings decide by default.")
+    run_parser.add_argument("--workers", type=int, help="Jobs running at the same time, the CPU count by default.")
+    run_parser.add_argument("--no-cache", action="store_true", help="Run every command even if its result is cached.")
+    run_parser.add_argument("--compression", choices=sorted(COMPRESSION_METHODS), help="Compression of the package.")
+    run_parser.add_argument("--include-dump", action="store_true", help="Add the memory dump to the package (one dump only).")
+    run_parser.add_argument("--settings", default=SETTINGS_FILE, help="Settings file, settings.json by default.")
+    run_parser.add_argument("--commands-file", default=COMMANDS_FILE, help="Command list, commands.json by default.")
+    run_parser.add_argument("--profiles-file", default=PROFILES_FILE, help="Profiles, profiles.json by default.")
+
+    serve_parser = subparsers.add_parser("serve", help="Take jobs over a local HTTP/JSON API.")
+    serve_parser.add_argument("--host", default=DEFAULT_HOST, help=f"Address to listen on, {DEFAULT_HOST} by default.")
+    serve_parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port to listen on, {DEFAULT_PORT} by default.")
+    serve_parser.add_argument("--socket", help="Listen on this Unix socket instead of a port.")
+    serve_parser.add_argument("--engine", choices=EXECUTION_ENGINES, help="Execution engine, the settings decide by default.")
+    serve_parser.add_argument("--workers", type=int, help="Jobs running at the same time, the CPU count by default.")
+    serve_parser.add_argument("--max-pending", type=int, help=f"Queued jobs before submissions are refused, {DEFAULT_MAX_PENDING} by default.")
+    serve_parser.add_argument("--no-cache", action="store_true", help="Run every command even if its result is cached.")
+    serve_parser.add_argument("--token-file", default=TOKEN_FILE, help=f"File the access token is written to, {TOKEN_FILE} by default.")
+    serve_parser.add_argument("--settings", default=SETTINGS_FILE, help="Settings file, settings.json by default.")
+    serve_parser.add_argument("--commands-file", default=COMMANDS_FILE, help="Command list, commands.json by default.")
+    serve_parser.add_argument("--profiles-file", default=PROFILES_FILE, help="Profiles, profiles.json by default.")
+    return parser, parser.parse_args(argv)
+
+def run(parser, args):
+    settings = load_settings(args.settings)
+    try:
+        commands = load_commands(args.commands_file)
+    except (OSError, ValueError) as e:
+        parser.error(f"Could not read {args.commands_file}: {e}")
+
+    stages = []
+    if args.profile:
+        profile = find_profile(load_profiles(args.profiles_file), args.profile)
+        if profile is None:
+            parser.error(f"Profile {args.profile} not found in {args.profiles_file}.")
+        stages += get_stages(profile)
+    if args.command:
+        steps = []
+        for text in args.command:
+            tokens = shlex.split(text)
+            steps.append((tokens[0], shlex.join(tokens[1:])))
+        stages.append(steps)
+    if not stages:
+        parser.error("Give a --profile or at least one --command.")
+    missing = missing_commands({"stages": [[{"command": command} for command, parameters in stage] for stage in stages]}, commands)
+    if missing:
+        parser.error(f"Commands that are not in {args.commands_file}: {', '.join(missing)}")
+
+    try:
+        dumps = find_dumps(args.dumps)
+    except FileNotFoundError as e:
+        parser.error(str(e))
+    if not dumps:
+        parser.error("No memory dumps found.")
+    if args.include_dump and len(dumps) > 1:
+        parser.error("--include-dump needs a single dump, a package holds one memory dump.")
+
+    started = time.time()
+    runner = BatchRunner(settings, commands, args.engine, args.workers, False if args.no_cache else None)
+    print(f"Running {sum(len(stage) for stage in stages)} commands on {len(dumps)} dumps with the {runner.execution_engine} engine, {runner.scheduler.max_workers} jobs at a time")
+    try:
+        runner.run(dumps, stages)
+        compression = args.compression or settings.get('export_compression', DEFAULT_COMPRESSION)
+        runner.write_package(args.out, dumps[0] if args.include_dump else None, compression)
+    except KeyboardInterrupt:
+        print("Interrupted, cancelling the remaining jobs")
+        return 130
+    finally:
+        runner.shutdown()
+
+    failures = runner.failures()
+    print(f"Wrote {os.path.abspath(args.out)} in {time.time() - started:.1f} s, {len(runner.results) - len(failures)} of {len(runner.results)} commands succeeded")
+    return 1 if failures else 0
+
+def serve(parser, args):
+    settings = load_settings(args.settings)
+    try:
+        commands = load_commands(args.commands_file)
+    except (OSError, ValueError) as e:
+        parser.error(f"Could not read {args.commands_file}: {e}")
+    if args.socket and not hasattr(socket, "AF_UNIX"):
+        parser.error("Unix sockets are not available on this system.")
+
+    runner = BatchRunner(settings, commands, args.engine, args.workers, False if args.no_cache else None)
+    service = JobService(runner, args.max_pending or int(settings.get('service_max_pending', DEFAULT_MAX_PENDING)), args.profiles_file)
+    server = start_server(service, args.host, args.port, args.socket, args.token_file)
+    where = f"unix:{args.socket}" if args.socket else f"{args.host}:{args.port}"
+    print(f"Job service listening on {where} with the {runner.execution_engine} engine, {runner.scheduler.max_workers} jobs at a time")
+    print(f"Clients send the token in {os.path.abspath(args.token_file)} as \"Authorization: Bearer <token>\"")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("Stopping the job service")
+    finally:
+        server.server_close()
+        runner.shutdown()
+        if args.socket and os.path.exists(args.socket):
+            os.remove(args.socket)
+        if os.path.exists(args.token_file):
+            os.remove(args.token_file)  # The token is only good for this start
+    return 0
+
+def main(argv=None):
+    parser, args = parse_arguments(argv)
+    if args.action == "run":
+        return run(parser, args)
+    if args.action == "serve":
+        return serve(parser, args)
+    return 2
+
+if __name__ == "__main__":
+    sys.exit(main())